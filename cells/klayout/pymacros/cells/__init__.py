@@ -45,6 +45,7 @@ from .res import (
     pwell_resistor,
 )
 from .efuse import efuse
+from .pcell_cache import geometry_cache
 
 
 # It's a Python class that inherits from the pya.Library class
@@ -17,7 +17,6 @@
 ########################################################################################################################
 
 import pya
-from .draw_bjt import draw_bjt
 
 
 class npn_bjt(pya.PCellDeclarationHelper):
@@ -72,6 +71,7 @@ class npn_bjt(pya.PCellDeclarationHelper):
         pass
 
     def produce_impl(self):
+        from .draw_bjt import draw_bjt
 
         # This is the main part of the implementation: create the layout
 
@@ -86,9 +86,8 @@ class npn_bjt(pya.PCellDeclarationHelper):
             1,
         )
 
-        self.cell.flatten(1)
         self.cell.insert(write_cells)
-        self.layout.cleanup()
+        self.cell.flatten(1)
 
 
 class pnp_bjt(pya.PCellDeclarationHelper):
@@ -141,6 +140,7 @@ class pnp_bjt(pya.PCellDeclarationHelper):
         pass
 
     def produce_impl(self):
+        from .draw_bjt import draw_bjt
 
         # This is the main part of the implementation: create the layout
 
@@ -155,6 +155,5 @@ class pnp_bjt(pya.PCellDeclarationHelper):
             1,
         )
 
-        self.cell.flatten(1)
         self.cell.insert(write_cells)
-        self.layout.cleanup()
+        self.cell.flatten(1)
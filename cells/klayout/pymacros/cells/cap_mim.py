@@ -18,7 +18,7 @@
 
 import pya
 import os
-from .draw_cap_mim import draw_cap_mim
+from .pcell_cache import geometry_cache
 
 mim_l = 1.02
 mim_w = 1.02
@@ -91,6 +91,8 @@ class cap_mim(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_cap_mim import draw_cap_mim
+
         option = os.environ["GF_PDK_OPTION"]
         if option == "A":
             if (self.mim_option) == "MIM-B":
@@ -98,7 +100,8 @@ class cap_mim(pya.PCellDeclarationHelper):
         else:
             if (self.mim_option) == "MIM-A":
                 raise TypeError(f"Current stack ({option}) doesn't allow this option")
-        np_instance = draw_cap_mim(
+        np_instance = geometry_cache.draw(
+            draw_cap_mim,
             self.layout,
             lc=self.lc,
             wc=self.wc,
@@ -17,7 +17,7 @@
 ########################################################################################################################
 
 import pya
-from .draw_cap_mos import draw_cap_mos
+from .pcell_cache import geometry_cache
 
 cap_nmos_w = 1.88
 cap_nmos_l = 1
@@ -94,7 +94,10 @@ class cap_nmos(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        np_instance = draw_cap_mos(
+        from .draw_cap_mos import draw_cap_mos
+
+        np_instance = geometry_cache.draw(
+            draw_cap_mos,
             self.layout,
             type="cap_nmos",
             lc=self.lc,
@@ -179,7 +182,10 @@ class cap_pmos(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        np_instance = draw_cap_mos(
+        from .draw_cap_mos import draw_cap_mos
+
+        np_instance = geometry_cache.draw(
+            draw_cap_mos,
             self.layout,
             type="cap_pmos",
             lc=self.lc,
@@ -262,7 +268,10 @@ class cap_nmos_b(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        np_instance = draw_cap_mos(
+        from .draw_cap_mos import draw_cap_mos
+
+        np_instance = geometry_cache.draw(
+            draw_cap_mos,
             self.layout,
             type="cap_nmos_b",
             lc=self.lc,
@@ -345,7 +354,10 @@ class cap_pmos_b(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        np_instance = draw_cap_mos(
+        from .draw_cap_mos import draw_cap_mos
+
+        np_instance = geometry_cache.draw(
+            draw_cap_mos,
             self.layout,
             type="cap_pmos_b",
             lc=self.lc,
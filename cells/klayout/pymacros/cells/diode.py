@@ -17,14 +17,7 @@
 ########################################################################################################################
 
 import pya
-from .draw_diode import (
-    draw_diode_dw2ps,
-    draw_diode_nd2ps,
-    draw_diode_nw2ps,
-    draw_diode_pd2nw,
-    draw_diode_pw2dw,
-    draw_sc_diode,
-)
+from .pcell_cache import geometry_cache
 
 np_l = 0.36
 np_w = 0.36
@@ -108,7 +101,10 @@ class diode_nd2ps(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        np_instance = draw_diode_nd2ps(
+        from .draw_diode import draw_diode_nd2ps
+
+        np_instance = geometry_cache.draw(
+            draw_diode_nd2ps,
             self.layout,
             la=self.la,
             wa=self.wa,
@@ -194,7 +190,10 @@ class diode_pd2nw(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        np_instance = draw_diode_pd2nw(
+        from .draw_diode import draw_diode_pd2nw
+
+        np_instance = geometry_cache.draw(
+            draw_diode_pd2nw,
             self.layout,
             la=self.la,
             wa=self.wa,
@@ -280,7 +279,10 @@ class diode_nw2ps(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        nwp_instance = draw_diode_nw2ps(
+        from .draw_diode import draw_diode_nw2ps
+
+        nwp_instance = geometry_cache.draw(
+            draw_diode_nw2ps,
             self.layout,
             la=self.la,
             wa=self.wa,
@@ -365,7 +367,10 @@ class diode_pw2dw(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        diode_pw2dw_instance = draw_diode_pw2dw(
+        from .draw_diode import draw_diode_pw2dw
+
+        diode_pw2dw_instance = geometry_cache.draw(
+            draw_diode_pw2dw,
             self.layout,
             la=self.la,
             wa=self.wa,
@@ -451,7 +456,10 @@ class diode_dw2ps(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        diode_dw2ps_instance = draw_diode_dw2ps(
+        from .draw_diode import draw_diode_dw2ps
+
+        diode_dw2ps_instance = geometry_cache.draw(
+            draw_diode_dw2ps,
             self.layout,
             la=self.la,
             wa=self.wa,
@@ -534,7 +542,10 @@ class sc_diode(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        sc_instance = draw_sc_diode(
+        from .draw_diode import draw_sc_diode
+
+        sc_instance = geometry_cache.draw(
+            draw_sc_diode,
             self.layout,
             la=self.la,
             wa=self.wa,
@@ -18,6 +18,8 @@
 
 import os
 
+from .fixed_layout import copy_fixed_cell
+
 gds_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bjt")
 
 
@@ -25,9 +27,4 @@ def draw_bjt(layout, device_name):
 
     gds_file = f"{gds_path}/{device_name}.gds"
 
-    if os.path.exists(gds_file) and os.path.isfile(gds_file):
-        layout.read(gds_file)
-    else:
-        print(f"{gds_file} is not exist, please recheck")
-
-    return layout.cell(device_name)
+    return copy_fixed_cell(layout, gds_file, device_name)
@@ -1,6 +1,7 @@
 import gdsfactory as gf
 
 from .via_generator import via_generator, via_stack
+from .layout_converter import component_to_cell
 from .layers_def import layer
 
 
@@ -136,8 +137,4 @@ def draw_cap_mim(
     )
     c.add_ref(via)
 
-    c.write_gds("mim_cap_temp.gds")
-    layout.read("mim_cap_temp.gds")
-    cell_name = "mim_cap_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
@@ -19,7 +19,8 @@
 import gdsfactory as gf
 from gdsfactory.types import Float2, LayerSpec
 
-from .via_generator import via_generator, via_stack
+from .via_generator import via_generator, via_stack, via_arrays
+from .layout_converter import component_to_cell
 from .layers_def import layer
 
 import numpy as np
@@ -399,61 +400,31 @@ def draw_cap_mos(
 
             # generating contacts
 
-            c.add_ref(
-                via_generator(
-                    x_range=(
-                        rect_pcmpgr_in.xmin + con_size,
-                        rect_pcmpgr_in.xmax - con_size,
-                    ),
-                    y_range=(rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # bottom contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(
-                        rect_pcmpgr_in.xmin + con_size,
-                        rect_pcmpgr_in.xmax - con_size,
-                    ),
-                    y_range=(rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # upper contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
-                    y_range=(
-                        rect_pcmpgr_in.ymin + con_size,
-                        rect_pcmpgr_in.ymax - con_size,
-                    ),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # right contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
-                    y_range=(
-                        rect_pcmpgr_in.ymin + con_size,
-                        rect_pcmpgr_in.ymax - con_size,
-                    ),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # left contact
+            via_arrays(
+                c,
+                ranges=[
+                    (
+                        (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                        (rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
+                    ),  # bottom contact
+                    (
+                        (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                        (rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
+                    ),  # upper contact
+                    (
+                        (rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
+                        (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                    ),  # right contact
+                    (
+                        (rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
+                        (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                    ),  # left contact
+                ],
+                via_enclosure=(con_comp_enc, con_comp_enc),
+                via_layer=layer["contact"],
+                via_size=(con_size, con_size),
+                via_spacing=(con_sp, con_sp),
+            )
 
             comp_m1_in = c_temp_gr.add_ref(
                 gf.components.rectangle(
@@ -481,8 +452,4 @@ def draw_cap_mos(
                 )
             )  # guardring metal1
 
-    c.write_gds("cap_mos_temp.gds")
-    layout.read("cap_mos_temp.gds")
-    cell_name = "cap_mos_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
@@ -19,7 +19,8 @@
 import gdsfactory as gf
 from .layers_def import layer
 from gdsfactory.types import Float2
-from .via_generator import via_generator, via_stack
+from .via_generator import via_generator, via_stack, via_arrays
+from .layout_converter import component_to_cell
 
 import numpy as np
 
@@ -246,61 +247,31 @@ def draw_diode_nd2ps(
 
             # generating contacts
 
-            c.add_ref(
-                via_generator(
-                    x_range=(
-                        rect_pcmpgr_in.xmin + con_size,
-                        rect_pcmpgr_in.xmax - con_size,
-                    ),
-                    y_range=(rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # bottom contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(
-                        rect_pcmpgr_in.xmin + con_size,
-                        rect_pcmpgr_in.xmax - con_size,
-                    ),
-                    y_range=(rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # upper contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
-                    y_range=(
-                        rect_pcmpgr_in.ymin + con_size,
-                        rect_pcmpgr_in.ymax - con_size,
-                    ),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # right contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
-                    y_range=(
-                        rect_pcmpgr_in.ymin + con_size,
-                        rect_pcmpgr_in.ymax - con_size,
-                    ),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # left contact
+            via_arrays(
+                c,
+                ranges=[
+                    (
+                        (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                        (rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
+                    ),  # bottom contact
+                    (
+                        (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                        (rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
+                    ),  # upper contact
+                    (
+                        (rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
+                        (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                    ),  # right contact
+                    (
+                        (rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
+                        (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                    ),  # left contact
+                ],
+                via_enclosure=(con_comp_enc, con_comp_enc),
+                via_layer=layer["contact"],
+                via_size=(con_size, con_size),
+                via_spacing=(con_sp, con_sp),
+            )
 
             comp_m1_in = c_temp_gr.add_ref(
                 gf.components.rectangle(
@@ -330,11 +301,7 @@ def draw_diode_nd2ps(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_nd2ps_temp.gds")
-    layout.read("diode_nd2ps_temp.gds")
-    cell_name = "diode_nd2ps_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_diode_pd2nw(
@@ -559,61 +526,31 @@ def draw_diode_pd2nw(
 
             # generating contacts
 
-            c.add_ref(
-                via_generator(
-                    x_range=(
-                        rect_pcmpgr_in.xmin + con_size,
-                        rect_pcmpgr_in.xmax - con_size,
-                    ),
-                    y_range=(rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # bottom contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(
-                        rect_pcmpgr_in.xmin + con_size,
-                        rect_pcmpgr_in.xmax - con_size,
-                    ),
-                    y_range=(rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # upper contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
-                    y_range=(
-                        rect_pcmpgr_in.ymin + con_size,
-                        rect_pcmpgr_in.ymax - con_size,
-                    ),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # right contact
-
-            c.add_ref(
-                via_generator(
-                    x_range=(rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
-                    y_range=(
-                        rect_pcmpgr_in.ymin + con_size,
-                        rect_pcmpgr_in.ymax - con_size,
-                    ),
-                    via_enclosure=(con_comp_enc, con_comp_enc),
-                    via_layer=layer["contact"],
-                    via_size=(con_size, con_size),
-                    via_spacing=(con_sp, con_sp),
-                )
-            )  # left contact
+            via_arrays(
+                c,
+                ranges=[
+                    (
+                        (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                        (rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
+                    ),  # bottom contact
+                    (
+                        (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                        (rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
+                    ),  # upper contact
+                    (
+                        (rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
+                        (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                    ),  # right contact
+                    (
+                        (rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
+                        (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                    ),  # left contact
+                ],
+                via_enclosure=(con_comp_enc, con_comp_enc),
+                via_layer=layer["contact"],
+                via_size=(con_size, con_size),
+                via_spacing=(con_sp, con_sp),
+            )
 
             comp_m1_in = c_temp_gr.add_ref(
                 gf.components.rectangle(
@@ -643,11 +580,7 @@ def draw_diode_pd2nw(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_pd2nw_temp.gds")
-    layout.read("diode_pd2nw_temp.gds")
-    cell_name = "diode_pd2nw_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_diode_nw2ps(
@@ -779,11 +712,7 @@ def draw_diode_nw2ps(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_nw2ps_temp.gds")
-    layout.read("diode_nw2ps_temp.gds")
-    cell_name = "diode_nw2ps_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_diode_pw2dw(
@@ -987,61 +916,31 @@ def draw_diode_pw2dw(
 
         # generating contacts
 
-        c.add_ref(
-            via_generator(
-                x_range=(
-                    rect_pcmpgr_in.xmin + con_size,
-                    rect_pcmpgr_in.xmax - con_size,
-                ),
-                y_range=(rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # bottom contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(
-                    rect_pcmpgr_in.xmin + con_size,
-                    rect_pcmpgr_in.xmax - con_size,
-                ),
-                y_range=(rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # upper contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
-                y_range=(
-                    rect_pcmpgr_in.ymin + con_size,
-                    rect_pcmpgr_in.ymax - con_size,
-                ),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # right contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
-                y_range=(
-                    rect_pcmpgr_in.ymin + con_size,
-                    rect_pcmpgr_in.ymax - con_size,
-                ),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # left contact
+        via_arrays(
+            c,
+            ranges=[
+                (
+                    (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                    (rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
+                ),  # bottom contact
+                (
+                    (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                    (rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
+                ),  # upper contact
+                (
+                    (rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
+                    (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                ),  # right contact
+                (
+                    (rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
+                    (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                ),  # left contact
+            ],
+            via_enclosure=(con_comp_enc, con_comp_enc),
+            via_layer=layer["contact"],
+            via_size=(con_size, con_size),
+            via_spacing=(con_sp, con_sp),
+        )
 
         comp_m1_in = c_temp_gr.add_ref(
             gf.components.rectangle(
@@ -1081,11 +980,7 @@ def draw_diode_pw2dw(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_pw2dw_temp.gds")
-    layout.read("diode_pw2dw_temp.gds")
-    cell_name = "diode_pw2dw_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_diode_dw2ps(
@@ -1196,27 +1091,23 @@ def draw_diode_dw2ps(
 
         # generating contacts
 
-        c.add_ref(
-            via_generator(
-                x_range=(ncmp_in.xmin + con_size, ncmp_in.xmax - con_size,),
-                y_range=(ncmp_out.ymin, ncmp_in.ymin),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # bottom contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(ncmp_in.xmin + con_size, ncmp_in.xmax - con_size,),
-                y_range=(ncmp_in.ymax, ncmp_out.ymax),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # upper contact
+        via_arrays(
+            c,
+            ranges=[
+                (
+                    (ncmp_in.xmin + con_size, ncmp_in.xmax - con_size),
+                    (ncmp_out.ymin, ncmp_in.ymin),
+                ),  # bottom contact
+                (
+                    (ncmp_in.xmin + con_size, ncmp_in.xmax - con_size),
+                    (ncmp_in.ymax, ncmp_out.ymax),
+                ),  # upper contact
+            ],
+            via_enclosure=(con_comp_enc, con_comp_enc),
+            via_layer=layer["contact"],
+            via_size=(con_size, con_size),
+            via_spacing=(con_sp, con_sp),
+        )
 
         n_con = c.add_ref(
             via_generator(
@@ -1357,33 +1248,23 @@ def draw_diode_dw2ps(
 
         # generating contacts
 
-        c.add_ref(
-            via_generator(
-                x_range=(
-                    rect_pcmpgr_in.xmin + con_size,
-                    rect_pcmpgr_in.xmax - con_size,
-                ),
-                y_range=(rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # bottom contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(
-                    rect_pcmpgr_in.xmin + con_size,
-                    rect_pcmpgr_in.xmax - con_size,
-                ),
-                y_range=(rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # upper contact
+        via_arrays(
+            c,
+            ranges=[
+                (
+                    (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                    (rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
+                ),  # bottom contact
+                (
+                    (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                    (rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
+                ),  # upper contact
+            ],
+            via_enclosure=(con_comp_enc, con_comp_enc),
+            via_layer=layer["contact"],
+            via_size=(con_size, con_size),
+            via_spacing=(con_sp, con_sp),
+        )
 
         p_con = c.add_ref(
             via_generator(
@@ -1469,11 +1350,7 @@ def draw_diode_dw2ps(
 
     # creating layout and cell in klayout
 
-    c.write_gds("diode_dw2ps_temp.gds")
-    layout.read("diode_dw2ps_temp.gds")
-    cell_name = "diode_dw2ps_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_sc_diode(
@@ -1769,61 +1646,31 @@ def draw_sc_diode(
 
         # generating contacts
 
-        c.add_ref(
-            via_generator(
-                x_range=(
-                    rect_pcmpgr_in.xmin + con_size,
-                    rect_pcmpgr_in.xmax - con_size,
-                ),
-                y_range=(rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # bottom contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(
-                    rect_pcmpgr_in.xmin + con_size,
-                    rect_pcmpgr_in.xmax - con_size,
-                ),
-                y_range=(rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # upper contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
-                y_range=(
-                    rect_pcmpgr_in.ymin + con_size,
-                    rect_pcmpgr_in.ymax - con_size,
-                ),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # right contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
-                y_range=(
-                    rect_pcmpgr_in.ymin + con_size,
-                    rect_pcmpgr_in.ymax - con_size,
-                ),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # left contact
+        via_arrays(
+            c,
+            ranges=[
+                (
+                    (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                    (rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
+                ),  # bottom contact
+                (
+                    (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                    (rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
+                ),  # upper contact
+                (
+                    (rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
+                    (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                ),  # right contact
+                (
+                    (rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
+                    (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+                ),  # left contact
+            ],
+            via_enclosure=(con_comp_enc, con_comp_enc),
+            via_layer=layer["contact"],
+            via_size=(con_size, con_size),
+            via_spacing=(con_sp, con_sp),
+        )
 
         comp_m1_in = c_temp_gr.add_ref(
             gf.components.rectangle(
@@ -1850,8 +1697,4 @@ def draw_sc_diode(
 
     # creating layout and cell in klayout
 
-    c.write_gds("sc_diode_temp.gds")
-    layout.read("sc_diode_temp.gds")
-    cell_name = "sc_diode_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
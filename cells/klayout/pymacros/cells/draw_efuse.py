@@ -12,16 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import pya
 import os
 
-USER = os.environ["USER"]
-gds_path = f"/home/{USER}/.klayout/pymacros/cells/efuse"
+from .fixed_layout import copy_fixed_cell
 
+gds_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "efuse")
 
-def draw_efuse(layout, device_name):
 
-    layout.read(f"{gds_path}/efuse.gds")
+def draw_efuse(layout):
+
+    gds_file = f"{gds_path}/efuse.gds"
     cell_name = "efuse_cell"
 
-    return layout.cell(cell_name)
+    return copy_fixed_cell(layout, gds_file, cell_name)
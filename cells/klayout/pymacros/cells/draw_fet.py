@@ -21,7 +21,8 @@ import numpy as np
 
 import gdsfactory as gf
 from gdsfactory.types import Float2, LayerSpec
-from .via_generator import via_generator, via_stack
+from .via_generator import via_generator, via_stack, via_arrays
+from .layout_converter import component_to_cell
 from .layers_def import layer
 
 
@@ -691,49 +692,31 @@ def bulk_gr_gen(
 
     # generating contacts
 
-    c.add_ref(
-        via_generator(
-            x_range=(rect_bulk_in.xmin + con_size, rect_bulk_in.xmax - con_size,),
-            y_range=(rect_bulk_out.ymin, rect_bulk_in.ymin),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # bottom contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_bulk_in.xmin + con_size, rect_bulk_in.xmax - con_size,),
-            y_range=(rect_bulk_in.ymax, rect_bulk_out.ymax),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # upper contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_bulk_out.xmin, rect_bulk_in.xmin),
-            y_range=(rect_bulk_in.ymin + con_size, rect_bulk_in.ymax - con_size,),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # right contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_bulk_in.xmax, rect_bulk_out.xmax),
-            y_range=(rect_bulk_in.ymin + con_size, rect_bulk_in.ymax - con_size,),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # left contact
+    via_arrays(
+        c,
+        ranges=[
+            (
+                (rect_bulk_in.xmin + con_size, rect_bulk_in.xmax - con_size),
+                (rect_bulk_out.ymin, rect_bulk_in.ymin),
+            ),  # bottom contact
+            (
+                (rect_bulk_in.xmin + con_size, rect_bulk_in.xmax - con_size),
+                (rect_bulk_in.ymax, rect_bulk_out.ymax),
+            ),  # upper contact
+            (
+                (rect_bulk_out.xmin, rect_bulk_in.xmin),
+                (rect_bulk_in.ymin + con_size, rect_bulk_in.ymax - con_size),
+            ),  # right contact
+            (
+                (rect_bulk_in.xmax, rect_bulk_out.xmax),
+                (rect_bulk_in.ymin + con_size, rect_bulk_in.ymax - con_size),
+            ),  # left contact
+        ],
+        via_enclosure=(con_comp_enc, con_comp_enc),
+        via_layer=layer["contact"],
+        via_size=(con_size, con_size),
+        via_spacing=(con_sp, con_sp),
+    )
 
     comp_m1_in = c_temp.add_ref(
         gf.components.rectangle(
@@ -881,49 +864,31 @@ def pcmpgr_gen(dn_rect, grw: float = 0.36) -> gf.Component:
 
     # generating contacts
 
-    c.add_ref(
-        via_generator(
-            x_range=(rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size,),
-            y_range=(rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # bottom contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size,),
-            y_range=(rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # upper contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
-            y_range=(rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size,),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # right contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
-            y_range=(rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size,),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # left contact
+    via_arrays(
+        c,
+        ranges=[
+            (
+                (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                (rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
+            ),  # bottom contact
+            (
+                (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                (rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
+            ),  # upper contact
+            (
+                (rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
+                (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+            ),  # right contact
+            (
+                (rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
+                (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+            ),  # left contact
+        ],
+        via_enclosure=(con_comp_enc, con_comp_enc),
+        via_layer=layer["contact"],
+        via_size=(con_size, con_size),
+        via_spacing=(con_sp, con_sp),
+    )
 
     comp_m1_in = c_temp_gr.add_ref(
         gf.components.rectangle(
@@ -1556,11 +1521,7 @@ def draw_nfet(
         )
 
     # creating layout and cell in klayout
-    c.write_gds("nfet_temp.gds")
-    layout.read("nfet_temp.gds")
-    cell_name = "sky_nfet_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
     # return c
 
 
@@ -2103,11 +2064,7 @@ def draw_pfet(
         # bulk guardring
 
     # creating layout and cell in klayout
-    c.write_gds("pfet_temp.gds")
-    layout.read("pfet_temp.gds")
-    cell_name = "sky_pfet_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_nfet_06v0_nvt(
@@ -2572,49 +2529,31 @@ def draw_nfet_06v0_nvt(
 
         # generating contacts
 
-        c.add_ref(
-            via_generator(
-                x_range=(rect_bulk_in.xmin + con_size, rect_bulk_in.xmax - con_size,),
-                y_range=(rect_bulk_out.ymin, rect_bulk_in.ymin),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # bottom contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(rect_bulk_in.xmin + con_size, rect_bulk_in.xmax - con_size,),
-                y_range=(rect_bulk_in.ymax, rect_bulk_out.ymax),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # upper contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(rect_bulk_out.xmin, rect_bulk_in.xmin),
-                y_range=(rect_bulk_in.ymin + con_size, rect_bulk_in.ymax - con_size,),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # right contact
-
-        c.add_ref(
-            via_generator(
-                x_range=(rect_bulk_in.xmax, rect_bulk_out.xmax),
-                y_range=(rect_bulk_in.ymin + con_size, rect_bulk_in.ymax - con_size,),
-                via_enclosure=(con_comp_enc, con_comp_enc),
-                via_layer=layer["contact"],
-                via_size=(con_size, con_size),
-                via_spacing=(con_sp, con_sp),
-            )
-        )  # left contact
+        via_arrays(
+            c,
+            ranges=[
+                (
+                    (rect_bulk_in.xmin + con_size, rect_bulk_in.xmax - con_size),
+                    (rect_bulk_out.ymin, rect_bulk_in.ymin),
+                ),  # bottom contact
+                (
+                    (rect_bulk_in.xmin + con_size, rect_bulk_in.xmax - con_size),
+                    (rect_bulk_in.ymax, rect_bulk_out.ymax),
+                ),  # upper contact
+                (
+                    (rect_bulk_out.xmin, rect_bulk_in.xmin),
+                    (rect_bulk_in.ymin + con_size, rect_bulk_in.ymax - con_size),
+                ),  # right contact
+                (
+                    (rect_bulk_in.xmax, rect_bulk_out.xmax),
+                    (rect_bulk_in.ymin + con_size, rect_bulk_in.ymax - con_size),
+                ),  # left contact
+            ],
+            via_enclosure=(con_comp_enc, con_comp_enc),
+            via_layer=layer["contact"],
+            via_size=(con_size, con_size),
+            via_spacing=(con_sp, con_sp),
+        )
 
         comp_m1_in = c_temp.add_ref(
             gf.components.rectangle(
@@ -2690,11 +2629,7 @@ def draw_nfet_06v0_nvt(
 
     # creating layout and cell in klayout
 
-    c.write_gds("nfet_nvt_temp.gds")
-    layout.read("nfet_nvt_temp.gds")
-    cell_name = "sky_nfet_nvt_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 #     # return c
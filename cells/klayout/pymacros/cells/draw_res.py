@@ -19,7 +19,8 @@
 import gdsfactory as gf
 from gdsfactory.types import LayerSpec, Float2
 from .layers_def import layer
-from .via_generator import via_generator, via_stack
+from .via_generator import via_generator, via_stack, via_arrays
+from .layout_converter import component_to_cell
 
 
 def draw_metal_res(
@@ -89,11 +90,7 @@ def draw_metal_res(
         )
 
     # creating layout and cell in klayout
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    cell_name = "res_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 @gf.cell
@@ -172,49 +169,31 @@ def pcmpgr_gen(dn_rect, grw: float = 0.36) -> gf.Component:
 
     # generating contacts
 
-    c.add_ref(
-        via_generator(
-            x_range=(rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size,),
-            y_range=(rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # bottom contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size,),
-            y_range=(rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # upper contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
-            y_range=(rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size,),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # right contact
-
-    c.add_ref(
-        via_generator(
-            x_range=(rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
-            y_range=(rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size,),
-            via_enclosure=(con_comp_enc, con_comp_enc),
-            via_layer=layer["contact"],
-            via_size=(con_size, con_size),
-            via_spacing=(con_sp, con_sp),
-        )
-    )  # left contact
+    via_arrays(
+        c,
+        ranges=[
+            (
+                (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                (rect_pcmpgr_out.ymin, rect_pcmpgr_in.ymin),
+            ),  # bottom contact
+            (
+                (rect_pcmpgr_in.xmin + con_size, rect_pcmpgr_in.xmax - con_size),
+                (rect_pcmpgr_in.ymax, rect_pcmpgr_out.ymax),
+            ),  # upper contact
+            (
+                (rect_pcmpgr_out.xmin, rect_pcmpgr_in.xmin),
+                (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+            ),  # right contact
+            (
+                (rect_pcmpgr_in.xmax, rect_pcmpgr_out.xmax),
+                (rect_pcmpgr_in.ymin + con_size, rect_pcmpgr_in.ymax - con_size),
+            ),  # left contact
+        ],
+        via_enclosure=(con_comp_enc, con_comp_enc),
+        via_layer=layer["contact"],
+        via_size=(con_size, con_size),
+        via_spacing=(con_sp, con_sp),
+    )
 
     comp_m1_in = c_temp_gr.add_ref(
         gf.components.rectangle(
@@ -445,11 +424,7 @@ def draw_nplus_res(
         if pcmpgr == 1:
             c.add_ref(pcmpgr_gen(dn_rect=dn_rect, grw=sub_w))
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    cell_name = "res_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_pplus_res(
@@ -529,11 +504,7 @@ def draw_pplus_res(
         nw_rect.xmin = r_inst.xmin - nw_enc_pcmp
         nw_rect.ymin = r_inst.ymin - nw_enc_pcmp
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    cell_name = "res_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 @gf.cell
@@ -732,11 +703,7 @@ def draw_npolyf_res(
         if pcmpgr == 1:
             c.add_ref(pcmpgr_gen(dn_rect=dn_rect, grw=sub_w))
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    cell_name = "res_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_ppolyf_res(
@@ -804,11 +771,7 @@ def draw_ppolyf_res(
         if pcmpgr == 1:
             c.add_ref(pcmpgr_gen(dn_rect=dn_rect, grw=sub_w))
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    cell_name = "res_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_ppolyf_u_high_Rs_res(
@@ -1001,11 +964,7 @@ def draw_ppolyf_u_high_Rs_res(
             dg.xmin = resis_mk.xmin
             dg.ymin = resis_mk.ymin
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    cell_name = "res_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
 
 
 def draw_well_res(
@@ -1177,8 +1136,4 @@ def draw_well_res(
             layer=layer["metal1_label"],
         )
 
-    c.write_gds("res_temp.gds")
-    layout.read("res_temp.gds")
-    cell_name = "res_dev"
-
-    return layout.cell(cell_name)
+    return component_to_cell(c, layout)
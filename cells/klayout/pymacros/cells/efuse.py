@@ -17,7 +17,6 @@
 ########################################################################################################################
 
 import pya
-from .draw_efuse import draw_efuse
 
 
 class efuse(pya.PCellDeclarationHelper):
@@ -76,6 +75,7 @@ class efuse(pya.PCellDeclarationHelper):
         pass
 
     def produce_impl(self):
+        from .draw_efuse import draw_efuse
 
         # This is the main part of the implementation: create the layout
 
@@ -90,6 +90,5 @@ class efuse(pya.PCellDeclarationHelper):
             self.array_y,
         )
 
-        self.cell.flatten(1)
         self.cell.insert(write_cells)
-        self.layout.cleanup()
+        self.cell.flatten(1)
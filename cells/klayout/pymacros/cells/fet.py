@@ -16,7 +16,7 @@
 # FET Generator for GF180MCU
 ########################################################################################################################
 import pya
-from .draw_fet import draw_nfet, draw_nfet_06v0_nvt, draw_pfet
+from .pcell_cache import geometry_cache
 
 fet_3p3_l = 0.28
 fet_3p3_w = 0.22
@@ -152,8 +152,11 @@ class nfet(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        instance = draw_nfet(
-            layout=self.layout,
+        from .draw_fet import draw_nfet
+
+        instance = geometry_cache.draw(
+            draw_nfet,
+            self.layout,
             l_gate=self.l_gate,
             w_gate=self.w_gate,
             sd_con_col=self.sd_con_col,
@@ -299,7 +302,10 @@ class pfet(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        instance = draw_pfet(
+        from .draw_fet import draw_pfet
+
+        instance = geometry_cache.draw(
+            draw_pfet,
             self.layout,
             l_gate=self.l_gate,
             w_gate=self.w_gate,
@@ -436,7 +442,10 @@ class nfet_06v0_nvt(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
-        instance = draw_nfet_06v0_nvt(
+        from .draw_fet import draw_nfet_06v0_nvt
+
+        instance = geometry_cache.draw(
+            draw_nfet_06v0_nvt,
             self.layout,
             l_gate=self.l_gate,
             w_gate=self.w_gate,
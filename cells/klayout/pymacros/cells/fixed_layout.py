@@ -0,0 +1,76 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## Fixed-layout (GDS based) devices for Klayout of GF180MCU
+########################################################################################################################
+
+import os
+import threading
+
+import pya
+
+# Layouts of the fixed GDS files, read once per session and keyed by file path.
+_fixed_layouts = {}
+_lock = threading.Lock()
+
+
+def get_fixed_cell(gds_file: str, cell_name: str):
+    """Returns the cell of a fixed GDS file, reading the file only on first use
+
+    Args :
+        gds_file : path of the GDS file
+        cell_name : name of the cell inside the GDS file
+
+    Raises :
+        FileNotFoundError : the GDS file doesn't exist
+        ValueError : the GDS file has no cell_name cell
+    """
+
+    gds_file = os.path.abspath(gds_file)
+
+    with _lock:
+        fixed_layout = _fixed_layouts.get(gds_file)
+        if fixed_layout is None:
+            if not (os.path.exists(gds_file) and os.path.isfile(gds_file)):
+                raise FileNotFoundError(f"{gds_file} is not exist, please recheck")
+
+            fixed_layout = pya.Layout()
+            fixed_layout.read(gds_file)
+            _fixed_layouts[gds_file] = fixed_layout
+
+    fixed_cell = fixed_layout.cell(cell_name)
+    if fixed_cell is None:
+        raise ValueError(f"{gds_file} has no cell {cell_name}, please recheck")
+
+    return fixed_cell
+
+
+def copy_fixed_cell(layout, gds_file: str, cell_name: str):
+    """Returns a new cell in layout holding a copy of a fixed GDS cell
+
+    The pcells flatten the copy into their own cell, so it doesn't stay in the
+    layout as a separate cell.
+
+    Args :
+        layout : klayout layout to create the cell in
+        gds_file : path of the GDS file
+        cell_name : name of the cell inside the GDS file
+    """
+
+    fixed_cell = get_fixed_cell(gds_file, cell_name)
+    cell = layout.create_cell(cell_name)
+    cell.copy_tree(fixed_cell)
+
+    return cell
@@ -0,0 +1,150 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## gdsfactory Component to Klayout cell converter for GF180MCU
+########################################################################################################################
+
+from math import degrees
+
+import pya
+import gdsfactory as gf
+
+
+def _is_repeated(repetition) -> bool:
+    """Returns True if a gdstk repetition holds more than the element itself
+
+    Args :
+        repetition : gdstk repetition of the element or None
+    """
+
+    return repetition is not None and repetition.size > 0
+
+
+def _get_offsets(repetition):
+    """Returns the displacements of a gdstk repetition (or the origin if there is none)
+
+    Args :
+        repetition : gdstk repetition of the element or None
+    """
+
+    if not _is_repeated(repetition):
+        return [(0, 0)]
+
+    return [(float(x), float(y)) for x, y in repetition.get_offsets()]
+
+
+def _get_array(repetition):
+    """Returns (a, b, na, nb) of a regular gdstk repetition, None for irregular ones
+
+    Args :
+        repetition : gdstk repetition of the reference
+    """
+
+    if repetition.columns is None or repetition.rows is None:
+        return None
+
+    if repetition.spacing is not None:
+        a = pya.DVector(repetition.spacing[0], 0)
+        b = pya.DVector(0, repetition.spacing[1])
+    elif repetition.v1 is not None and repetition.v2 is not None:
+        a = pya.DVector(repetition.v1[0], repetition.v1[1])
+        b = pya.DVector(repetition.v2[0], repetition.v2[1])
+    else:
+        return None
+
+    return a, b, repetition.columns, repetition.rows
+
+
+def _convert_cell(gds_cell, layout, layer_map, cell_map):
+    """Returns the index of the klayout cell holding the content of a gdstk cell
+
+    Args :
+        gds_cell : gdstk cell to be converted
+        layout : klayout layout to create the cell in
+        layer_map : cache of (layer, datatype) to layout layer index
+        cell_map : cache of already converted gdstk cells
+    """
+
+    if id(gds_cell) in cell_map:
+        return cell_map[id(gds_cell)][0]
+
+    cell = layout.create_cell(gds_cell.name)
+    cell_map[id(gds_cell)] = (cell.cell_index(), gds_cell)
+
+    def layer_index(lay, dtype):
+        if (lay, dtype) not in layer_map:
+            layer_map[(lay, dtype)] = layout.layer(pya.LayerInfo(lay, dtype))
+        return layer_map[(lay, dtype)]
+
+    polygons = list(gds_cell.polygons)
+    for path in gds_cell.paths:
+        polygons.extend(path.to_polygons())
+
+    for poly in polygons:
+        shapes = cell.shapes(layer_index(poly.layer, poly.datatype))
+        d_poly = pya.DPolygon([pya.DPoint(x, y) for x, y in poly.points])
+        for dx, dy in _get_offsets(poly.repetition):
+            shapes.insert(d_poly.moved(pya.DVector(dx, dy)))
+
+    for lbl in gds_cell.labels:
+        shapes = cell.shapes(layer_index(lbl.layer, lbl.texttype))
+        for dx, dy in _get_offsets(lbl.repetition):
+            shapes.insert(
+                pya.DText(lbl.text, lbl.origin[0] + dx, lbl.origin[1] + dy)
+            )
+
+    for ref in gds_cell.references:
+        child_index = _convert_cell(ref.cell, layout, layer_map, cell_map)
+        trans = pya.DCplxTrans(
+            1 if ref.magnification is None else ref.magnification,
+            degrees(ref.rotation),
+            ref.x_reflection,
+            ref.origin[0],
+            ref.origin[1],
+        )
+
+        repetition = ref.repetition
+        array = _get_array(repetition) if _is_repeated(repetition) else None
+
+        if not _is_repeated(repetition):
+            cell.insert(pya.DCellInstArray(child_index, trans))
+        elif array is not None:
+            a, b, na, nb = array
+            cell.insert(pya.DCellInstArray(child_index, trans, a, b, na, nb))
+        else:
+            for dx, dy in _get_offsets(repetition):
+                cell.insert(
+                    pya.DCellInstArray(
+                        child_index, pya.DCplxTrans(dx, dy) * trans
+                    )
+                )
+
+    return cell.cell_index()
+
+
+def component_to_cell(component: gf.Component, layout):
+    """Returns a klayout cell with the content of a gdsfactory component
+
+    The polygons, labels and references (keeping the arrays as CellInstArray) are
+    copied directly into the layout without going through a temporary GDS file.
+
+    Args :
+        component : gdsfactory component to be converted
+        layout : klayout layout to create the cell in
+    """
+
+    cell_index = _convert_cell(component._cell, layout, {}, {})
+
+    return layout.cell(cell_index)
@@ -0,0 +1,156 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## Pcells geometry cache for Klayout of GF180MCU
+########################################################################################################################
+
+import threading
+from collections import OrderedDict
+
+import pya
+
+# Bump this whenever a draw_* generator changes the geometry it produces,
+# so that shapes cached by an older generator are not reused.
+GENERATOR_VERSION = 1
+
+# Default number of parameter sets kept in the cache.
+CACHE_SIZE = 256
+
+
+def _normalize(value):
+    """Returns a hashable, rounded version of a pcell parameter value
+
+    Args :
+        value : parameter value as given by klayout
+    """
+
+    if isinstance(value, bool):
+        return int(value)
+    elif isinstance(value, float):
+        return round(value, 6)
+    elif isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+
+    return value
+
+
+class PCellCache:
+    """
+    Process-wide LRU cache of the flattened shapes produced by the draw_* generators
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._layouts = {}
+        self._lock = threading.RLock()
+
+    def key(self, draw_func, dbu: float, params: dict) -> tuple:
+        """Returns the cache key of a generator call
+
+        Args :
+            draw_func : draw_* generator
+            dbu : database unit of the target layout
+            params : generator parameters (without the layout)
+        """
+
+        return (
+            draw_func.__module__,
+            draw_func.__name__,
+            GENERATOR_VERSION,
+            round(dbu, 9),
+            tuple(sorted((k, _normalize(v)) for k, v in params.items())),
+        )
+
+    def draw(self, draw_func, layout, **params):
+        """Returns a new cell in layout with the shapes of draw_func(layout, **params)
+
+        The generator is only called on the first request of a parameter set, later
+        requests copy the cached shapes.
+
+        Args :
+            draw_func : draw_* generator
+            layout : klayout layout of the pcell
+            params : generator parameters (without the layout)
+        """
+
+        key = self.key(draw_func, layout.dbu, params)
+
+        with self._lock:
+            cache_layout = self._layouts.get(key[3])
+            if cache_layout is None:
+                cache_layout = pya.Layout()
+                cache_layout.dbu = layout.dbu
+                self._layouts[key[3]] = cache_layout
+
+            cell_index = self._entries.get(key)
+
+            if cell_index is None:
+                self.misses += 1
+                cached = draw_func(cache_layout, **params)
+                cached.flatten(True)
+                cell_index = cached.cell_index()
+
+                self._entries[key] = cell_index
+                while len(self._entries) > self.maxsize:
+                    self._evict()
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+            cached = cache_layout.cell(cell_index)
+            cell = layout.create_cell(cached.name)
+            cell.copy_tree(cached)
+
+        return cell
+
+    def _evict(self):
+        """Removes the least recently used parameter set from the cache"""
+
+        key, cell_index = self._entries.popitem(last=False)
+        self._layouts[key[3]].delete_cell(cell_index)
+        self.evictions += 1
+
+    def clear(self):
+        """Removes all cached shapes and resets the statistics"""
+
+        with self._lock:
+            self._entries.clear()
+            self._layouts.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the hit/miss statistics of the cache"""
+
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+# Shared by all the pcells of the library.
+geometry_cache = PCellCache()
@@ -18,15 +18,7 @@
 
 import pya
 import os
-from .draw_res import (
-    draw_metal_res,
-    draw_nplus_res,
-    draw_pplus_res,
-    draw_npolyf_res,
-    draw_ppolyf_res,
-    draw_ppolyf_u_high_Rs_res,
-    draw_well_res,
-)
+from .pcell_cache import geometry_cache
 
 rm1_l = 0.23
 rm1_w = 0.23
@@ -194,6 +186,8 @@ class metal_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_metal_res
+
         dbu_PERCISION = 1 / self.layout.dbu
         option = os.environ["GF_PDK_OPTION"]
         if option == "A":
@@ -218,8 +212,9 @@ class metal_resistor(pya.PCellDeclarationHelper):
                 or ((self.res_type) == "tm30k")
             ):
                 raise TypeError(f"Current stack ({option}) doesn't allow this option")
-        np_instance = draw_metal_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_metal_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type=self.res_type,
@@ -313,9 +308,12 @@ class nplus_s_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_nplus_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_nplus_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_nplus_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="nplus_s",
@@ -412,9 +410,12 @@ class pplus_s_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_pplus_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_pplus_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_pplus_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="pplus_s",
@@ -511,9 +512,12 @@ class nplus_u_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_nplus_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_nplus_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_nplus_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="nplus_u",
@@ -610,9 +614,12 @@ class pplus_u_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_pplus_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_pplus_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_pplus_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="pplus_u",
@@ -706,9 +713,12 @@ class nwell_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_well_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_well_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_well_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="nwell",
@@ -802,9 +812,12 @@ class pwell_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_well_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_well_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_well_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="pwell",
@@ -899,9 +912,12 @@ class npolyf_s_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_npolyf_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_npolyf_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_npolyf_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="npolyf_s",
@@ -997,9 +1013,12 @@ class ppolyf_s_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_ppolyf_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_ppolyf_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_ppolyf_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="ppolyf_s",
@@ -1095,9 +1114,12 @@ class npolyf_u_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_npolyf_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_npolyf_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_npolyf_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="npolyf_u",
@@ -1193,9 +1215,12 @@ class ppolyf_u_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_ppolyf_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_ppolyf_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_ppolyf_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             res_type="ppolyf_u",
@@ -1299,9 +1324,12 @@ class ppolyf_u_high_Rs_resistor(pya.PCellDeclarationHelper):
         return pya.Trans(self.shape.bbox().center())
 
     def produce_impl(self):
+        from .draw_res import draw_ppolyf_u_high_Rs_res
+
         dbu_PERCISION = 1 / self.layout.dbu
-        np_instance = draw_ppolyf_u_high_Rs_res(
-            layout=self.layout,
+        np_instance = geometry_cache.draw(
+            draw_ppolyf_u_high_Rs_res,
+            self.layout,
             l_res=self.l_res,
             w_res=self.w_res,
             volt=self.volt,
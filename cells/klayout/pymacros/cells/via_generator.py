@@ -18,59 +18,127 @@
 ########################################################################################################################
 
 
-from math import ceil, floor
+import numpy as np
 import gdsfactory as gf
 from gdsfactory.types import Float2, LayerSpec
 from .layers_def import layer
 
 
+def via_counts(
+    widths,
+    lengths,
+    via_size: Float2 = (0.17, 0.17),
+    via_enclosure: Float2 = (0.06, 0.06),
+    via_spacing: Float2 = (0.17, 0.17),
+):
+    """
+    return the number of coloumns and rows of vias fitting in many enclosing rectangles at once,
+    widths and lengths are array-like with one entry per rectangle
+
+    """
+
+    widths = np.asarray(widths, dtype=float)
+    lengths = np.asarray(lengths, dtype=float)
+
+    nr = np.floor(lengths / (via_size[1] + via_spacing[1]))
+    nr = np.where(
+        (lengths - nr * via_size[1] - (nr - 1) * via_spacing[1]) / 2 < via_enclosure[1],
+        nr - 1,
+        nr,
+    )
+    nr = np.maximum(nr, 1).astype(int)
+
+    nc = np.ceil(widths / (via_size[0] + via_spacing[0]))
+    nc = np.where(
+        np.round(widths - nc * via_size[0] - (nc - 1) * via_spacing[0], 2) / 2
+        < via_enclosure[0],
+        nc - 1,
+        nc,
+    )
+    nc = np.maximum(nc, 1).astype(int)
+
+    return nc, nr
+
+
 @gf.cell
-def via_generator(
-    x_range: Float2 = (0, 1),
-    y_range: Float2 = (0, 1),
+def via_cell(
+    via_size: Float2 = (0.17, 0.17), via_layer: LayerSpec = (66, 44)
+) -> gf.Component:
+
+    """
+    return the canonical via cell of a given size and layer, shared by all via arrays
+
+    """
+
+    return gf.components.rectangle(size=via_size, layer=via_layer)
+
+
+def via_arrays(
+    c: gf.Component,
+    ranges: tuple = (((0, 1), (0, 1)),),
     via_size: Float2 = (0.17, 0.17),
     via_layer: LayerSpec = (66, 44),
     via_enclosure: Float2 = (0.06, 0.06),
     via_spacing: Float2 = (0.17, 0.17),
-) -> gf.Component():
+) -> list:
 
     """
-    return only vias withen the range xrange and yrange while enclosing by via_enclosure
-    and set number of rows and number of coloumns according to ranges and via size and spacing
+    add to c one regular array of vias for each (x_range, y_range) in ranges, the rows/coloumns
+    and the placement of all arrays are computed at once and all arrays share the same via cell
 
     """
 
-    c = gf.Component()
+    ranges = np.asarray(ranges, dtype=float).reshape(-1, 2, 2)
+    x_min = ranges[:, 0, 0]
+    y_min = ranges[:, 1, 0]
+    widths = ranges[:, 0, 1] - x_min
+    lengths = ranges[:, 1, 1] - y_min
 
-    width = x_range[1] - x_range[0]
-    length = y_range[1] - y_range[0]
-    nr = floor(length / (via_size[1] + via_spacing[1]))
-    if (length - nr * via_size[1] - (nr - 1) * via_spacing[1]) / 2 < via_enclosure[1]:
-        nr -= 1
+    nc, nr = via_counts(widths, lengths, via_size, via_enclosure, via_spacing)
 
-    if nr < 1:
-        nr = 1
+    x_0 = x_min + (widths - nc * via_size[0] - (nc - 1) * via_spacing[0]) / 2
+    y_0 = y_min + (lengths - nr * via_size[1] - (nr - 1) * via_spacing[1]) / 2
 
-    nc = ceil(width / (via_size[0] + via_spacing[0]))
+    via_sp = (via_size[0] + via_spacing[0], via_size[1] + via_spacing[1])
+    rect_via = via_cell(via_size=via_size, via_layer=via_layer)
 
-    if (
-        round(width - nc * via_size[0] - (nc - 1) * via_spacing[0], 2)
-    ) / 2 < via_enclosure[0]:
-        nc -= 1
+    via_arr = []
+    for i in range(len(ranges)):
+        arr = c.add_array(
+            rect_via, rows=int(nr[i]), columns=int(nc[i]), spacing=via_sp
+        )
+        arr.move((float(x_0[i]), float(y_0[i])))
+        via_arr.append(arr)
 
-    if nc < 1:
-        nc = 1
+    return via_arr
 
-    via_sp = (via_size[0] + via_spacing[0], via_size[1] + via_spacing[1])
 
-    rect_via = gf.components.rectangle(size=via_size, layer=via_layer)
+@gf.cell
+def via_generator(
+    x_range: Float2 = (0, 1),
+    y_range: Float2 = (0, 1),
+    via_size: Float2 = (0.17, 0.17),
+    via_layer: LayerSpec = (66, 44),
+    via_enclosure: Float2 = (0.06, 0.06),
+    via_spacing: Float2 = (0.17, 0.17),
+) -> gf.Component():
+
+    """
+    return only vias withen the range xrange and yrange while enclosing by via_enclosure
+    and set number of rows and number of coloumns according to ranges and via size and spacing
 
-    via_arr = c.add_array(rect_via, rows=nr, columns=nc, spacing=via_sp)
+    """
 
-    via_arr.move((x_range[0], y_range[0]))
+    c = gf.Component()
 
-    via_arr.movex((width - nc * via_size[0] - (nc - 1) * via_spacing[0]) / 2)
-    via_arr.movey((length - nr * via_size[1] - (nr - 1) * via_spacing[1]) / 2)
+    via_arrays(
+        c,
+        ranges=[(x_range, y_range)],
+        via_size=via_size,
+        via_layer=via_layer,
+        via_enclosure=via_enclosure,
+        via_spacing=via_spacing,
+    )
 
     return c
 
@@ -0,0 +1,72 @@
+"""
+Globalfoundries 180u PCells library load benchmark.
+
+Usage:
+    benchmark_library_load.py (--help| -h)
+    benchmark_library_load.py [--pcell=<pcell_name>]
+
+Options:
+    --help -h                   Print this help message.
+    --pcell=<pcell_name>        PCell produced after the library load to measure the first production time. [default: nfet]
+"""
+
+from docopt import docopt
+import os
+import sys
+import time
+import logging
+
+import pya
+
+pymacros_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+
+    # PCell used to measure the first production.
+    pcell_name = arguments["--pcell"]
+
+    sys.path.insert(0, pymacros_path)
+
+    # library load
+    start = time.perf_counter()
+    from cells import gf180mcu
+
+    import_time = time.perf_counter()
+    gf180mcu()
+    load_time = time.perf_counter()
+
+    logging.info(f"## Import of the pcells modules: {(import_time - start) * 1e3:.1f} ms")
+    logging.info(f"## Registration of the library: {(load_time - import_time) * 1e3:.1f} ms")
+    logging.info(f"## Library load: {(load_time - start) * 1e3:.1f} ms")
+    logging.info(f"## gdsfactory loaded at startup: {'gdsfactory' in sys.modules}")
+
+    # first pcell production, loads the draw_* modules on demand
+    layout = pya.Layout()
+    start = time.perf_counter()
+    layout.create_cell(pcell_name, "gf180mcu", {})
+    produce_time = time.perf_counter()
+
+    logging.info(
+        f"## First {pcell_name} production: {(produce_time - start) * 1e3:.1f} ms"
+    )
+
+
+# ================================================================
+# -------------------------- MAIN --------------------------------
+# ================================================================
+
+if __name__ == "__main__":
+
+    # logs format
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    # arguments
+    arguments = docopt(__doc__, version="PCELLS Gen.: 0.1")
+
+    # Calling main function
+    main()
@@ -3,29 +3,21 @@ Globalfoundries 180u PCells Generator.
 
 Usage:
     generate_pcell.py (--help| -h)
-    generate_pcell.py (--device=<device_name>) [--thr=<thr>]
+    generate_pcell.py (--device=<device_name>) [--thr=<thr>] [--shard_size=<n>]
 
 Options:
     --help -h                   Print this help message.
-    --device=<device_name>      Select your device name. Allowed devices are (bjt , diode, MIM-A, MIM-B_gfB, MIM-B_gfC , fet, cap_mos, res)
-    --thr=<thr>                 The number of threads used in run.
+    --device=<device_name>      Select your device name. Allowed devices are (bjt , diode, MIM-A, MIM-B_gfB, MIM-B_gfC , fet, cap_mos, res, all)
+    --thr=<thr>                 The number of worker processes used in run.
+    --shard_size=<n>            Max. number of instances per output GDS file. [default: 50]
 """
 
 from docopt import docopt
 import os
+import shutil
 import logging
-import pandas as pd
-import yaml
-import concurrent.futures
-import multiprocessing
-from allpairspy import AllPairs
-import csv
-import numpy as np
 
-
-def draw_pcell(device_name):
-    # draw pcells
-    os.system(f"klayout -b -r draw_pcell.py -rd device_in={device_name}")
+from pcell_batch import run_batch, pcell_variants
 
 
 def main():
@@ -34,14 +26,10 @@ def main():
     device_name = arguments["--device"]
 
     # Create output dir
-    os.system("mkdir -p testcases")
-
-    # Remove old output file
-    file_path = f"testcases/{device_name}"
-    if os.path.exists(file_path):
-        os.system(f"rm -rf {file_path}")
+    os.makedirs("testcases", exist_ok=True)
 
-    # gen csv patterns
+    # gen pcells patterns
+    devices = []
     if device_name == "diode":
         diodes = [
             "diode_np",
@@ -53,17 +41,16 @@ def main():
             "diode_dw2ps",
             "diode_sc",
         ]
-        for diode in diodes:
-            draw_pcell(diode)
+        devices = diodes
 
     elif device_name == "bjt":
-        draw_pcell(device_name)
+        devices = ["npn_bjt", "pnp_bjt"]
 
     elif device_name == "MIM-A":
-        draw_pcell(device_name)
+        devices = [device_name]
 
     elif "MIM-B" in device_name:
-        draw_pcell(device_name)
+        devices = [device_name]
 
     elif "fet" in device_name and "cap_" not in device_name:
         fet_devices = [
@@ -83,8 +70,7 @@ def main():
             "nfet_10v0_asym",
             "pfet_10v0_asym",
         ]
-        for fet in fet_devices:
-            draw_pcell(fet)
+        devices = fet_devices
 
     elif device_name == "cap_mos":
         cap_mos_devices = [
@@ -95,8 +81,7 @@ def main():
             "cap_nmos_b",
             "cap_pmos_b",
         ]
-        for cap_mos in cap_mos_devices:
-            draw_pcell(cap_mos)
+        devices = cap_mos_devices
 
     elif device_name == "res":
         res_devices = [
@@ -127,11 +112,30 @@ def main():
             "metal_resistor_tm30k",
         ]
 
-        for res in res_devices:
-            draw_pcell(res)
+        devices = res_devices
+
+    elif device_name == "all":
+        devices = list(pcell_variants.keys())
+
     else:
         pass
 
+    # Remove old output files
+    for device in devices:
+        file_path = f"testcases/{device}"
+        if os.path.exists(file_path):
+            shutil.rmtree(file_path)
+        if os.path.exists(f"{file_path}_pcells.gds"):
+            os.remove(f"{file_path}_pcells.gds")
+
+    _, failed = run_batch(
+        devices, "testcases", thrCount, int(arguments["--shard_size"])
+    )
+
+    if failed:
+        logging.error("## Some pcells generation failed.")
+        exit(1)
+
 
 # ================================================================
 # -------------------------- MAIN --------------------------------
@@ -0,0 +1,413 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+########################################################################################################################
+## Batch PCells generation engine for GF180MCU
+########################################################################################################################
+
+import os
+import sys
+import math
+import time
+import shutil
+import logging
+import concurrent.futures
+from allpairspy import AllPairs
+
+import pya
+
+pymacros_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIB_NAME = "gf180mcu"
+
+# Spacing between the generated instances in um.
+INST_SPACING = 5
+
+# Parameters that are swept as multiples of their minimum value.
+SIZE_PARAMS = ["w_gate", "l_gate", "w_res", "l_res", "la", "wa", "cw", "lc", "wc"]
+
+fet_sweep = {
+    "w_gate": [1, 4, 20],
+    "l_gate": [1, 3, 10],
+    "nf": [1, 2, 5],
+    "bulk": ["None", "Bulk Tie", "Guard Ring"],
+    "gate_con_pos": ["top", "bottom", "alternating"],
+    "con_bet_fin": [0, 1],
+    "sd_con_col": [1, 2],
+}
+
+res_sweep = {
+    "w_res": [1, 4, 20],
+    "l_res": [1, 4, 20],
+    "array_x": [1, 2],
+    "array_y": [1, 2],
+}
+
+diode_sweep = {
+    "la": [1, 4, 20],
+    "wa": [1, 4, 20],
+    "cw": [1, 2, 5],
+    "pcmpgr": [0, 1],
+}
+
+cap_sweep = {
+    "lc": [1, 4, 20],
+    "wc": [1, 4, 20],
+    "volt": ["3.3V", "5/6V"],
+}
+
+# Swept parameters of each pcell.
+pcell_sweeps = {
+    "nfet": fet_sweep,
+    "pfet": fet_sweep,
+    "nfet_06v0_nvt": fet_sweep,
+    "npn_bjt": {
+        "Type": [
+            "npn_10p00x10p00",
+            "npn_05p00x05p00",
+            "npn_00p54x16p00",
+            "npn_00p54x08p00",
+            "npn_00p54x04p00",
+            "npn_00p54x02p00",
+        ],
+    },
+    "pnp_bjt": {
+        "Type": [
+            "pnp_10p00x10p00",
+            "pnp_05p00x05p00",
+            "pnp_10p00x00p42",
+            "pnp_05p00x00p42",
+        ],
+    },
+    "diode_nd2ps": dict(diode_sweep, volt=["3.3V", "5/6V"]),
+    "diode_pd2nw": dict(diode_sweep, volt=["3.3V", "5/6V"]),
+    "diode_nw2ps": {k: v for k, v in diode_sweep.items() if k != "pcmpgr"},
+    "diode_pw2dw": dict(diode_sweep, volt=["3.3V", "5/6V"]),
+    "diode_dw2ps": dict(diode_sweep, volt=["3.3V", "5/6V"]),
+    "sc_diode": {"la": [1, 4, 20], "cw": [1, 2, 5], "m": [2, 4, 8], "pcmpgr": [0, 1]},
+    "cap_mim": {"lc": [1, 4, 20], "wc": [1, 4, 20]},
+    "cap_nmos": dict(cap_sweep, pcmpgr=[0, 1]),
+    "cap_pmos": dict(cap_sweep, pcmpgr=[0, 1]),
+    "cap_nmos_b": cap_sweep,
+    "cap_pmos_b": cap_sweep,
+    "metal_resistor": res_sweep,
+    "nplus_s_resistor": dict(res_sweep, sub=[0, 1]),
+    "nplus_u_resistor": dict(res_sweep, sub=[0, 1]),
+    "pplus_s_resistor": res_sweep,
+    "pplus_u_resistor": res_sweep,
+    "nwell_resistor": res_sweep,
+    "pwell_resistor": dict(res_sweep, pcmpgr=[0, 1]),
+    "npolyf_s_resistor": res_sweep,
+    "npolyf_u_resistor": res_sweep,
+    "ppolyf_s_resistor": res_sweep,
+    "ppolyf_u_resistor": res_sweep,
+    "ppolyf_u_high_Rs_resistor": dict(res_sweep, volt=["3.3V", "5/6V"]),
+}
+
+# Device variants used by generate_pcell.py as:
+# variant : (pcell name, fixed parameters, GF_PDK_OPTION)
+pcell_variants = {
+    # FET
+    "nfet_03v3": ("nfet", {"volt": "3.3V"}, None),
+    "nfet_03v3_dn": ("nfet", {"volt": "3.3V", "deepnwell": 1}, None),
+    "nfet_05v0": ("nfet", {"volt": "5V", "l_gate": 0.6, "w_gate": 0.3}, None),
+    "nfet_05v0_dn": (
+        "nfet",
+        {"volt": "5V", "l_gate": 0.6, "w_gate": 0.3, "deepnwell": 1},
+        None,
+    ),
+    "nfet_06v0": ("nfet", {"volt": "6V", "l_gate": 0.7, "w_gate": 0.3}, None),
+    "nfet_06v0_dn": (
+        "nfet",
+        {"volt": "6V", "l_gate": 0.7, "w_gate": 0.3, "deepnwell": 1},
+        None,
+    ),
+    "pfet_03v3": ("pfet", {"volt": "3.3V"}, None),
+    "pfet_03v3_dn": ("pfet", {"volt": "3.3V", "deepnwell": 1}, None),
+    "pfet_05v0": ("pfet", {"volt": "5V", "l_gate": 0.5, "w_gate": 0.3}, None),
+    "pfet_05v0_dn": (
+        "pfet",
+        {"volt": "5V", "l_gate": 0.5, "w_gate": 0.3, "deepnwell": 1},
+        None,
+    ),
+    "pfet_06v0": ("pfet", {"volt": "6V", "l_gate": 0.55, "w_gate": 0.3}, None),
+    "pfet_06v0_dn": (
+        "pfet",
+        {"volt": "6V", "l_gate": 0.55, "w_gate": 0.3, "deepnwell": 1},
+        None,
+    ),
+    "nfet_06v0_nvt": ("nfet_06v0_nvt", {}, None),
+    # BJT
+    "npn_bjt": ("npn_bjt", {}, None),
+    "pnp_bjt": ("pnp_bjt", {}, None),
+    # DIODE
+    "diode_np": ("diode_nd2ps", {}, None),
+    "diode_np_dn": ("diode_nd2ps", {"deepnwell": 1}, None),
+    "diode_pn": ("diode_pd2nw", {}, None),
+    "diode_pn_dn": ("diode_pd2nw", {"deepnwell": 1}, None),
+    "diode_nw2ps": ("diode_nw2ps", {}, None),
+    "diode_pw2dw": ("diode_pw2dw", {}, None),
+    "diode_dw2ps": ("diode_dw2ps", {}, None),
+    "diode_sc": ("sc_diode", {}, None),
+    # MIM CAP
+    "MIM-A": ("cap_mim", {"mim_option": "MIM-A", "metal_level": "M3"}, "A"),
+    "MIM-B_gfB": ("cap_mim", {"mim_option": "MIM-B", "metal_level": "M5"}, "B"),
+    "MIM-B_gfC": ("cap_mim", {"mim_option": "MIM-B", "metal_level": "M6"}, "C"),
+    # CAP MOS
+    "cap_nmos": ("cap_nmos", {}, None),
+    "cap_pmos": ("cap_pmos", {}, None),
+    "cap_nmos_dn": ("cap_nmos", {"deepnwell": 1}, None),
+    "cap_pmos_dn": ("cap_pmos", {"deepnwell": 1}, None),
+    "cap_nmos_b": ("cap_nmos_b", {}, None),
+    "cap_pmos_b": ("cap_pmos_b", {}, None),
+    # RES
+    "metal_resistor_rm1": ("metal_resistor", {"res_type": "rm1"}, "C"),
+    "metal_resistor_rm2_3": (
+        "metal_resistor",
+        {"res_type": "rm3", "l_res": 0.28, "w_res": 0.28},
+        "C",
+    ),
+    "metal_resistor_tm9k": (
+        "metal_resistor",
+        {"res_type": "tm9k", "l_res": 0.44, "w_res": 0.44},
+        "C",
+    ),
+    "metal_resistor_tm11k": (
+        "metal_resistor",
+        {"res_type": "tm11k", "l_res": 0.44, "w_res": 0.44},
+        "B",
+    ),
+    "metal_resistor_tm30k": (
+        "metal_resistor",
+        {"res_type": "tm30k", "l_res": 1.8, "w_res": 1.8},
+        "A",
+    ),
+}
+
+for res in [
+    "nplus_u",
+    "nplus_s",
+    "pplus_u",
+    "pplus_s",
+    "npolyf_u",
+    "npolyf_s",
+    "ppolyf_u",
+    "ppolyf_s",
+    "ppolyf_u_high_Rs",
+]:
+    pcell_variants[f"{res}_resistor"] = (f"{res}_resistor", {}, None)
+    pcell_variants[f"{res}_dw_resistor"] = (f"{res}_resistor", {"deepnwell": 1}, None)
+
+pcell_variants["nwell_resistor"] = ("nwell_resistor", {}, None)
+pcell_variants["pwell_resistor"] = ("pwell_resistor", {}, None)
+
+
+def load_library():
+    """Registers the gf180mcu library once in the current process"""
+
+    if pya.Library.library_by_name(LIB_NAME) is None:
+        if pymacros_path not in sys.path:
+            sys.path.insert(0, pymacros_path)
+
+        from cells import gf180mcu
+
+        gf180mcu()
+
+    return pya.Library.library_by_name(LIB_NAME)
+
+
+def get_param_sets(variant: str) -> list:
+    """Returns the list of pcell parameters of the AllPairs sweep of a device variant
+
+    Args :
+        variant : device variant name, one of pcell_variants
+    """
+
+    pcell_name, fixed_params, _ = pcell_variants[variant]
+    sweep = pcell_sweeps.get(pcell_name, {})
+
+    decl = load_library().layout().pcell_declaration(pcell_name)
+    defaults = {p.name: p.default for p in decl.get_parameters()}
+
+    names = list(sweep.keys())
+    if len(names) > 1:
+        combinations = [list(c) for c in AllPairs([sweep[n] for n in names])]
+    else:
+        combinations = [[v] for n in names for v in sweep[n]] or [[]]
+
+    param_sets = []
+    for combination in combinations:
+        params = dict(fixed_params)
+        for name, value in zip(names, combination):
+            if name in SIZE_PARAMS:
+                value = round(params.get(name, defaults[name]) * value, 3)
+            params[name] = value
+        param_sets.append(params)
+
+    return param_sets
+
+
+def generate_shard(variant: str, shard_index: int, param_sets: list, out_dir: str):
+    """Generates a GDS file holding one instance per parameter set, returns (path, instances)
+
+    Args :
+        variant : device variant name, one of pcell_variants
+        shard_index : index of the shard within the variant
+        param_sets : list of pcell parameters to be placed
+        out_dir : output directory of the GDS files
+    """
+
+    pcell_name, _, pdk_option = pcell_variants[variant]
+    if pdk_option is not None:
+        os.environ["GF_PDK_OPTION"] = pdk_option
+
+    load_library()
+
+    layout = pya.Layout()
+    top = layout.create_cell(f"{variant}_{shard_index}")
+
+    row_size = max(1, math.ceil(math.sqrt(len(param_sets))))
+    spacing = int(INST_SPACING / layout.dbu)
+    x = y = row_height = 0
+
+    for i, params in enumerate(param_sets):
+        cell = layout.create_cell(pcell_name, LIB_NAME, params)
+        bbox = cell.bbox()
+
+        if i and i % row_size == 0:
+            x = 0
+            y += row_height + spacing
+            row_height = 0
+
+        top.insert(
+            pya.CellInstArray(
+                cell.cell_index(), pya.Trans(x - bbox.left, y - bbox.bottom)
+            )
+        )
+        x += bbox.width() + spacing
+        row_height = max(row_height, bbox.height())
+
+    gds_path = os.path.join(out_dir, variant, f"{variant}_{shard_index:03d}.gds")
+    os.makedirs(os.path.dirname(gds_path), exist_ok=True)
+    layout.write(gds_path)
+
+    return gds_path, len(param_sets)
+
+
+def merge_shards(variant: str, gds_paths: list, out_dir: str):
+    """Merges the shards GDS files of a device variant in <variant>_pcells.gds, returns its path
+
+    Args :
+        variant : device variant name, one of pcell_variants
+        gds_paths : paths of the shards GDS files of the variant
+        out_dir : output directory of the GDS files
+    """
+
+    layout = pya.Layout()
+    top = layout.create_cell(f"{variant}_pcells")
+    spacing = int(INST_SPACING / layout.dbu)
+    y = 0
+
+    # The shards are stacked, each one copied with its own cells to avoid name clashes.
+    for gds_path in sorted(gds_paths):
+        shard = pya.Layout()
+        shard.read(gds_path)
+        shard_top = shard.top_cell()
+
+        cell = layout.create_cell(shard_top.name)
+        cell.copy_tree(shard_top)
+        bbox = cell.bbox()
+
+        top.insert(
+            pya.CellInstArray(cell.cell_index(), pya.Trans(-bbox.left, y - bbox.bottom))
+        )
+        y += bbox.height() + spacing
+
+    gds_path = os.path.join(out_dir, f"{variant}_pcells.gds")
+    layout.write(gds_path)
+    shutil.rmtree(os.path.join(out_dir, variant), ignore_errors=True)
+
+    return gds_path
+
+
+def run_batch(variants: list, out_dir: str, workers: int, shard_size: int = 50):
+    """Generates the AllPairs sweep of all given device variants over a process pool
+
+    The shards of each variant are merged in out_dir/<variant>_pcells.gds, the file
+    read by the DRC tests. The shards of a variant with failed shards are kept as is.
+
+    Args :
+        variants : list of device variant names
+        out_dir : output directory of the GDS files
+        workers : number of worker processes
+        shard_size : max. number of instances per output GDS file
+
+    Returns :
+        (number of generated instances, list of the failed (variant, shard_index) jobs)
+    """
+
+    start = time.time()
+    load_library()
+
+    jobs = []
+    for variant in variants:
+        if variant not in pcell_variants:
+            logging.warning(f"## {variant} has no pcell in {LIB_NAME}, skipping it.")
+            continue
+
+        param_sets = get_param_sets(variant)
+        for i in range(0, len(param_sets), shard_size):
+            jobs.append((variant, i // shard_size, param_sets[i : i + shard_size]))
+
+    instances = 0
+    failed = []
+    shard_paths = {}
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=load_library
+    ) as executor:
+        future_to_job = {
+            executor.submit(generate_shard, variant, index, params, out_dir): (
+                variant,
+                index,
+            )
+            for variant, index, params in jobs
+        }
+
+        for future in concurrent.futures.as_completed(future_to_job):
+            variant, index = future_to_job[future]
+            try:
+                gds_path, count = future.result()
+                instances += count
+                shard_paths.setdefault(variant, []).append(gds_path)
+                logging.info(f"## {count} {variant} instances written to {gds_path}")
+            except Exception as exc:
+                logging.error(f"{variant} shard {index} generated an exception: {exc}")
+                failed.append((variant, index))
+
+    failed_variants = {variant for variant, _ in failed}
+    for variant, gds_paths in shard_paths.items():
+        if variant not in failed_variants:
+            gds_path = merge_shards(variant, gds_paths, out_dir)
+            logging.info(f"## {variant} shards merged to {gds_path}")
+
+    elapsed = time.time() - start
+    logging.info(
+        f"## Generated {instances} instances in {len(jobs)} shards within "
+        f"{elapsed:.2f}s ({instances / elapsed if elapsed else 0:.1f} instances/s)"
+    )
+
+    if failed:
+        logging.error(f"## {len(failed)} of {len(jobs)} shards failed: {failed}")
+
+    return instances, failed
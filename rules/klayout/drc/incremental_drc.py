@@ -0,0 +1,392 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental run support for the GlobalFoundries 180nm MCU DRC.
+
+Every input layer/datatype of the layout is fingerprinted from the digests of the shapes
+of each cell on it, and every rule table is mapped to the layers it reads (through the
+layers derived in main.drc).
+A table is re-run only if one of its layers, its rule deck or the run switches
+changed since the last run in the same run directory, otherwise its previous
+results database is reused.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+
+STATE_FILE_NAME = "drc_incremental_state.json"
+
+# Key used for the runs that depend on the whole layout (extent of the chip).
+ALL_LAYERS = "*"
+
+# Switches that don't change the results of a run.
+IGNORED_SWITCHES = [
+    "report",
+    "input",
+    "verbose",
+    "thr",
+    "mp",
+    "antenna_mp",
+    "profile",
+    "profile_lib",
+]
+
+ASSIGN_PATTERN = re.compile(r"^\s*(\w+)\s*=\s*(.+)$")
+LAYER_PATTERN = re.compile(r"polygons\(\s*(\d+)\s*,\s*(\d+)\s*\)")
+IDENT_PATTERN = re.compile(r"\b[A-Za-z_]\w*\b")
+EXTENT_PATTERN = re.compile(r"\b(extent|CHIP)\b")
+METAL_LEVEL_PATTERN = re.compile(r'^\s*if\s+METAL_LEVEL\s*==\s*"(\w+)"')
+BLOCK_OPEN_PATTERN = re.compile(
+    r"^\s*(if|unless|while|until|case|begin|def|class|module)\b|\bdo\s*(\|[^|]*\|)?\s*$"
+)
+BLOCK_ELSE_PATTERN = re.compile(r"^\s*(else|elsif)\b")
+BLOCK_END_PATTERN = re.compile(r"^\s*end\b")
+
+
+def _strip_comment(line: str):
+    """
+    _strip_comment removes the ruby comment of a rule deck line.
+    """
+    return line.split("#", 1)[0]
+
+
+def _direct_layers(text: str):
+    """
+    _direct_layers gets the layers read directly by a polygons(layer, datatype) call.
+    """
+    return {f"{lay}/{dtype}" for lay, dtype in LAYER_PATTERN.findall(text)}
+
+
+def get_main_layer_dependencies(drc_dir: str, metal_level: str = None):
+    """
+    get_main_layer_dependencies maps every layer defined in main.drc to the input layers it's derived from.
+    A layer assigned in several branches depends on the layers of all of them, unless the
+    branches of the METAL_LEVEL conditions are resolved with metal_level.
+
+    Parameters
+    ----------
+    drc_dir : str
+        Path to the DRC folder.
+    metal_level : str, optional
+        Metal stack of the run (e.g. "5LM"), all the metal stacks branches are kept if None.
+
+    Returns
+    -------
+    dict
+        Dictionary of layer variable name to the set of "layer/datatype" strings it depends on.
+    """
+    deps = dict()
+
+    # Open blocks, True/False for the taken/skipped METAL_LEVEL branches, None for other blocks.
+    blocks = []
+
+    with open(os.path.join(drc_dir, "rule_decks", "main.drc"), "r") as f:
+        for line in f:
+            code = _strip_comment(line)
+
+            if metal_level is not None:
+                level = METAL_LEVEL_PATTERN.match(code)
+                if level:
+                    blocks.append(level.group(1) == metal_level)
+                    continue
+                if BLOCK_ELSE_PATTERN.match(code):
+                    if blocks and blocks[-1] is not None:
+                        blocks[-1] = not blocks[-1]
+                    continue
+                if BLOCK_END_PATTERN.match(code):
+                    if blocks:
+                        blocks.pop()
+                    continue
+                if BLOCK_OPEN_PATTERN.search(code):
+                    blocks.append(None)
+                if False in blocks:
+                    continue
+
+            m = ASSIGN_PATTERN.match(code)
+            if not m:
+                continue
+
+            name, expr = m.groups()
+            layers = _direct_layers(expr)
+            for ident in IDENT_PATTERN.findall(expr):
+                layers |= deps.get(ident, set())
+            if EXTENT_PATTERN.search(expr):
+                layers.add(ALL_LAYERS)
+
+            ## A layer assigned in several branches (e.g. per metal stack) depends on all of them.
+            if layers:
+                deps[name] = deps.get(name, set()) | layers
+
+    return deps
+
+
+def get_deck_layers(deck_path: str, main_deps: dict):
+    """
+    get_deck_layers gets the input layers read by a rule deck.
+
+    Parameters
+    ----------
+    deck_path : str
+        Path to the rule deck (a rule table, antenna or density deck).
+    main_deps : dict
+        Dictionary of the layers defined in main.drc generated by get_main_layer_dependencies.
+
+    Returns
+    -------
+    set
+        Set of "layer/datatype" strings, it holds ALL_LAYERS if the deck depends on the whole layout.
+    """
+    layers = set()
+
+    with open(deck_path, "r") as f:
+        for line in f:
+            text = _strip_comment(line)
+            layers |= _direct_layers(text)
+            for ident in IDENT_PATTERN.findall(text):
+                layers |= main_deps.get(ident, set())
+            if EXTENT_PATTERN.search(text):
+                layers.add(ALL_LAYERS)
+
+    return layers
+
+
+def _get_digest(text: str):
+    """
+    _get_digest returns the sha1 hex digest of a text.
+    """
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def combine_cell_fingerprints(cells: list):
+    """
+    combine_cell_fingerprints combines the digests of the cells in the fingerprint of each layer.
+    A cell contributes to a layer with its shapes on it and its instances of cells holding it.
+
+    Parameters
+    ----------
+    cells : list
+        List of (cell name, shapes, children) of each cell. shapes is a dictionary of "layer/datatype"
+        string to the digest of the cell shapes on it, and children a list of (layers, digest) of the
+        instances of each child cell, where layers is the set of layers held by the child cell hierarchy.
+
+    Returns
+    -------
+    dict
+        Dictionary of "layer/datatype" string to its fingerprint.
+    """
+    hashes = dict()
+
+    for name, shapes, children in sorted(cells, key=lambda c: c[0]):
+        layers = set(shapes).union(*(child_layers for child_layers, _ in children))
+        for lay in layers:
+            h = hashes.setdefault(lay, hashlib.sha1())
+            h.update("{}:{}".format(name, shapes.get(lay, "")).encode())
+            for child_layers, digest in sorted(children, key=lambda c: c[1]):
+                if lay in child_layers:
+                    h.update(":{}".format(digest).encode())
+            h.update(b";")
+
+    return {lay: h.hexdigest() for lay, h in hashes.items()}
+
+
+def get_layer_fingerprints(layout_path: str, topcell: str):
+    """
+    get_layer_fingerprints fingerprints the shapes of every input layer/datatype of the layout.
+    The shapes of each cell on a layer are read in bulk and hashed together, and the instances are
+    hashed per child cell, so placement changes are caught as well as shape changes.
+
+    Parameters
+    ----------
+    layout_path : str
+        Path to the target layout.
+    topcell : str
+        Name of the topcell used in the run.
+
+    Returns
+    -------
+    dict
+        Dictionary of "layer/datatype" string to its fingerprint.
+    """
+    # klayout is only needed to read the layout, the rule decks are parsed as plain text.
+    import klayout.db
+
+    layout = klayout.db.Layout()
+    layout.read(layout_path)
+    top = layout.cell(topcell)
+    used_cells = set(top.called_cells()) | {top.cell_index()}
+
+    layer_names = dict()
+    for li in layout.layer_indexes():
+        info = layout.get_info(li)
+        layer_names[li] = f"{info.layer}/{info.datatype}"
+
+    # Layers held by the hierarchy of each cell, children are visited before their parents.
+    hier_layers = dict()
+    cells = []
+    for ci in layout.each_cell_bottom_up():
+        if ci not in used_cells:
+            continue
+        c = layout.cell(ci)
+
+        shapes = dict()
+        for li, lay in layer_names.items():
+            cell_shapes = c.shapes(li)
+            if cell_shapes.is_empty():
+                continue
+            polygons = klayout.db.Region(cell_shapes)
+            texts = klayout.db.Texts(cell_shapes)
+            shapes[lay] = _get_digest(
+                "{}|{}".format(
+                    polygons.to_s(polygons.count()), texts.to_s(texts.count())
+                )
+            )
+
+        insts = dict()
+        for inst in c.each_inst():
+            insts.setdefault(inst.cell_index, []).append(
+                "{} {} {} {} {}".format(
+                    inst.dcplx_trans, inst.a, inst.b, inst.na, inst.nb
+                )
+            )
+        children = [
+            (
+                hier_layers[child],
+                _get_digest("\n".join([layout.cell(child).name] + sorted(descs))),
+            )
+            for child, descs in insts.items()
+        ]
+
+        hier_layers[ci] = set(shapes).union(*(lays for lays, _ in children))
+        cells.append((c.name, shapes, children))
+
+    return combine_cell_fingerprints(cells)
+
+
+def get_run_key(deck_paths: list, sws: dict):
+    """
+    get_run_key gets the key of a run from its rule decks content and switches.
+
+    Parameters
+    ----------
+    deck_paths : list
+        Paths to the rule decks used in the run.
+    sws : dict
+        Dictionary that holds all switches passed to klayout.
+
+    Returns
+    -------
+    str
+        Key of the run.
+    """
+    h = hashlib.sha1()
+    for deck_path in deck_paths:
+        with open(deck_path, "rb") as f:
+            h.update(f.read())
+
+    run_sws = {k: v for k, v in sws.items() if k not in IGNORED_SWITCHES}
+    h.update(json.dumps(run_sws, sort_keys=True).encode())
+
+    return h.hexdigest()
+
+
+def _used_fingerprints(layers: set, fingerprints: dict):
+    """
+    _used_fingerprints gets the fingerprints of the layers read by a run.
+    """
+    if ALL_LAYERS in layers:
+        layers = set(fingerprints.keys())
+
+    return {lay: fingerprints.get(lay, "") for lay in sorted(layers)}
+
+
+class IncrementalState:
+    """
+    State of the previous runs kept in the run directory.
+    """
+
+    def __init__(self, run_dir: str, fingerprints: dict):
+        self.path = os.path.join(run_dir, STATE_FILE_NAME)
+        self.fingerprints = fingerprints
+        self.runs = dict()
+
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self.runs = json.load(f).get("runs", dict())
+            except (OSError, ValueError):
+                logging.warning(f"## Couldn't read incremental state {self.path}.")
+
+    def get_reusable_report(self, name: str, key: str, layers: set):
+        """
+        get_reusable_report gets the previous results database of a run if nothing it depends on changed.
+
+        Parameters
+        ----------
+        name : str
+            Name of the run (rule table, antenna or density).
+        key : str
+            Key of the run generated by get_run_key.
+        layers : set
+            Input layers read by the run.
+
+        Returns
+        -------
+        str
+            Path to the previous results database, None if the run has to be done again.
+        """
+        prev = self.runs.get(name)
+        if prev is None or prev["key"] != key:
+            return None
+
+        if prev["layers"] != _used_fingerprints(layers, self.fingerprints):
+            return None
+
+        if not os.path.isfile(prev["report"]):
+            return None
+
+        return prev["report"]
+
+    def update(self, name: str, key: str, layers: set, report_path: str):
+        """
+        update records a completed run.
+
+        Parameters
+        ----------
+        name : str
+            Name of the run (rule table, antenna or density).
+        key : str
+            Key of the run generated by get_run_key.
+        layers : set
+            Input layers read by the run.
+        report_path : str
+            Path to the results database of the run.
+        """
+        self.runs[name] = {
+            "key": key,
+            "layers": _used_fingerprints(layers, self.fingerprints),
+            "report": report_path,
+        }
+
+    def save(self):
+        """
+        save writes the state for the next incremental run.
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"runs": self.runs}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,442 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Analyze GlobalFoundries 180nm MCU DRC results with a spatial index over the markers.
+
+Usage:
+    results_analysis.py (--help| -h)
+    results_analysis.py (--db=<lyrdb_file_path>) [--region=<region>] [--nearest=<point>] [--rule=<rule_name>] [--density=<density_bin_um>]
+
+Options:
+    --help -h                           Print this help message.
+    --db=<lyrdb_file_path>              Path to the results database.
+    --region=<region>                   Report the markers inside a region given as left,bottom,right,top in um.
+    --nearest=<point>                   Report the nearest marker to a point given as x,y in um.
+    --rule=<rule_name>                  Restrict the queries to one rule.
+    --density=<density_bin_um>          Write the per rule density maps with the given bin size in um.
+"""
+
+from docopt import docopt
+import os
+import json
+import time
+import logging
+
+import numpy as np
+
+from violation_store import (
+    ViolationStore,
+    get_store_path,
+    is_store_up_to_date,
+    write_violation_store,
+)
+
+INDEX_FILE_NAME = "grid_index.npz"
+INDEX_VERSION = 1
+
+# Average number of markers per bin of the grid.
+MARKERS_PER_BIN = 4
+
+
+class MarkerIndex:
+    """
+    Uniform grid index over the markers of a violation store.
+
+    Each marker is stored in the bin of the lower left corner of its bbox, and the
+    queries are extended by the largest marker size so markers overlapping several
+    bins are still found.
+    """
+
+    def __init__(self, store: ViolationStore, grid: dict):
+        self.store = store
+        self.origin = grid["origin"]
+        self.bin_size = float(grid["bin_size"])
+        self.shape = tuple(int(n) for n in grid["shape"])
+        self.max_size = grid["max_size"]
+        self.bin_offsets = grid["bin_offsets"]
+        self.bin_items = grid["bin_items"]
+
+    @classmethod
+    def build(cls, store: ViolationStore):
+        """
+        build creates the grid index of a violation store.
+
+        Parameters
+        ----------
+        store : ViolationStore
+            Violation store of the results database.
+
+        Returns
+        -------
+        MarkerIndex
+            Grid index of the markers.
+        """
+        valid = np.nonzero(~np.isnan(store.bbox[:, 0]))[0]
+        bbox = np.asarray(store.bbox[valid])
+
+        if len(valid) == 0:
+            origin = np.zeros(2)
+            bin_size = 1.0
+            shape = (1, 1)
+            max_size = np.zeros(2)
+        else:
+            origin = bbox[:, :2].min(axis=0)
+            extent = np.maximum(bbox[:, 2:].max(axis=0) - origin, 1e-3)
+            num_bins = max(len(valid) // MARKERS_PER_BIN, 1)
+            bin_size = float(np.sqrt(extent[0] * extent[1] / num_bins))
+            bin_size = max(bin_size, float(extent.max()) / 4096, 1e-3)
+            shape = tuple(int(n) for n in np.floor(extent / bin_size) + 1)
+            max_size = (bbox[:, 2:] - bbox[:, :2]).max(axis=0)
+
+        bins = cls._bin_of(bbox[:, :2], origin, bin_size, shape) if len(valid) else valid
+        order = np.argsort(bins, kind="stable")
+        counts = np.bincount(bins, minlength=shape[0] * shape[1])
+
+        grid = {
+            "origin": origin,
+            "bin_size": bin_size,
+            "shape": np.array(shape),
+            "max_size": max_size,
+            "bin_offsets": np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            "bin_items": valid[order].astype(np.int64),
+        }
+
+        return cls(store, grid)
+
+    @staticmethod
+    def _bin_of(points, origin, bin_size, shape):
+        """
+        _bin_of gets the flat bin index of points.
+        """
+        ij = np.floor((points - origin) / bin_size).astype(np.int64)
+        ij[:, 0] = np.clip(ij[:, 0], 0, shape[0] - 1)
+        ij[:, 1] = np.clip(ij[:, 1], 0, shape[1] - 1)
+        return ij[:, 0] * shape[1] + ij[:, 1]
+
+    def save(self, index_path: str, signature: list):
+        """
+        save writes the grid index to be reused by the next analysis.
+
+        Parameters
+        ----------
+        index_path : str
+            Path to the index file.
+        signature : list
+            Signature of the violation store the index is built on.
+        """
+        np.savez(
+            index_path,
+            version=INDEX_VERSION,
+            signature=np.array(signature, dtype=np.int64),
+            origin=self.origin,
+            bin_size=self.bin_size,
+            shape=np.array(self.shape),
+            max_size=self.max_size,
+            bin_offsets=self.bin_offsets,
+            bin_items=self.bin_items,
+        )
+
+    def _candidates(self, left, bottom, right, top):
+        """
+        _candidates gets the markers stored in the bins that could overlap a region.
+        """
+        lo = np.floor(
+            (np.array([left, bottom]) - self.max_size - self.origin) / self.bin_size
+        ).astype(np.int64)
+        hi = np.floor((np.array([right, top]) - self.origin) / self.bin_size).astype(
+            np.int64
+        )
+        lo = np.maximum(lo, 0)
+        hi = np.minimum(hi, np.array(self.shape) - 1)
+
+        if (hi < lo).any():
+            return np.empty(0, dtype=np.int64)
+
+        parts = []
+        for i in range(lo[0], hi[0] + 1):
+            first = self.bin_offsets[i * self.shape[1] + lo[1]]
+            last = self.bin_offsets[i * self.shape[1] + hi[1] + 1]
+            parts.append(self.bin_items[first:last])
+
+        return np.concatenate(parts)
+
+    def query_region(self, left, bottom, right, top, rule: str = None):
+        """
+        query_region gets the markers overlapping a region.
+
+        Parameters
+        ----------
+        left, bottom, right, top : float
+            Region in um.
+        rule : str, optional
+            Name of the rule, all rules if None.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indexes of the markers in the violation store.
+        """
+        items = self._candidates(left, bottom, right, top)
+        bbox = self.store.bbox[items]
+        mask = (
+            (bbox[:, 0] <= right)
+            & (bbox[:, 2] >= left)
+            & (bbox[:, 1] <= top)
+            & (bbox[:, 3] >= bottom)
+        )
+
+        if rule is not None:
+            if rule not in self.store.rules:
+                return np.empty(0, dtype=np.int64)
+            mask &= self.store.rule_id[items] == self.store.rules.index(rule)
+
+        return np.sort(items[mask])
+
+    def nearest(self, x: float, y: float, k: int = 1, rule: str = None):
+        """
+        nearest gets the markers nearest to a point, the distance is measured to the marker bbox.
+
+        Parameters
+        ----------
+        x, y : float
+            Point in um.
+        k : int, optional
+            Number of markers to get, by default 1.
+        rule : str, optional
+            Name of the rule, all rules if None.
+
+        Returns
+        -------
+        list
+            List of (marker index, distance) sorted by distance.
+        """
+        if len(self.bin_items) == 0:
+            return []
+
+        far = np.abs(
+            np.array([x, y]) - self.origin
+        ).max() + self.bin_size * max(self.shape) + self.max_size.max()
+        half = self.bin_size
+
+        while True:
+            items = self.query_region(x - half, y - half, x + half, y + half, rule)
+            if len(items) > 0:
+                bbox = self.store.bbox[items]
+                dx = np.maximum(np.maximum(bbox[:, 0] - x, x - bbox[:, 2]), 0)
+                dy = np.maximum(np.maximum(bbox[:, 1] - y, y - bbox[:, 3]), 0)
+                dist = np.hypot(dx, dy)
+                order = np.argsort(dist, kind="stable")[:k]
+
+                # Markers found inside the window are exact only up to the window half size.
+                if (len(order) == k and dist[order[-1]] <= half) or half > far:
+                    return [(int(items[i]), float(dist[i])) for i in order]
+
+            elif half > far:
+                return []
+
+            half *= 2
+
+    def density_map(self, bin_size: float, rule: str = None):
+        """
+        density_map counts the markers per bin of a regular grid.
+
+        Parameters
+        ----------
+        bin_size : float
+            Bin size in um.
+        rule : str, optional
+            Name of the rule, all rules if None.
+
+        Returns
+        -------
+        tuple
+            (counts, x_edges, y_edges) of the 2D histogram of the markers bbox centers.
+        """
+        items = self.bin_items
+        if rule is not None:
+            if rule not in self.store.rules:
+                items = np.empty(0, dtype=np.int64)
+            else:
+                items = items[self.store.rule_id[items] == self.store.rules.index(rule)]
+
+        end = self.origin + np.array(self.shape) * self.bin_size + self.max_size
+        x_edges = np.arange(self.origin[0], end[0] + bin_size, bin_size)
+        y_edges = np.arange(self.origin[1], end[1] + bin_size, bin_size)
+
+        bbox = self.store.bbox[items]
+        centers = (bbox[:, :2] + bbox[:, 2:]) / 2
+        counts, _, _ = np.histogram2d(
+            centers[:, 0], centers[:, 1], bins=[x_edges, y_edges]
+        )
+
+        return counts.astype(np.int64), x_edges, y_edges
+
+    def density_maps(self, bin_size: float):
+        """
+        density_maps counts the markers of every rule per bin of a regular grid.
+
+        Parameters
+        ----------
+        bin_size : float
+            Bin size in um.
+
+        Returns
+        -------
+        dict
+            Dictionary of rule name to its (counts, x_edges, y_edges).
+        """
+        return {r: self.density_map(bin_size, r) for r in self.store.rules}
+
+
+def _store_signature(store_path: str):
+    """
+    _store_signature gets the signature of the results database a violation store is built from.
+    """
+    with open(os.path.join(store_path, "meta.json"), "r") as f:
+        return json.load(f)["signature"]
+
+
+def load_marker_index(results_database: str):
+    """
+    load_marker_index gets the spatial index of a results database. The violation store and the index
+    are built on first use and persisted next to the lyrdb file.
+
+    Parameters
+    ----------
+    results_database : str
+        Path to the lyrdb file.
+
+    Returns
+    -------
+    MarkerIndex
+        Grid index of the markers.
+    """
+    if not is_store_up_to_date(results_database):
+        write_violation_store(results_database)
+
+    store_path = get_store_path(results_database)
+    store = ViolationStore(store_path)
+    signature = _store_signature(store_path)
+    index_path = os.path.join(store_path, INDEX_FILE_NAME)
+
+    if os.path.isfile(index_path):
+        grid = dict(np.load(index_path))
+        if (
+            int(grid["version"]) == INDEX_VERSION
+            and grid["signature"].tolist() == signature
+        ):
+            return MarkerIndex(store, grid)
+
+    index = MarkerIndex.build(store)
+    index.save(index_path, signature)
+
+    return index
+
+
+def write_density_maps(index: MarkerIndex, bin_size: float, output_path: str):
+    """
+    write_density_maps writes the per rule density maps of the markers.
+
+    Parameters
+    ----------
+    index : MarkerIndex
+        Grid index of the markers.
+    bin_size : float
+        Bin size in um.
+    output_path : str
+        Path to the output npz file, it holds the x and y bins edges and one counts array per rule.
+    """
+    maps = index.density_maps(bin_size)
+    arrays = dict()
+
+    for r, (counts, x_edges, y_edges) in maps.items():
+        arrays[r] = counts
+        arrays["x_edges"] = x_edges
+        arrays["y_edges"] = y_edges
+
+    np.savez_compressed(output_path, **arrays)
+
+
+def main(arguments: dict):
+    """
+    main function to analyze the results database.
+
+    Parameters
+    ----------
+    arguments : dict
+        Dictionary that holds the arguments used by user in the run command. This is generated by docopt library.
+    """
+    results_database = os.path.abspath(arguments["--db"])
+    rule = arguments["--rule"]
+
+    t0 = time.time()
+    index = load_marker_index(results_database)
+    logging.info(
+        "## Loaded index of {} markers in {:.3f} s".format(
+            len(index.store), time.time() - t0
+        )
+    )
+
+    if arguments["--region"]:
+        left, bottom, right, top = [float(v) for v in arguments["--region"].split(",")]
+        t0 = time.time()
+        items = index.query_region(left, bottom, right, top, rule)
+        logging.info(
+            "## {} markers in region in {:.3f} ms".format(
+                len(items), (time.time() - t0) * 1e3
+            )
+        )
+        counts = np.bincount(index.store.rule_id[items], minlength=len(index.store.rules))
+        for r, c in zip(index.store.rules, counts):
+            if c > 0:
+                logging.info(f"   {r} : {c}")
+
+    if arguments["--nearest"]:
+        x, y = [float(v) for v in arguments["--nearest"].split(",")]
+        t0 = time.time()
+        found = index.nearest(x, y, 1, rule)
+        logging.info("## Nearest query in {:.3f} ms".format((time.time() - t0) * 1e3))
+        for i, dist in found:
+            logging.info(
+                "   {} at distance {:.3f} um, bbox {}".format(
+                    index.store.rules[index.store.rule_id[i]],
+                    dist,
+                    index.store.bbox[i].tolist(),
+                )
+            )
+
+    if arguments["--density"]:
+        output_path = "{}_density.npz".format(os.path.splitext(results_database)[0])
+        write_density_maps(index, float(arguments["--density"]), output_path)
+        logging.info(f"## Density maps written to {output_path}")
+
+
+# ================================================================
+# -------------------------- MAIN --------------------------------
+# ================================================================
+
+if __name__ == "__main__":
+
+    # arguments
+    arguments = docopt(__doc__, version="RESULTS ANALYSIS: 1.0")
+
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    # Calling main function
+    main(arguments)
@@ -0,0 +1,197 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Streaming reader of the klayout results databases (lyrdb) of the GlobalFoundries 180nm MCU DRC.
+
+The database is parsed with iterparse and every item is cleared once it's read, so the
+memory used doesn't depend on the number of markers in the database.
+"""
+
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+# One violation marker of the results database.
+# values is the list of the marker values text, e.g. "polygon: (0,0;0,1;1,1;1,0)".
+Marker = namedtuple("Marker", ["rule", "cell", "values"])
+
+
+def clean_rule_name(name: str):
+    """
+    clean_rule_name removes the quotes klayout adds around the categories names.
+
+    Parameters
+    ----------
+    name : str
+        Category name as found in the database.
+
+    Returns
+    -------
+    str
+        Name of the rule.
+    """
+    if name is None:
+        return ""
+
+    return name.replace("'", "")
+
+
+class ResultsSummary:
+    """
+    Summary of a results database: violations count per rule, categories and cells.
+    """
+
+    def __init__(self):
+        self.rule_counts = dict()
+        self.categories = dict()
+        self.cells = []
+        self.total = 0
+
+    def violated_rules(self):
+        """
+        violated_rules gets the rules that have violations.
+
+        Returns
+        -------
+        set
+            A set that contains all rules in the database with violations.
+        """
+        return {r for r, c in self.rule_counts.items() if c > 0}
+
+    def count(self, rule: str):
+        """
+        count gets the number of violations of a rule.
+
+        Parameters
+        ----------
+        rule : str
+            Name of the rule.
+
+        Returns
+        -------
+        int
+            Number of violations of the rule.
+        """
+        return self.rule_counts.get(rule, 0)
+
+
+def _parse_item(elem, with_values: bool):
+    """
+    _parse_item reads the category, cell and values of an item element.
+    """
+    rule = ""
+    cell = ""
+    values = []
+
+    for child in elem:
+        if child.tag == "category":
+            rule = clean_rule_name(child.text)
+        elif child.tag == "cell":
+            cell = child.text or ""
+        elif child.tag == "values" and with_values:
+            values = [v.text for v in child if v.tag == "value" and v.text]
+
+    return Marker(rule, cell, values)
+
+
+def scan_results_db(results_database, on_marker=None):
+    """
+    scan_results_db reads a results database in a single streaming pass.
+
+    Parameters
+    ----------
+    results_database : string or Path object
+        Path string to the results file.
+    on_marker : function, optional
+        Function called with every Marker of the database, the marker values are only read if it's given.
+
+    Returns
+    -------
+    ResultsSummary
+        Violations count per rule, categories and cells of the database.
+    """
+    summary = ResultsSummary()
+    with_values = on_marker is not None
+
+    # Path of the open elements, used to know where a category or cell element is.
+    stack = []
+    category_path = []
+
+    for ev, elem in ET.iterparse(str(results_database), events=("start", "end")):
+        if ev == "start":
+            if elem.tag == "category" and stack and stack[-1].tag == "categories":
+                category_path.append("")
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        parent = stack[-1].tag if stack else ""
+
+        if elem.tag == "item":
+            marker = _parse_item(elem, with_values)
+            summary.rule_counts[marker.rule] = summary.rule_counts.get(marker.rule, 0) + 1
+            summary.total += 1
+            if with_values:
+                on_marker(marker)
+
+            ## Clearing memory, the items element doesn't keep the read items.
+            elem.clear()
+            if parent == "items":
+                stack[-1].clear()
+
+        elif elem.tag == "name" and parent == "category":
+            category_path[-1] = clean_rule_name(elem.text)
+
+        elif elem.tag == "description" and parent == "category":
+            summary.categories[".".join(category_path)] = elem.text or ""
+
+        elif elem.tag == "category" and parent == "categories":
+            category_path.pop()
+
+        elif elem.tag == "name" and parent == "cell":
+            summary.cells.append(elem.text or "")
+
+    return summary
+
+
+def iter_markers(results_database):
+    """
+    iter_markers iterates over the markers of a results database with bounded memory.
+
+    Parameters
+    ----------
+    results_database : string or Path object
+        Path string to the results file.
+
+    Yields
+    ------
+    Marker
+        Rule, cell and values of each violation marker.
+    """
+    stack = []
+
+    for ev, elem in ET.iterparse(str(results_database), events=("start", "end")):
+        if ev == "start":
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if elem.tag != "item":
+            continue
+
+        yield _parse_item(elem, True)
+
+        elem.clear()
+        if stack and stack[-1].tag == "items":
+            stack[-1].clear()
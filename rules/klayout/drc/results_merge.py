@@ -0,0 +1,176 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Streaming merger of the klayout results databases (lyrdb) of the GlobalFoundries 180nm MCU DRC.
+
+The databases are read one after the other with iterparse. Only their categories and cells
+are kept in memory to be merged, the items are written to a spool file as soon as they are
+read, so the memory used doesn't depend on the number of markers.
+"""
+
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+
+HEADER_TAGS = ["description", "original-file", "generator", "top-cell"]
+
+
+def _merge_categories(target, source):
+    """
+    _merge_categories merges the categories of a database into the merged categories tree,
+    categories with the same name are merged recursively.
+    """
+    existing = {c.findtext("name"): c for c in target.findall("category")}
+
+    for cat in source.findall("category"):
+        name = cat.findtext("name")
+        if name not in existing:
+            target.append(cat)
+            existing[name] = cat
+            continue
+
+        sub_source = cat.find("categories")
+        if sub_source is None:
+            continue
+
+        sub_target = existing[name].find("categories")
+        if sub_target is None:
+            sub_target = ET.SubElement(existing[name], "categories")
+        _merge_categories(sub_target, sub_source)
+
+
+def _merge_named(target, source, tag: str, key):
+    """
+    _merge_named adds the children of source that are not already in target, compared by key.
+    """
+    existing = {key(e) for e in target.findall(tag)}
+
+    for e in source.findall(tag):
+        k = key(e)
+        if k not in existing:
+            target.append(e)
+            existing.add(k)
+
+
+def _cell_key(cell):
+    return (cell.findtext("name"), cell.findtext("variant") or "")
+
+
+def _tag_key(tag):
+    return tag.findtext("name")
+
+
+def _write_element(f, elem, indent: str):
+    """
+    _write_element writes an element on its own line.
+    """
+    elem.tail = None
+    f.write(indent)
+    f.write(ET.tostring(elem, encoding="unicode"))
+    f.write("\n")
+
+
+def merge_results_dbs(
+    results_db_files: list, output_path: str, description: str = None
+):
+    """
+    merge_results_dbs merges results databases into one database with a single categories tree
+    and cells list, in a single streaming pass over each database.
+
+    Parameters
+    ----------
+    results_db_files : list
+        A list of strings that represent paths to the results databases to merge.
+    output_path : str
+        Path to the merged lyrdb file, it could be one of the merged databases.
+    description : str, optional
+        Description of the merged database, the one of the first database if None.
+
+    Returns
+    -------
+    int
+        Number of markers in the merged database.
+    """
+    header = dict()
+    if description is not None:
+        header["description"] = description
+    tags = ET.Element("tags")
+    categories = ET.Element("categories")
+    cells = ET.Element("cells")
+    total = 0
+
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryFile("w+", encoding="utf-8", dir=out_dir) as spool:
+        for results_database in results_db_files:
+            stack = []
+
+            for ev, elem in ET.iterparse(str(results_database), events=("start", "end")):
+                if ev == "start":
+                    stack.append(elem)
+                    continue
+
+                stack.pop()
+                depth = len(stack)
+
+                if depth == 2 and elem.tag == "item":
+                    _write_element(spool, elem, "  ")
+                    total += 1
+
+                    ## Clearing memory, the items element doesn't keep the written items.
+                    elem.clear()
+                    stack[-1].clear()
+
+                elif depth != 1:
+                    continue
+
+                elif elem.tag in HEADER_TAGS:
+                    if header.get(elem.tag) is None and (elem.text or "").strip():
+                        header[elem.tag] = elem.text
+                    header.setdefault(elem.tag, None)
+
+                elif elem.tag == "tags":
+                    _merge_named(tags, elem, "tag", _tag_key)
+
+                elif elem.tag == "categories":
+                    _merge_categories(categories, elem)
+
+                elif elem.tag == "cells":
+                    _merge_named(cells, elem, "cell", _cell_key)
+
+                ## Header elements are merged, drop them from the database tree.
+                if depth == 1:
+                    stack[0].remove(elem)
+
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+            f.write("<report-database>\n")
+            for tag in HEADER_TAGS:
+                e = ET.Element(tag)
+                e.text = header.get(tag)
+                _write_element(f, e, " ")
+            _write_element(f, tags, " ")
+            _write_element(f, categories, " ")
+            _write_element(f, cells, " ")
+            f.write(" <items>\n")
+            spool.seek(0)
+            shutil.copyfileobj(spool, f)
+            f.write(" </items>\n")
+            f.write("</report-database>\n")
+
+        os.replace(tmp_path, output_path)
+
+    return total
@@ -0,0 +1,91 @@
+################################################################################################
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################################
+
+#================================================
+#---------------- RULES PROFILE -----------------
+#================================================
+# Rules profile shared by the rule decks (main.drc, antenna.drc and density.drc).
+# The wall time, cpu time and memory of every rule are measured from its "Executing rule"
+# message to the next logged message, and written to a csv file.
+# rule_peak_rss_kb is the peak memory reached while the rule runs: the VmHWM high-water
+# mark of the process is reset when the rule starts (writing 5 to /proc/self/clear_refs).
+# Where it can't be reset, the memory at the end of the rule is reported instead.
+
+class RulesProfile
+
+  CSV_HEADER = "table,rule,wall_s,cpu_s,rss_kb,rule_peak_rss_kb"
+
+  def initialize(logger)
+    @rows = []
+    @rule = nil
+
+    profile = self
+    log_info = logger.method(:info)
+    logger.define_singleton_method(:info) do |msg = nil, &blk|
+      profile.end_rule
+      if msg.is_a?(String) && msg.start_with?("Executing rule ")
+        profile.start_rule(msg.sub("Executing rule ", "").strip)
+      end
+      log_info.call(msg, &blk)
+    end
+  end
+
+  def self.proc_status_kb(key)
+    line = File.foreach("/proc/self/status").find { |l| l.start_with?(key) } rescue nil
+    line ? line.split[1].to_i : 0
+  end
+
+  # Resets the VmHWM high-water mark of the process, true if it's supported.
+  def self.reset_peak_rss
+    File.write("/proc/self/clear_refs", "5")
+    true
+  rescue StandardError
+    false
+  end
+
+  def start_rule(name)
+    @peak_reset = RulesProfile.reset_peak_rss
+    @rule = [name, Time.now, Process.clock_gettime(Process::CLOCK_PROCESS_CPUTIME_ID)]
+  end
+
+  def end_rule
+    if @rule
+      rss_kb = RulesProfile.proc_status_kb("VmRSS:")
+      @rows << [
+        @rule[0],
+        Time.now - @rule[1],
+        Process.clock_gettime(Process::CLOCK_PROCESS_CPUTIME_ID) - @rule[2],
+        rss_kb,
+        @peak_reset ? RulesProfile.proc_status_kb("VmHWM:") : rss_kb
+      ]
+      @rule = nil
+    end
+  end
+
+  # Adds the rows of another profile csv file (without its table column).
+  def <<(row)
+    @rows << row
+  end
+
+  def write(path, name)
+    end_rule
+    File.open(path, "w") do |f|
+      f.puts(CSV_HEADER)
+      @rows.each { |r| f.puts(([name] + r).join(",")) }
+    end
+  end
+
+end
@@ -0,0 +1,425 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Rule level sharding of the GlobalFoundries 180nm MCU DRC rule tables.
+
+A rule table is split in blocks starting at each "# Rule X:" comment. Blocks that share
+a variable are kept together, and the resulting units are packed in balanced shards using
+the recorded cost of each rule. A shard is the rule table without the blocks of the
+other shards: the derivations and switches around the blocks are kept in every shard.
+"""
+
+import os
+import re
+import math
+import logging
+from collections import namedtuple
+
+from table_scheduler import (
+    estimate_table_cost,
+    estimate_rule_cost,
+    record_rule_cost,
+    record_table_cost,
+    DEFAULT_SECONDS_PER_RULE,
+)
+
+RULE_PATTERN = re.compile(r"^(\s*)# Rule ([^\s:]+)\s*:")
+HEADER_PATTERN = re.compile(r"^\s*#\s*={5,}")
+OPEN_PATTERN = re.compile(
+    r"^\s*(if|unless|while|until|case|begin|def|class|module)\b"
+)
+DO_PATTERN = re.compile(r"\bdo\s*(\|[^|]*\|)?\s*$")
+END_PATTERN = re.compile(r"^\s*end\b")
+CLOSE_PATTERN = re.compile(r"^\s*(end|else|elsif|when|rescue|ensure)\b")
+STRING_PATTERN = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'")
+ASSIGN_PATTERN = re.compile(r"^\s*([a-z_]\w*)\s*=(?![=~])")
+IDENT_PATTERN = re.compile(r"\b[a-z_]\w*\b")
+
+# One shard of a rule table.
+# text is the content of the sharded rule table, seconds and max_rss_kb its estimated cost.
+RuleShard = namedtuple(
+    "RuleShard", ["name", "table", "rules", "text", "seconds", "max_rss_kb"]
+)
+
+
+def _code(line: str):
+    """
+    _code removes the strings and comment of a rule deck line.
+    """
+    return STRING_PATTERN.sub('""', line).split("#", 1)[0]
+
+
+def _block_delta(line: str):
+    """
+    _block_delta gets the number of ruby blocks opened (positive) or closed (negative) by a line.
+    """
+    code = _code(line)
+    delta = 0
+    if OPEN_PATTERN.match(code):
+        delta += 1
+    if DO_PATTERN.search(code):
+        delta += 1
+    if END_PATTERN.match(code):
+        delta -= 1
+    return delta
+
+
+def _indent(line: str):
+    return len(line) - len(line.lstrip())
+
+
+def _match_end(lines: list, start: int):
+    """
+    _match_end gets the index of the line closing the block opened at start, None if not found.
+    """
+    depth = 0
+    for k in range(start, len(lines)):
+        depth += _block_delta(lines[k])
+        if depth <= 0:
+            return k
+    return None
+
+
+def split_rule_blocks(lines: list):
+    """
+    split_rule_blocks splits the lines of a rule table in rule blocks. A block starts at a
+    "# Rule X:" comment and ends before the next rule comment at the same level, the end of
+    the enclosing block, a section header, or a nested block that holds other rules.
+
+    Parameters
+    ----------
+    lines : list
+        Lines of the rule table.
+
+    Returns
+    -------
+    list
+        List of (start, end) lines ranges of the blocks, None if a block isn't self contained.
+    """
+    blocks = []
+    i = 0
+
+    while i < len(lines):
+        m = RULE_PATTERN.match(lines[i])
+        if not m:
+            i += 1
+            continue
+
+        indent = len(m.group(1))
+        j = i + 1
+        while j < len(lines):
+            line = lines[j]
+            if not line.strip():
+                j += 1
+                continue
+
+            ind = _indent(line)
+            if ind < indent or HEADER_PATTERN.match(line):
+                break
+            if ind == indent and (
+                RULE_PATTERN.match(line) or CLOSE_PATTERN.match(_code(line))
+            ):
+                break
+
+            if ind == indent and _block_delta(line) > 0:
+                k = _match_end(lines, j)
+                if k is None:
+                    return None
+                if any(RULE_PATTERN.match(ln) for ln in lines[j + 1 : k]):
+                    break
+                j = k + 1
+                continue
+
+            j += 1
+
+        end = j
+        while end > i + 1 and not lines[end - 1].strip():
+            end -= 1
+
+        if sum(_block_delta(ln) for ln in lines[i:end]) != 0:
+            return None
+
+        blocks.append((i, end))
+        i = j
+
+    return blocks
+
+
+def get_rule_units(lines: list):
+    """
+    get_rule_units groups the rule blocks of a table in units that could run in different shards.
+    A block using a variable assigned in a previous block is kept in the same unit.
+
+    Parameters
+    ----------
+    lines : list
+        Lines of the rule table.
+
+    Returns
+    -------
+    list
+        List of units, each unit is a list of (start, end) lines ranges. None if the table can't be split.
+    """
+    blocks = split_rule_blocks(lines)
+    if not blocks:
+        return None
+
+    parent = list(range(len(blocks)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    ## Block that assigned each variable last.
+    assigned_by = dict()
+    for b, (start, end) in enumerate(blocks):
+        assigned = set()
+        used = set()
+        for line in lines[start:end]:
+            code = _code(line)
+            m = ASSIGN_PATTERN.match(code)
+            if m:
+                assigned.add(m.group(1))
+            used.update(IDENT_PATTERN.findall(code))
+
+        for var in used - assigned:
+            if var in assigned_by:
+                parent[find(b)] = find(assigned_by[var])
+
+        for var in assigned:
+            assigned_by[var] = b
+
+    units = dict()
+    for b in range(len(blocks)):
+        units.setdefault(find(b), []).append(blocks[b])
+
+    return [units[u] for u in sorted(units)]
+
+
+def _unit_rules(lines: list, unit: list):
+    """
+    _unit_rules gets the names of the rules of a unit.
+    """
+    rules = []
+    for start, end in unit:
+        for line in lines[start:end]:
+            m = RULE_PATTERN.match(line)
+            if m:
+                rules.append(m.group(2))
+    return rules
+
+
+def get_shard_name(table: str, index: int):
+    """
+    get_shard_name gets the run name of a shard of a rule table.
+
+    Parameters
+    ----------
+    table : str
+        Name of the rule table.
+    index : int
+        Index of the shard.
+
+    Returns
+    -------
+    str
+        Run name of the shard.
+    """
+    return f"{table}_shard{index}"
+
+
+def split_table(
+    drc_dir: str, table: str, costs: dict, layout_size: int, num_shards: int
+):
+    """
+    split_table splits a rule table in shards balanced by the recorded cost of its rules,
+    the most expensive units are placed first in the least loaded shard.
+
+    Parameters
+    ----------
+    drc_dir : str
+        Path string to the location where the DRC files would be found.
+    table : str
+        Name of the rule table.
+    costs : dict
+        Dictionary of the recorded costs.
+    layout_size : int
+        Size in bytes of the layout to run on.
+    num_shards : int
+        Maximum number of shards.
+
+    Returns
+    -------
+    list
+        List of RuleShard, empty if the table can't be split.
+    """
+    drc_file = os.path.join(drc_dir, "rule_decks", f"{table}.drc")
+    with open(drc_file, "r") as f:
+        lines = f.read().split("\n")
+
+    units = get_rule_units(lines)
+    if units is None or len(units) < 2:
+        return []
+
+    unit_rules = [_unit_rules(lines, u) for u in units]
+    table_seconds, table_rss_kb = estimate_table_cost(
+        costs, table, layout_size, drc_file
+    )
+    num_rules = max(sum(len(r) for r in unit_rules), 1)
+    default_seconds = (
+        table_seconds / num_rules if table in costs else DEFAULT_SECONDS_PER_RULE
+    )
+
+    rule_seconds = {
+        r: estimate_rule_cost(costs, r, layout_size, default_seconds)
+        for rules in unit_rules
+        for r in rules
+    }
+    unit_seconds = [sum(rule_seconds[r] for r in rules) for rules in unit_rules]
+
+    num_shards = min(num_shards, len(units))
+    loads = [0.0] * num_shards
+    members = [[] for _ in range(num_shards)]
+    for u in sorted(range(len(units)), key=lambda u: unit_seconds[u], reverse=True):
+        s = loads.index(min(loads))
+        loads[s] += unit_seconds[u]
+        members[s].append(u)
+
+    shards = []
+    for s, shard_units in enumerate(members):
+        if not shard_units:
+            continue
+
+        skipped = set()
+        for u in range(len(units)):
+            if u not in shard_units:
+                for start, end in units[u]:
+                    skipped.update(range(start, end))
+
+        rules = [r for u in sorted(shard_units) for r in unit_rules[u]]
+        text = "\n".join(ln for i, ln in enumerate(lines) if i not in skipped)
+        shards.append(
+            RuleShard(
+                get_shard_name(table, len(shards)),
+                table,
+                rules,
+                text,
+                loads[s],
+                table_rss_kb,
+            )
+        )
+
+    return shards
+
+
+def plan_rule_shards(
+    drc_dir: str, tables: list, costs: dict, layout_size: int, max_jobs: int
+):
+    """
+    plan_rule_shards splits the tables that take longer than their share of the parallel run.
+
+    Parameters
+    ----------
+    drc_dir : str
+        Path string to the location where the DRC files would be found.
+    tables : list
+        List of the rule tables to run.
+    costs : dict
+        Dictionary of the recorded costs.
+    layout_size : int
+        Size in bytes of the layout to run on.
+    max_jobs : int
+        Number of runs allowed in parallel.
+
+    Returns
+    -------
+    dict
+        Dictionary of table name to its list of RuleShard, for the split tables only.
+    """
+    if max_jobs < 2 or len(tables) < 1:
+        return dict()
+
+    estimates = {
+        t: estimate_table_cost(
+            costs, t, layout_size, os.path.join(drc_dir, "rule_decks", f"{t}.drc")
+        )[0]
+        for t in tables
+    }
+    share = sum(estimates.values()) / max_jobs
+
+    table_shards = dict()
+    for t in tables:
+        num_shards = min(math.ceil(estimates[t] / share), max_jobs)
+        if num_shards < 2:
+            continue
+
+        shards = split_table(drc_dir, t, costs, layout_size, num_shards)
+        if len(shards) < 2:
+            logging.info(f"## Rule table {t} can't be split in shards.")
+            continue
+
+        table_shards[t] = shards
+        logging.info(
+            "## Rule table {} (estimated {:.1f} s) is split in {} shards of {} rules".format(
+                t,
+                estimates[t],
+                len(shards),
+                [len(s.rules) for s in shards],
+            )
+        )
+
+    return table_shards
+
+
+def record_shard_costs(costs: dict, shards: list, layout_size: int, usage: dict):
+    """
+    record_shard_costs updates the costs of the rules of a split table with the usage of its shards.
+    The time of a shard is shared between its rules in proportion to their estimated cost.
+
+    Parameters
+    ----------
+    costs : dict
+        Dictionary of the recorded costs.
+    shards : list
+        List of RuleShard of the table.
+    layout_size : int
+        Size in bytes of the layout used in the run.
+    usage : dict
+        Dictionary of run name to its (seconds, max_rss_kb).
+    """
+    for s in shards:
+        if s.name not in usage or not s.rules:
+            continue
+
+        seconds = usage[s.name][0]
+        default_seconds = s.seconds / len(s.rules)
+        rule_seconds = {
+            r: estimate_rule_cost(costs, r, layout_size, default_seconds)
+            for r in s.rules
+        }
+        total = sum(rule_seconds.values()) or 1.0
+        for r, est in rule_seconds.items():
+            record_rule_cost(costs, r, layout_size, seconds * est / total)
+
+    if all(s.name in usage for s in shards):
+        record_table_cost(
+            costs,
+            shards[0].table,
+            layout_size,
+            sum(usage[s.name][0] for s in shards),
+            max(usage[s.name][1] for s in shards),
+        )
@@ -0,0 +1,160 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per rule profile of the GlobalFoundries 180nm MCU DRC runs.
+
+With profile=true, every rule deck writes <report>_profile.csv next to its results
+database with the wall time, cpu time and memory of each rule. rule_peak_rss_kb is the
+peak memory reached while the rule runs, not the peak of the whole run. The profiles of all
+the runs are merged here with the number of markers of each rule.
+"""
+
+import os
+import csv
+import json
+import logging
+
+from results_db import scan_results_db
+
+PROFILE_SUFFIX = "_profile.csv"
+PROFILE_FIELDS = [
+    "table",
+    "rule",
+    "wall_s",
+    "cpu_s",
+    "rss_kb",
+    "rule_peak_rss_kb",
+    "markers",
+]
+
+# Number of rules reported in the slowest rules report.
+SLOWEST_RULES_COUNT = 20
+
+
+def get_profile_path(results_database: str):
+    """
+    get_profile_path gets the rules profile file written with a results database.
+
+    Parameters
+    ----------
+    results_database : str
+        Path to the lyrdb file.
+
+    Returns
+    -------
+    str
+        Path to the profile csv file.
+    """
+    return "{}{}".format(os.path.splitext(results_database)[0], PROFILE_SUFFIX)
+
+
+def read_rules_profile(results_database: str):
+    """
+    read_rules_profile reads the rules profile of a run and adds the markers count of each rule.
+
+    Parameters
+    ----------
+    results_database : str
+        Path to the lyrdb file.
+
+    Returns
+    -------
+    list
+        List of dictionaries with the PROFILE_FIELDS of each rule, empty if there is no profile.
+    """
+    profile_path = get_profile_path(results_database)
+    if not os.path.isfile(profile_path):
+        return []
+
+    summary = scan_results_db(results_database)
+
+    rows = []
+    with open(profile_path, "r", newline="") as f:
+        for r in csv.DictReader(f):
+            rows.append(
+                {
+                    "table": r["table"],
+                    "rule": r["rule"],
+                    "wall_s": float(r["wall_s"]),
+                    "cpu_s": float(r["cpu_s"]),
+                    "rss_kb": int(r["rss_kb"]),
+                    "rule_peak_rss_kb": int(r["rule_peak_rss_kb"]),
+                    "markers": summary.count(r["rule"]),
+                }
+            )
+
+    return rows
+
+
+def report_rules_profile(results_db_files: list, run_dir: str):
+    """
+    report_rules_profile merges the rules profiles of all runs, writes them to the run directory
+    as csv and json, and logs the slowest rules.
+
+    Parameters
+    ----------
+    results_db_files : list
+        A list of strings that represent paths to results databases of all the DRC runs.
+    run_dir : str
+        Path to the run location.
+
+    Returns
+    -------
+    list
+        List of dictionaries with the PROFILE_FIELDS of each rule sorted by wall time.
+    """
+    rows = []
+    for f in results_db_files:
+        rows.extend(read_rules_profile(f))
+
+    if len(rows) < 1:
+        logging.warning("## No rules profile found. Please check run logs")
+        return rows
+
+    rows.sort(key=lambda r: r["wall_s"], reverse=True)
+
+    csv_path = os.path.join(run_dir, "rules_profile.csv")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    with open(os.path.join(run_dir, "rules_profile.json"), "w") as f:
+        json.dump(rows, f, indent=2)
+
+    total_wall = sum(r["wall_s"] for r in rows)
+    logging.info(
+        "## Slowest rules of {} profiled ({:.1f} s in total), full profile at {}".format(
+            len(rows), total_wall, csv_path
+        )
+    )
+    logging.info(
+        "   {:<12} {:<36} {:>10} {:>10} {:>14} {:>10}".format(
+            "Table", "Rule", "Wall (s)", "CPU (s)", "Rule peak (MB)", "Markers"
+        )
+    )
+    for r in rows[:SLOWEST_RULES_COUNT]:
+        logging.info(
+            "   {:<12} {:<36} {:>10.2f} {:>10.2f} {:>14.0f} {:>10}".format(
+                r["table"],
+                r["rule"],
+                r["wall_s"],
+                r["cpu_s"],
+                r["rule_peak_rss_kb"] / 1024,
+                r["markers"],
+            )
+        )
+
+    return rows
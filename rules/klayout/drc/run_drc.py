@@ -17,7 +17,7 @@ Run GlobalFoundries 180nm MCU DRC.
 
 Usage:
     run_drc.py (--help| -h)
-    run_drc.py (--path=<file_path>) (--variant=<combined_options>) [--verbose] [--table=<table_name>]... [--mp=<num_cores>] [--run_dir=<run_dir_path>] [--topcell=<topcell_name>] [--thr=<thr>] [--run_mode=<run_mode>] [--no_feol] [--no_beol] [--connectivity] [--density] [--density_only] [--antenna] [--antenna_only] [--no_offgrid]
+    run_drc.py (--path=<file_path>) (--variant=<combined_options>) [--verbose] [--table=<table_name>]... [--mp=<num_cores>] [--rule_shards] [--shared_load] [--incremental] [--mem_limit=<mem_limit_gb>] [--cost_db=<cost_db_path>] [--violation_store] [--profile] [--run_dir=<run_dir_path>] [--topcell=<topcell_name>] [--thr=<thr>] [--run_mode=<run_mode>] [--no_feol] [--no_beol] [--connectivity] [--density] [--density_only] [--density_window=<density_window_um>] [--antenna] [--antenna_only] [--no_offgrid]
 
 Options:
     --help -h                           Print this help message.
@@ -29,31 +29,62 @@ Options:
     --topcell=<topcell_name>            Topcell name to use.
     --table=<table_name>                Table name to use to run the rule deck.
     --mp=<num_cores>                    Run the rule deck in parts in parallel to speed up the run. [default: 1]
+    --rule_shards                       With --mp, split the longest rule tables in shards of rules balanced by their recorded costs.
+    --shared_load                       With --mp, load the layout once and run the rule tables in workers sharing it.
+    --incremental                       Re-run only the rule tables whose layers changed since the last run in the same --run_dir.
+    --mem_limit=<mem_limit_gb>          Memory budget in GB of the parallel rule tables runs. [default: auto]
+    --cost_db=<cost_db_path>            Json file of the tables costs recorded by the previous runs, used to schedule the parallel runs.
+    --violation_store                   Export a memory-mappable columnar violation store next to the final (consolidated) results database.
+    --profile                           Record the run time and memory of each rule and report the slowest rules.
     --run_dir=<run_dir_path>            Run directory to save all the results [default: pwd]
     --thr=<thr>                         The number of threads used in run.
-    --run_mode=<run_mode>               Select klayout mode Allowed modes (flat , deep, tiling). [default: flat]
+    --run_mode=<run_mode>               Select klayout mode Allowed modes (flat , deep, tiling, auto). [default: flat]
     --no_feol                           Turn off FEOL rules from running.
     --no_beol                           Turn off BEOL rules from running.
     --connectivity                      Turn on connectivity rules.
     --density                           Turn on Density rules.
     --density_only                      Turn on Density rules only.
+    --density_window=<density_window_um>  Window size in um of the density grid written with the density results. [default: 100]
     --antenna                           Turn on Antenna checks.
-    --antenna_only                      Turn on Antenna checks only.
+    --antenna_only                      Turn on Antenna checks only. With --mp, the metal levels are checked in parallel.
     --no_offgrid                        Turn off OFFGRID checking rules.
     --verbose                           Detailed rule execution log for debugging.
 """
 
 from docopt import docopt
 import os
-import xml.etree.ElementTree as ET
 import logging
 import klayout.db
 import glob
 from datetime import datetime
-from subprocess import check_call
+from subprocess import Popen, CalledProcessError
 import shutil
 import concurrent.futures
 import traceback
+import time
+from table_scheduler import (
+    load_table_costs,
+    save_table_costs,
+    record_table_cost,
+    estimate_table_cost,
+    get_available_memory_kb,
+    get_max_jobs,
+    run_scheduled_tables,
+    MEMORY_BUDGET_RATIO,
+)
+from results_db import scan_results_db
+from violation_store import get_violated_rules
+from rules_profile import report_rules_profile, get_profile_path
+from rule_sharding import plan_rule_shards, record_shard_costs
+from results_merge import merge_results_dbs
+from run_mode_selector import get_layout_statistics, select_run_mode
+from incremental_drc import (
+    IncrementalState,
+    get_main_layer_dependencies,
+    get_deck_layers,
+    get_layer_fingerprints,
+    get_run_key,
+)
 
 
 def get_rules_with_violations(results_database):
@@ -71,18 +102,10 @@ def get_rules_with_violations(results_database):
         A set that contains all rules in the database with violations
     """
 
-    mytree = ET.parse(results_database)
-    myroot = mytree.getroot()
+    return scan_results_db(results_database).violated_rules()
 
-    all_violating_rules = set()
 
-    for z in myroot[7]:  # myroot[7] : List rules with viloations
-        all_violating_rules.add(f"{z[1].text}".replace("'", ""))
-
-    return all_violating_rules
-
-
-def check_drc_results(results_db_files: list):
+def check_drc_results(results_db_files: list, export_store: bool = False):
     """
     check_drc_results Checks the results db generated from run and report at the end if the DRC run failed or passed.
     This function will exit with 1 if there are violations.
@@ -91,6 +114,9 @@ def check_drc_results(results_db_files: list):
     ----------
     results_db_files : list
         A list of strings that represent paths to results databases of all the DRC runs.
+    export_store : bool, optional
+        Export the violation store of each results database, by default False.
+        Up to date stores are used instead of parsing the results databases.
     """
 
     if len(results_db_files) < 1:
@@ -100,7 +126,9 @@ def check_drc_results(results_db_files: list):
     full_violating_rules = set()
 
     for f in results_db_files:
-        violating_rules = get_rules_with_violations(f)
+        violating_rules = get_violated_rules(f, export_store)
+        if violating_rules is None:
+            violating_rules = get_rules_with_violations(f)
         full_violating_rules.update(violating_rules)
 
     if len(full_violating_rules) > 0:
@@ -111,19 +139,46 @@ def check_drc_results(results_db_files: list):
         logging.info("Klayout DRC run is clean. GDS has no DRC violations.")
 
 
-def get_results(rule_deck, rules, lyrdb, type):
+def consolidate_results(results_db_files: list, layout_path: str, drc_run_dir: str):
+    """
+    consolidate_results merges the results databases of all the runs in one results database
+    with a single categories tree and cells list, to be opened at once in klayout.
+
+    Parameters
+    ----------
+    results_db_files : list
+        A list of strings that represent paths to results databases of all the DRC runs.
+    layout_path : str
+        Path to the target layout.
+    drc_run_dir : str
+        Path to the run location.
+
+    Returns
+    -------
+    list
+        A list with the path to the consolidated results database, or results_db_files if there is nothing to merge.
+    """
+    if len(results_db_files) < 2:
+        return results_db_files
+
+    layout_base_name = os.path.basename(layout_path).split(".")[0]
+    drc_results_db = os.path.join(drc_run_dir, "{}_drc.lyrdb".format(layout_base_name))
+
+    total = merge_results_dbs(results_db_files, drc_results_db, "GF180MCU DRC runset")
+    logging.info(
+        "## {} markers of {} results databases merged at {}".format(
+            total, len(results_db_files), drc_results_db
+        )
+    )
+
+    return [drc_results_db]
 
-    mytree = ET.parse(f"{lyrdb}_{type}_gf{arguments['--gf180mcu']}.lyrdb")
-    myroot = mytree.getroot()
 
-    violated = []
+def get_results(rule_deck, rules, lyrdb, type):
+
+    summary = scan_results_db(f"{lyrdb}_{type}_gf{arguments['--gf180mcu']}.lyrdb")
 
-    for lrule in rules:
-        # Loop on database to get the violations of required rule
-        for z in myroot[7]:
-            if f"'{lrule}'" == f"{z[1].text}":
-                violated.append(lrule)
-                break
+    violated = [lrule for lrule in rules if summary.count(lrule) > 0]
 
     lyrdb_clean = lyrdb.split("/")[-1]
 
@@ -196,6 +251,210 @@ def generate_drc_run_template(drc_dir: str, run_dir: str, run_tables_list: list
     return gen_rule_deck_path
 
 
+def generate_drc_shard_template(drc_dir: str, run_dir: str, shard):
+    """
+    generate_drc_shard_template will generate the template file to run one shard of a rule table.
+
+    Parameters
+    ----------
+    drc_dir : str
+        Path string to the location where the DRC files would be found.
+    run_dir : str
+        Absolute path string to the run location where all the run output will be generated.
+    shard : RuleShard
+        Shard of the rule table generated by plan_rule_shards.
+
+    Returns
+    -------
+    str
+        Absolute path to the generated DRC file.
+    """
+    logging.info(
+        "## Generating template for {} with the rules: {}".format(
+            shard.name, str(shard.rules)
+        )
+    )
+
+    gen_rule_deck_path = os.path.join(run_dir, "{}.drc".format(shard.name))
+    with open(gen_rule_deck_path, "wb") as wfd:
+        with open(os.path.join(drc_dir, "rule_decks", "main.drc"), "rb") as fd:
+            shutil.copyfileobj(fd, wfd)
+        wfd.write(shard.text.encode("utf-8"))
+        wfd.write(b"\n")
+        with open(os.path.join(drc_dir, "rule_decks", "tail.drc"), "rb") as fd:
+            shutil.copyfileobj(fd, wfd)
+
+    return gen_rule_deck_path
+
+
+def merge_table_shards(
+    table_shards: dict, results: dict, layout_path: str, drc_run_dir: str
+):
+    """
+    merge_table_shards merges the results databases and rules profiles of the shards of each split table
+    into one results database per table. The shards results are replaced by the table results.
+
+    Parameters
+    ----------
+    table_shards : dict
+        Dictionary of table name to its list of RuleShard.
+    results : dict
+        Dictionary of run name to its results database.
+    layout_path : str
+        Path to the target layout.
+    drc_run_dir : str
+        Path to the run location.
+    """
+    layout_base_name = os.path.basename(layout_path).split(".")[0]
+
+    for t, shards in table_shards.items():
+        shard_dbs = [results.pop(sh.name) for sh in shards if sh.name in results]
+        report_path = os.path.join(
+            drc_run_dir, "{}_{}.lyrdb".format(layout_base_name, t)
+        )
+        merge_results_dbs(shard_dbs, report_path)
+
+        ## Rules profiles of the shards, with the table name.
+        profile_rows = []
+        for db in shard_dbs:
+            profile_path = get_profile_path(db)
+            if os.path.isfile(profile_path):
+                with open(profile_path, "r") as f:
+                    lines = f.read().splitlines()
+                profile_rows.extend(
+                    [t] + ln.split(",")[1:] for ln in lines[1:] if ln.strip()
+                )
+        if profile_rows:
+            with open(get_profile_path(report_path), "w") as f:
+                f.write("table,rule,wall_s,cpu_s,rss_kb,rule_peak_rss_kb\n")
+                for r in profile_rows:
+                    f.write(",".join(r) + "\n")
+
+        if len(shard_dbs) < len(shards):
+            logging.error(
+                "## {} table has failed shards, its results are incomplete.".format(t)
+            )
+            continue
+
+        logging.info("## {} table shards results merged at {}".format(t, report_path))
+        results[t] = report_path
+
+
+SHARED_LOAD_HEADER = """
+#================================================
+#------------ SHARED LOAD TABLE RUNS ------------
+#================================================
+# The layout is read and the base layers are derived once above. Each rule table
+# below runs in a forked worker that shares this state with the parent process.
+
+# The table reports are written by calling DRCEngine#_finish in each worker before
+# exit!. It is a private method of the DRC engine of KLayout 0.28, the minimum version
+# accepted by run_drc.py. Fail before forking if a KLayout version doesn't provide it,
+# instead of silently writing no reports.
+if !respond_to?(:_finish, true)
+  raise "Shared load runs need DRCEngine#_finish, not found in this KLayout version."
+end
+
+max_table_jobs = $mp ? $mp.to_i : 1
+table_jobs = {}
+failed_tables = []
+
+wait_table = lambda do
+  pid, status = Process.wait2
+  name = table_jobs.delete(pid)
+  if status.success?
+    logger.info("%s table run is complete." % [name])
+  else
+    logger.error("%s table run failed with status %s." % [name, status.exitstatus])
+    failed_tables << name
+  end
+end
+
+run_table = lambda do |name, report_path, &rules|
+  wait_table.call while table_jobs.size >= max_table_jobs
+
+  STDOUT.flush
+  pid = Process.fork do
+    begin
+      logger.info("Starting %s table run, output at: %s" % [name, report_path])
+      report("DRC Run Report at", report_path)
+      rules.call
+      if $profile == "true"
+        rules_profile.write(report_path.sub(/\\.lyrdb$/, "") + "_profile.csv", name)
+      end
+      _finish
+      STDOUT.flush
+      exit!(0)
+    rescue Exception => e
+      logger.error("%s table run raised: %s" % [name, e.message])
+      STDOUT.flush
+      exit!(1)
+    end
+  end
+  table_jobs[pid] = name
+end
+
+"""
+
+SHARED_LOAD_FOOTER = """
+wait_table.call while table_jobs.size > 0
+
+if failed_tables.size > 0
+  raise "Failed rule tables : %s" % [failed_tables.join(", ")]
+end
+
+"""
+
+
+def generate_drc_shared_template(drc_dir: str, run_dir: str, table_reports: dict):
+    """
+    generate_drc_shared_template will generate the template file to run all the rule tables in one klayout process.
+    The layout is loaded once by main.drc and every table is wrapped to run in a forked worker with its own report.
+
+    Parameters
+    ----------
+    drc_dir : str
+        Path string to the location where the DRC files would be found to get the list of the rule tables.
+    run_dir : str
+        Absolute path string to the run location where all the run output will be generated.
+    table_reports : dict
+        Dictionary of the target rule tables names and the path of the results database of each one.
+
+    Returns
+    -------
+    str
+        Absolute path to the generated DRC file.
+    """
+
+    logging.info(
+        "## Generating shared load template for the following rule tables: {}".format(
+            str(list(table_reports.keys()))
+        )
+    )
+
+    gen_rule_deck_path = os.path.join(run_dir, "shared_load.drc")
+    with open(gen_rule_deck_path, "wb") as wfd:
+        with open(os.path.join(drc_dir, "rule_decks", "main.drc"), "rb") as fd:
+            shutil.copyfileobj(fd, wfd)
+
+        wfd.write(SHARED_LOAD_HEADER.encode())
+
+        for t, report_path in table_reports.items():
+            wfd.write(
+                'run_table.call("{}", "{}") do\n'.format(t, report_path).encode()
+            )
+            with open(os.path.join(drc_dir, "rule_decks", f"{t}.drc"), "rb") as fd:
+                shutil.copyfileobj(fd, wfd)
+            wfd.write(b"\nend\n")
+
+        wfd.write(SHARED_LOAD_FOOTER.encode())
+
+        with open(os.path.join(drc_dir, "rule_decks", "tail.drc"), "rb") as fd:
+            shutil.copyfileobj(fd, wfd)
+
+    return gen_rule_deck_path
+
+
 def get_top_cell_names(gds_path):
     """
     get_top_cell_names get the top cell names from the GDS file.
@@ -294,8 +553,10 @@ def generate_klayout_switches(arguments, layout_path):
 
     if arguments["--run_mode"] in ["flat", "deep", "tiling"]:
         switches["run_mode"] = arguments["--run_mode"]
+    elif arguments["--run_mode"] == "auto":
+        switches["run_mode"] = "auto"
     else:
-        logging.error("Allowed klayout modes are (flat , deep , tiling) only")
+        logging.error("Allowed klayout modes are (flat , deep , tiling, auto) only")
         exit()
 
     if arguments["--variant"] == "A":
@@ -322,6 +583,15 @@ def generate_klayout_switches(arguments, layout_path):
     else:
         switches["verbose"] = "false"
 
+    if arguments["--profile"]:
+        switches["profile"] = "true"
+        # Shared rules profile code, loaded by the rule decks generated in the run directory.
+        switches["profile_lib"] = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "rule_decks", "rules_profile.rb"
+        )
+    else:
+        switches["profile"] = "false"
+
     if arguments["--no_feol"]:
         switches["feol"] = "false"
     else:
@@ -347,12 +617,73 @@ def generate_klayout_switches(arguments, layout_path):
     else:
         switches["density"] = "false"
 
+    switches["density_window"] = str(float(arguments["--density_window"]))
+
     switches["topcell"] = get_run_top_cell_name(arguments, layout_path)
     switches["input"] = layout_path
 
+    if switches["run_mode"] == "auto":
+        switches = get_auto_run_switches(
+            os.path.dirname(os.path.abspath(__file__)), layout_path, switches, ["main"]
+        )["main"]
+
     return switches
 
 
+def get_auto_run_switches(
+    rule_deck_full_path: str, layout_path: str, switches: dict, run_names: list
+):
+    """
+    get_auto_run_switches selects the run mode and tile size of each run from the layout statistics
+    of the layers it reads.
+
+    Parameters
+    ----------
+    rule_deck_full_path : str
+        String that holds the path of the rule deck files.
+    layout_path : str
+        Path to the target layout.
+    switches : dict
+        Dictionary that holds all the switches that will be passed to klayout run.
+    run_names : list
+        List of the runs names (rule tables, antenna, density or main for all tables).
+
+    Returns
+    -------
+    dict
+        Dictionary of run name to its switches.
+    """
+    stats = get_layout_statistics(layout_path, switches["topcell"])
+
+    # Only the layers of the selected metal stack are counted.
+    main_deps = get_main_layer_dependencies(
+        rule_deck_full_path, switches.get("metal_level")
+    )
+
+    run_switches = dict()
+    for n in run_names:
+        if n == "main":
+            layers = None
+        else:
+            layers = get_deck_layers(
+                os.path.join(rule_deck_full_path, "rule_decks", f"{n}.drc"), main_deps
+            )
+
+        mode, tile_size, reason = select_run_mode(stats, layers)
+        logging.info(
+            "## Auto run mode for {}: {}{} ({})".format(
+                n, mode, "" if tile_size is None else f" with {tile_size} um tiles", reason
+            )
+        )
+
+        run_switches[n] = switches.copy()
+        run_switches[n]["run_mode"] = mode
+        if tile_size is not None:
+            run_switches[n]["tile_size"] = str(tile_size)
+
+    return run_switches
+
+
 def check_klayout_version():
     """
     check_klayout_version checks klayout version and makes sure it would work with the DRC.
@@ -432,7 +763,40 @@ def build_switches_string(sws: dict):
     return switches_str
 
 
-def run_check(drc_file: str, drc_name: str, path: str, run_dir: str, sws: dict):
+def run_klayout(run_str: str):
+    """
+    run_klayout runs a klayout batch command and measures its usage.
+
+    Parameters
+    ----------
+    run_str : str
+        Klayout command to run.
+
+    Returns
+    -------
+    tuple
+        Wall time in seconds and peak resident memory in KB of the run.
+    """
+    start = time.time()
+    proc = Popen(run_str, shell=True)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.time() - start
+
+    if proc.returncode != 0:
+        raise CalledProcessError(proc.returncode, run_str)
+
+    return elapsed, usage.ru_maxrss
+
+
+def run_check(
+    drc_file: str,
+    drc_name: str,
+    path: str,
+    run_dir: str,
+    sws: dict,
+    usage: dict = None,
+):
     """
     run_antenna_check run DRC check based on DRC file provided.
 
@@ -446,6 +810,8 @@ def run_check(drc_file: str, drc_name: str, path: str, run_dir: str, sws: dict):
         String that holds the full path of the run location.
     sws : dict
         Dictionary that holds all switches that needs to be passed to the antenna checks.
+    usage : dict, optional
+        Dictionary to be filled with the wall time and peak memory of the run, keyed by drc_name.
 
     Returns
     -------
@@ -474,11 +840,134 @@ def run_check(drc_file: str, drc_name: str, path: str, run_dir: str, sws: dict):
 
     run_str = f"klayout -b -r {drc_file} {sws_str}"
 
-    check_call(run_str, shell=True)
+    elapsed, max_rss_kb = run_klayout(run_str)
+    logging.info(
+        "## {} run took {:.1f} s with peak memory {:.0f} MB".format(
+            drc_name, elapsed, max_rss_kb / 1024
+        )
+    )
+
+    if usage is not None:
+        usage[drc_name] = (elapsed, max_rss_kb)
 
     return report_path
 
 
+def get_cost_db_path(arguments: dict, drc_run_dir: str):
+    """
+    get_cost_db_path get the path of the tables costs file. If it's not provided by the user,
+    it's kept next to the run directory to be shared by the runs launched from the same location.
+
+    Parameters
+    ----------
+    arguments : dict
+        Dictionary that holds the arguments passed to the run_drc script.
+    drc_run_dir : str
+        Path to the run location.
+
+    Returns
+    -------
+    str
+        Path to the tables costs file.
+    """
+    if arguments["--cost_db"]:
+        return os.path.abspath(arguments["--cost_db"])
+
+    return os.path.join(os.path.dirname(drc_run_dir), "drc_table_costs.json")
+
+
+def get_memory_budget_kb(arguments: dict):
+    """
+    get_memory_budget_kb get the memory budget of the parallel runs.
+
+    Parameters
+    ----------
+    arguments : dict
+        Dictionary that holds the arguments passed to the run_drc script.
+
+    Returns
+    -------
+    int
+        Memory budget in KB, None if there is no limit.
+    """
+    if arguments["--mem_limit"] not in [None, "auto"]:
+        return int(float(arguments["--mem_limit"]) * 1024 * 1024)
+
+    available_kb = get_available_memory_kb()
+    if available_kb is None:
+        return None
+
+    return int(available_kb * MEMORY_BUDGET_RATIO)
+
+
+def get_incremental_runs(
+    rule_deck_full_path: str,
+    layout_path: str,
+    switches: dict,
+    drc_run_dir: str,
+    run_names: list,
+):
+    """
+    get_incremental_runs checks which runs have to be done again since the last run in the same run directory.
+
+    Parameters
+    ----------
+    rule_deck_full_path : str
+        String that holds the path of the rule deck files.
+    layout_path : str
+        Path to the target layout.
+    switches : dict
+        Dictionary that holds all the switches that will be passed to klayout run.
+    drc_run_dir : str
+        Path to the run location.
+    run_names : list
+        List of the runs names (rule tables, antenna or density).
+
+    Returns
+    -------
+    tuple
+        The incremental state, a dictionary of run name to its (key, layers) and a dictionary of
+        the reused run names to their previous results database.
+    """
+    fingerprints = get_layer_fingerprints(layout_path, switches["topcell"])
+    inc_state = IncrementalState(drc_run_dir, fingerprints)
+    main_deps = get_main_layer_dependencies(
+        rule_deck_full_path, switches.get("metal_level")
+    )
+
+    rule_decks_dir = os.path.join(rule_deck_full_path, "rule_decks")
+    inc_runs = dict()
+    reused = dict()
+
+    for n in run_names:
+        run_deck = os.path.join(rule_decks_dir, f"{n}.drc")
+        if n in ["antenna", "density"]:
+            deck_paths = [run_deck]
+        else:
+            deck_paths = [
+                os.path.join(rule_decks_dir, "main.drc"),
+                run_deck,
+                os.path.join(rule_decks_dir, "tail.drc"),
+            ]
+
+        key = get_run_key(deck_paths, switches)
+        layers = get_deck_layers(run_deck, main_deps)
+        inc_runs[n] = (key, layers)
+
+        report_path = inc_state.get_reusable_report(n, key, layers)
+        if report_path is not None:
+            reused[n] = report_path
+
+    logging.info(
+        "## Incremental run: reusing results of {} runs, running {}".format(
+            sorted(reused.keys()),
+            sorted([n for n in run_names if n not in reused]),
+        )
+    )
+
+    return inc_state, inc_runs, reused
+
+
 def run_parallel_run(
     arguments: dict,
     rule_deck_full_path: str,
@@ -521,14 +1010,215 @@ def run_parallel_run(
     else:
         list_of_tables = arguments["--table"]
 
+    ## Reuse the results of the runs that didn't change since the last run.
+    reused_res_db_files = []
+    if arguments["--incremental"]:
+        inc_state, inc_runs, reused = get_incremental_runs(
+            rule_deck_full_path,
+            layout_path,
+            switches,
+            drc_run_dir,
+            list(list_rule_deck_files.keys()) + list(list_of_tables),
+        )
+        for n in reused:
+            list_rule_deck_files.pop(n, None)
+        list_of_tables = [t for t in list_of_tables if t not in reused]
+        reused_res_db_files = list(reused.values())
+
+    ## Costs of the previous runs.
+    cost_db_path = get_cost_db_path(arguments, drc_run_dir)
+    costs = load_table_costs(cost_db_path)
+    layout_size = os.path.getsize(layout_path)
+    max_jobs = get_max_jobs(int(arguments["--mp"]), int(switches["thr"]))
+
+    ## Split the longest tables in shards of rules.
+    table_shards = dict()
+    if arguments["--rule_shards"]:
+        table_shards = plan_rule_shards(
+            rule_deck_full_path, list_of_tables, costs, layout_size, max_jobs
+        )
+
     ## Generate run rule deck from template.
+    run_tables = {n: n for n in list_rule_deck_files}
     for t in list_of_tables:
-        drc_file = generate_drc_run_template(rule_deck_full_path, drc_run_dir, [t])
-        list_rule_deck_files[t] = drc_file
+        if t in table_shards:
+            for sh in table_shards[t]:
+                list_rule_deck_files[sh.name] = generate_drc_shard_template(
+                    rule_deck_full_path, drc_run_dir, sh
+                )
+                run_tables[sh.name] = t
+        else:
+            drc_file = generate_drc_run_template(rule_deck_full_path, drc_run_dir, [t])
+            list_rule_deck_files[t] = drc_file
+            run_tables[t] = t
+
+    ## Estimate the cost of each run from the previous runs.
+    estimates = {
+        n: estimate_table_cost(costs, n, layout_size, list_rule_deck_files[n])
+        for n in list_rule_deck_files
+        if run_tables[n] == n
+    }
+    for shards in table_shards.values():
+        estimates.update({sh.name: (sh.seconds, sh.max_rss_kb) for sh in shards})
+
+    ## Select the run mode of each table, the shards use the mode of their table.
+    if arguments["--run_mode"] == "auto":
+        table_switches = get_auto_run_switches(
+            rule_deck_full_path,
+            layout_path,
+            switches,
+            list(dict.fromkeys(run_tables.values())),
+        )
+        run_switches = {n: table_switches[t] for n, t in run_tables.items()}
+    else:
+        run_switches = {n: switches for n in list_rule_deck_files}
+
+    mem_budget_kb = get_memory_budget_kb(arguments)
+    logging.info(
+        "## Scheduling {} runs with up to {} in parallel and memory budget {}".format(
+            len(estimates),
+            max_jobs,
+            "unlimited"
+            if mem_budget_kb is None
+            else "{:.0f} MB".format(mem_budget_kb / 1024),
+        )
+    )
 
     ## Run All DRC files.
+    usage = dict()
+    results = run_scheduled_tables(
+        estimates,
+        lambda n: run_check(
+            list_rule_deck_files[n], n, layout_path, drc_run_dir, run_switches[n], usage
+        ),
+        max_jobs,
+        mem_budget_kb,
+    )
+    merge_table_shards(table_shards, results, layout_path, drc_run_dir)
+    list_res_db_files = list(results.values())
+
+    if arguments["--incremental"]:
+        for n, res_db in results.items():
+            inc_state.update(n, *inc_runs[n], res_db)
+        inc_state.save()
+        list_res_db_files.extend(reused_res_db_files)
+
+    ## Record the costs for the next runs.
+    for n, (elapsed, max_rss_kb) in usage.items():
+        if run_tables[n] == n:
+            record_table_cost(costs, n, layout_size, elapsed, max_rss_kb)
+    for shards in table_shards.values():
+        record_shard_costs(costs, shards, layout_size, usage)
+    save_table_costs(cost_db_path, costs)
+
+    ## Check run
+    if arguments["--profile"]:
+        report_rules_profile(list_res_db_files, drc_run_dir)
+
+    check_drc_results(
+        consolidate_results(list_res_db_files, layout_path, drc_run_dir),
+        arguments["--violation_store"],
+    )
+
+
+def run_shared_load_run(
+    arguments: dict,
+    rule_deck_full_path: str,
+    layout_path: str,
+    switches: dict,
+    drc_run_dir: str,
+):
+    """
+    run_shared_load_run run the drc tables in parallel inside one klayout process that loads the layout once.
+
+    Parameters
+    ----------
+    arguments : dict
+        Dictionary that holds the arguments passed to the run_drc script.
+    rule_deck_full_path : str
+        String that holds the path of the rule deck files.
+    layout_path : str
+        Path to the target layout.
+    switches : dict
+        Dictionary that holds all the switches that will be passed to klayout run.
+    drc_run_dir : str
+        Path to the run location.
+    """
+
+    list_rule_deck_files = dict()
+
+    ## Run Antenna if required.
+    if arguments["--antenna"]:
+        drc_path = os.path.join(rule_deck_full_path, "rule_decks", "antenna.drc")
+        list_rule_deck_files["antenna"] = drc_path
+
+    ## Run Density if required.
+    if arguments["--density"]:
+        drc_path = os.path.join(rule_deck_full_path, "rule_decks", "density.drc")
+        list_rule_deck_files["density"] = drc_path
+
+    if not arguments["--table"]:
+        list_of_tables = get_list_of_tables(rule_deck_full_path)
+    else:
+        list_of_tables = arguments["--table"]
+
+    ## Reuse the results of the runs that didn't change since the last run.
     list_res_db_files = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+    if arguments["--incremental"]:
+        inc_state, inc_runs, reused = get_incremental_runs(
+            rule_deck_full_path,
+            layout_path,
+            switches,
+            drc_run_dir,
+            list(list_rule_deck_files.keys()) + list(list_of_tables),
+        )
+        for n in reused:
+            list_rule_deck_files.pop(n, None)
+        list_of_tables = [t for t in list_of_tables if t not in reused]
+        list_res_db_files.extend(reused.values())
+
+    ## Generate shared load rule deck, one results database per table.
+    layout_base_name = os.path.basename(layout_path).split(".")[0]
+    table_reports = {
+        t: os.path.join(drc_run_dir, "{}_{}.lyrdb".format(layout_base_name, t))
+        for t in list_of_tables
+    }
+    if len(table_reports) > 0:
+        list_rule_deck_files["shared_load"] = generate_drc_shared_template(
+            rule_deck_full_path, drc_run_dir, table_reports
+        )
+
+    ## Forked table workers, within the cores and the memory budget.
+    max_jobs = get_max_jobs(int(arguments["--mp"]), int(switches["thr"]))
+    mem_budget_kb = get_memory_budget_kb(arguments)
+    if mem_budget_kb is not None and len(table_reports) > 0:
+        costs = load_table_costs(get_cost_db_path(arguments, drc_run_dir))
+        layout_size = os.path.getsize(layout_path)
+        table_rss_kb = max(
+            estimate_table_cost(
+                costs,
+                t,
+                layout_size,
+                os.path.join(rule_deck_full_path, "rule_decks", f"{t}.drc"),
+            )[1]
+            for t in table_reports
+        )
+        max_jobs = max(1, min(max_jobs, int(mem_budget_kb // table_rss_kb)))
+
+    logging.info(
+        "## Running {} tables in shared load mode with up to {} in parallel".format(
+            len(table_reports), max_jobs
+        )
+    )
+
+    shared_sws = switches.copy()
+    shared_sws["mp"] = str(max_jobs)
+
+    ## Run All DRC files.
+    completed_runs = dict()
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(len(list_rule_deck_files), 1)
+    ) as executor:
         future_to_run_name = dict()
         for n in list_rule_deck_files:
             future_to_run_name[
@@ -538,20 +1228,41 @@ def run_parallel_run(
                     n,
                     layout_path,
                     drc_run_dir,
-                    switches,
+                    shared_sws if n == "shared_load" else switches,
                 )
             ] = n
 
         for future in concurrent.futures.as_completed(future_to_run_name):
             run_name = future_to_run_name[future]
             try:
-                list_res_db_files.append(future.result())
+                res_db = future.result()
+                if run_name == "shared_load":
+                    completed_runs.update(table_reports)
+                else:
+                    completed_runs[run_name] = res_db
             except Exception as exc:
                 logging.error("%s generated an exception: %s" % (run_name, str(exc)))
                 traceback.print_exc()
+                if run_name == "shared_load":
+                    list_res_db_files.extend(
+                        [r for r in table_reports.values() if os.path.isfile(r)]
+                    )
+
+    list_res_db_files.extend(completed_runs.values())
+
+    if arguments["--incremental"]:
+        for n, res_db in completed_runs.items():
+            inc_state.update(n, *inc_runs[n], res_db)
+        inc_state.save()
 
     ## Check run
-    check_drc_results(list_res_db_files)
+    if arguments["--profile"]:
+        report_rules_profile(list_res_db_files, drc_run_dir)
+
+    check_drc_results(
+        consolidate_results(list_res_db_files, layout_path, drc_run_dir),
+        arguments["--violation_store"],
+    )
 
 
 def run_single_processor(
@@ -580,11 +1291,15 @@ def run_single_processor(
 
     list_res_db_files = []
 
-    ## Run Antenna if required.
+    ## Run Antenna if required, its metal levels are checked in parallel with --mp.
     if arguments["--antenna"] or arguments["--antenna_only"]:
         drc_path = os.path.join(rule_deck_full_path, "rule_decks", "antenna.drc")
+        antenna_sws = switches.copy()
+        antenna_sws["antenna_mp"] = str(
+            get_max_jobs(int(arguments["--mp"]), int(switches["thr"]))
+        )
         list_res_db_files.append(
-            run_check(drc_path, "antenna", layout_path, drc_run_dir, switches)
+            run_check(drc_path, "antenna", layout_path, drc_run_dir, antenna_sws)
         )
 
         if arguments["--antenna_only"]:
@@ -616,7 +1331,13 @@ def run_single_processor(
     )
 
     ## Check run
-    check_drc_results(list_res_db_files)
+    if arguments["--profile"]:
+        report_rules_profile(list_res_db_files, drc_run_dir)
+
+    check_drc_results(
+        consolidate_results(list_res_db_files, layout_path, drc_run_dir),
+        arguments["--violation_store"],
+    )
 
 
 def main(drc_run_dir: str, now_str: str, arguments: dict):
@@ -657,14 +1378,23 @@ def main(drc_run_dir: str, now_str: str, arguments: dict):
     ## Get run switches
     switches = generate_klayout_switches(arguments, layout_path)
 
+    if arguments["--incremental"] and arguments["--run_dir"] in [None, "", "pwd"]:
+        logging.warning(
+            "## Incremental run needs the same --run_dir as the previous run to reuse its results."
+        )
+
     if (
-        int(arguments["--mp"]) == 1
+        (int(arguments["--mp"]) == 1 and not arguments["--incremental"])
         or arguments["--antenna_only"]
         or arguments["--density_only"]
     ):
         run_single_processor(
             arguments, rule_deck_full_path, layout_path, switches, drc_run_dir
         )
+    elif arguments["--shared_load"]:
+        run_shared_load_run(
+            arguments, rule_deck_full_path, layout_path, switches, drc_run_dir
+        )
     else:
         run_parallel_run(
             arguments, rule_deck_full_path, layout_path, switches, drc_run_dir
@@ -0,0 +1,176 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Automatic run mode (flat, deep or tiling) selection of the GlobalFoundries 180nm MCU DRC.
+
+The mode is chosen from the layout statistics of the layers read by each rule deck:
+  - deep   : the layers are highly arrayed (flat shapes count much larger than the hierarchical one).
+  - tiling : big die with a large number of flat shapes, the tile size keeps about
+             SHAPES_PER_TILE shapes per tile.
+  - flat   : otherwise (small blocks).
+"""
+
+import math
+import logging
+from functools import lru_cache
+import klayout.db
+
+from incremental_drc import ALL_LAYERS
+
+# Ratio of flat to hierarchical shapes count above which the deep mode is used.
+DEEP_MIN_COMPRESSION = 8.0
+# Minimum number of hierarchical shapes worth the deep mode overhead.
+DEEP_MIN_SHAPES = 100000
+
+# Die area (um^2) and flat shapes count above which the tiling mode is used.
+TILING_MIN_AREA = 25e6
+TILING_MIN_SHAPES = 20e6
+
+# Tile size selection.
+SHAPES_PER_TILE = 2e6
+MIN_TILE_SIZE = 200
+MAX_TILE_SIZE = 2000
+TILE_SIZE_STEP = 100
+
+
+@lru_cache(maxsize=4)
+def get_layout_statistics(layout_path: str, topcell: str):
+    """
+    get_layout_statistics gets the statistics of the layout used to select the run mode.
+    The layout is read only once per path and topcell, and its statistics are logged.
+
+    Parameters
+    ----------
+    layout_path : str
+        Path to the target layout.
+    topcell : str
+        Name of the topcell used in the run.
+
+    Returns
+    -------
+    dict
+        Dictionary of the layout statistics: hierarchy depth, cells count, hierarchical and flat
+        instances count, die area in um^2, and hierarchical and flat shapes count per "layer/datatype".
+    """
+    layout = klayout.db.Layout()
+    layout.read(layout_path)
+    top = layout.cell(topcell)
+
+    # Number of flat placements and depth of each cell under the topcell.
+    mult = {top.cell_index(): 1}
+    depth = {top.cell_index(): 0}
+    hier_instances = 0
+
+    for ci in layout.each_cell_top_down():
+        if ci not in mult:
+            continue
+
+        for inst in layout.cell(ci).each_inst():
+            child = inst.cell_index
+            mult[child] = mult.get(child, 0) + mult[ci] * inst.size()
+            depth[child] = max(depth.get(child, 0), depth[ci] + 1)
+            hier_instances += 1
+
+    hier_shapes = dict()
+    flat_shapes = dict()
+    for li in layout.layer_indexes():
+        info = layout.get_info(li)
+        name = f"{info.layer}/{info.datatype}"
+        hier_count = 0
+        flat_count = 0
+        for ci, m in mult.items():
+            n = layout.cell(ci).shapes(li).size()
+            hier_count += n
+            flat_count += n * m
+        hier_shapes[name] = hier_count
+        flat_shapes[name] = flat_count
+
+    stats = {
+        "depth": max(depth.values()),
+        "cells": len(mult),
+        "hier_instances": hier_instances,
+        "flat_instances": sum(mult.values()) - 1,
+        "area": top.dbbox().area(),
+        "hier_shapes": hier_shapes,
+        "flat_shapes": flat_shapes,
+    }
+    log_layout_statistics(stats)
+
+    return stats
+
+
+def select_run_mode(stats: dict, layers: set = None):
+    """
+    select_run_mode selects the run mode and tile size for the layers read by a rule deck.
+
+    Parameters
+    ----------
+    stats : dict
+        Layout statistics generated by get_layout_statistics.
+    layers : set, optional
+        Set of "layer/datatype" strings read by the rule deck, all layers if None.
+
+    Returns
+    -------
+    tuple
+        Selected run mode, tile size in um (None if not tiling) and the reason of the selection.
+    """
+    if layers is None or ALL_LAYERS in layers:
+        layers = set(stats["flat_shapes"].keys())
+
+    hier = sum(stats["hier_shapes"].get(lay, 0) for lay in layers)
+    flat = sum(stats["flat_shapes"].get(lay, 0) for lay in layers)
+    compression = flat / max(hier, 1)
+
+    if compression >= DEEP_MIN_COMPRESSION and hier >= DEEP_MIN_SHAPES:
+        return (
+            "deep",
+            None,
+            f"{flat} flat shapes from {hier} hierarchical shapes (x{compression:.1f})",
+        )
+
+    if stats["area"] >= TILING_MIN_AREA and flat >= TILING_MIN_SHAPES:
+        tile = math.sqrt(stats["area"] * SHAPES_PER_TILE / flat)
+        tile = round(tile / TILE_SIZE_STEP) * TILE_SIZE_STEP
+        tile = int(min(max(tile, MIN_TILE_SIZE), MAX_TILE_SIZE))
+        return (
+            "tiling",
+            tile,
+            f"{flat} flat shapes on {stats['area'] / 1e6:.1f} mm^2 die",
+        )
+
+    return "flat", None, f"{flat} flat shapes on {stats['area'] / 1e6:.3f} mm^2 die"
+
+
+def log_layout_statistics(stats: dict):
+    """
+    log_layout_statistics logs the layout statistics used to select the run mode.
+
+    Parameters
+    ----------
+    stats : dict
+        Layout statistics generated by get_layout_statistics.
+    """
+    logging.info(
+        "## Layout statistics: hierarchy depth {}, {} cells, {} instances ({} flat), die area {:.3f} mm^2, {} shapes ({} flat)".format(
+            stats["depth"],
+            stats["cells"],
+            stats["hier_instances"],
+            stats["flat_instances"],
+            stats["area"] / 1e6,
+            sum(stats["hier_shapes"].values()),
+            sum(stats["flat_shapes"].values()),
+        )
+    )
@@ -0,0 +1,303 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Memory-aware scheduler for the GlobalFoundries 180nm MCU DRC rule tables.
+
+The cost (run time and peak memory) of every table is recorded after each run in a
+json file and used by the next runs to order the tables (longest first) and to pack
+them against the cores and memory budget of the machine.
+"""
+
+import os
+import json
+import logging
+import concurrent.futures
+
+# Cost estimates used for tables that have never run before.
+DEFAULT_SECONDS_PER_RULE = 1.0
+DEFAULT_RSS_PER_LAYOUT_BYTE = 8.0
+MIN_TABLE_RSS_KB = 256 * 1024
+
+# Fraction of the available memory that the DRC runs are allowed to use.
+MEMORY_BUDGET_RATIO = 0.8
+
+# Key of the rules costs in the costs file, the other keys are the tables names.
+RULE_COSTS_KEY = "__rules__"
+
+
+def load_table_costs(cost_db_path: str):
+    """
+    load_table_costs reads the costs recorded by the previous runs.
+
+    Parameters
+    ----------
+    cost_db_path : str
+        Path to the json file that holds the tables costs.
+
+    Returns
+    -------
+    dict
+        Dictionary of table name to its recorded costs.
+    """
+    if not cost_db_path or not os.path.isfile(cost_db_path):
+        return dict()
+
+    try:
+        with open(cost_db_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        logging.warning(f"## Couldn't read DRC tables costs from {cost_db_path}.")
+        return dict()
+
+
+def save_table_costs(cost_db_path: str, costs: dict):
+    """
+    save_table_costs writes the tables costs to be used by the next runs.
+
+    Parameters
+    ----------
+    cost_db_path : str
+        Path to the json file that holds the tables costs.
+    costs : dict
+        Dictionary of table name to its recorded costs.
+    """
+    tmp_path = f"{cost_db_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(costs, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, cost_db_path)
+
+
+def record_table_cost(
+    costs: dict, table: str, layout_size: int, seconds: float, max_rss_kb: int
+):
+    """
+    record_table_cost updates the costs of a table with the usage of its last run.
+
+    Parameters
+    ----------
+    costs : dict
+        Dictionary of table name to its recorded costs.
+    table : str
+        Name of the rule table.
+    layout_size : int
+        Size in bytes of the layout used in the run.
+    seconds : float
+        Wall time of the run.
+    max_rss_kb : int
+        Peak resident memory of the run in KB.
+    """
+    layout_size = max(layout_size, 1)
+    costs[table] = {
+        "seconds_per_byte": seconds / layout_size,
+        "rss_kb_per_byte": max_rss_kb / layout_size,
+        "seconds": seconds,
+        "max_rss_kb": max_rss_kb,
+        "layout_size": layout_size,
+    }
+
+
+def estimate_table_cost(costs: dict, table: str, layout_size: int, drc_file: str):
+    """
+    estimate_table_cost estimates the run time and peak memory of a table.
+
+    Parameters
+    ----------
+    costs : dict
+        Dictionary of table name to its recorded costs.
+    table : str
+        Name of the rule table.
+    layout_size : int
+        Size in bytes of the layout to run on.
+    drc_file : str
+        Path to the rule deck of the table, used when the table has no recorded cost.
+
+    Returns
+    -------
+    tuple
+        Estimated (seconds, max_rss_kb) of the table run.
+    """
+    layout_size = max(layout_size, 1)
+
+    if table in costs:
+        seconds = costs[table]["seconds_per_byte"] * layout_size
+        max_rss_kb = costs[table]["rss_kb_per_byte"] * layout_size
+    else:
+        with open(drc_file, "r") as f:
+            num_rules = sum(1 for line in f if "# Rule" in line)
+        seconds = max(num_rules, 1) * DEFAULT_SECONDS_PER_RULE
+        max_rss_kb = layout_size * DEFAULT_RSS_PER_LAYOUT_BYTE / 1024
+
+    return seconds, max(int(max_rss_kb), MIN_TABLE_RSS_KB)
+
+
+def record_rule_cost(costs: dict, rule: str, layout_size: int, seconds: float):
+    """
+    record_rule_cost updates the cost of a rule with its run time in the last run.
+
+    Parameters
+    ----------
+    costs : dict
+        Dictionary of table name to its recorded costs.
+    rule : str
+        Name of the rule.
+    layout_size : int
+        Size in bytes of the layout used in the run.
+    seconds : float
+        Wall time of the rule.
+    """
+    layout_size = max(layout_size, 1)
+    costs.setdefault(RULE_COSTS_KEY, dict())[rule] = {
+        "seconds_per_byte": seconds / layout_size,
+        "seconds": seconds,
+        "layout_size": layout_size,
+    }
+
+
+def estimate_rule_cost(
+    costs: dict, rule: str, layout_size: int, default_seconds: float
+):
+    """
+    estimate_rule_cost estimates the run time of a rule.
+
+    Parameters
+    ----------
+    costs : dict
+        Dictionary of table name to its recorded costs.
+    rule : str
+        Name of the rule.
+    layout_size : int
+        Size in bytes of the layout to run on.
+    default_seconds : float
+        Run time used when the rule has no recorded cost.
+
+    Returns
+    -------
+    float
+        Estimated seconds of the rule.
+    """
+    rule_costs = costs.get(RULE_COSTS_KEY, dict())
+    if rule not in rule_costs:
+        return default_seconds
+
+    return rule_costs[rule]["seconds_per_byte"] * max(layout_size, 1)
+
+
+def get_available_memory_kb():
+    """
+    get_available_memory_kb gets the memory available for new processes.
+
+    Returns
+    -------
+    int
+        Available memory in KB, None if it couldn't be determined.
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    return None
+
+
+def get_max_jobs(mp: int, thr: int):
+    """
+    get_max_jobs gets the number of tables allowed to run at the same time.
+    It honours the --mp value while keeping the total number of klayout threads under the number of cores.
+
+    Parameters
+    ----------
+    mp : int
+        Number of parallel runs requested by the user.
+    thr : int
+        Number of klayout threads used by each run.
+
+    Returns
+    -------
+    int
+        Number of tables allowed to run in parallel.
+    """
+    cores = os.cpu_count() or 1
+    return max(1, min(mp, cores // max(thr, 1)))
+
+
+def run_scheduled_tables(
+    tables: dict,
+    run_func,
+    max_jobs: int,
+    mem_budget_kb: int = None,
+):
+    """
+    run_scheduled_tables runs the tables longest first, starting a table only if it fits
+    in the free job slots and memory budget. A table that doesn't fit the memory budget
+    alone is run when nothing else is running.
+
+    Parameters
+    ----------
+    tables : dict
+        Dictionary of table name to its estimated (seconds, max_rss_kb).
+    run_func : function
+        Function that runs one table, called with the table name.
+    max_jobs : int
+        Maximum number of tables running at the same time.
+    mem_budget_kb : int, optional
+        Memory budget in KB of all the running tables, no limit if None.
+
+    Returns
+    -------
+    dict
+        Dictionary of table name to the result of run_func, tables that raised an exception are not included.
+    """
+    pending = sorted(tables, key=lambda t: tables[t][0], reverse=True)
+    running = dict()
+    results = dict()
+    used_mem_kb = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_jobs) as executor:
+        while pending or running:
+            ## Start all the pending tables that fit, longest first.
+            for t in list(pending):
+                if len(running) >= max_jobs:
+                    break
+
+                rss_kb = tables[t][1]
+                fits = mem_budget_kb is None or used_mem_kb + rss_kb <= mem_budget_kb
+                if not fits and running:
+                    continue
+
+                pending.remove(t)
+                used_mem_kb += rss_kb
+                running[executor.submit(run_func, t)] = t
+                logging.info(
+                    "## Starting table {} (estimated {:.1f} s, {:.0f} MB)".format(
+                        t, tables[t][0], rss_kb / 1024
+                    )
+                )
+
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+
+            for future in done:
+                t = running.pop(future)
+                used_mem_kb -= tables[t][1]
+                try:
+                    results[t] = future.result()
+                except Exception as exc:
+                    logging.error("%s generated an exception: %s" % (t, str(exc)))
+
+    return results
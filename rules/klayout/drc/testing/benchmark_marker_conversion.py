@@ -0,0 +1,158 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the DRC regression marker conversion (results database to marker gds).
+
+Synthetic results databases are generated with an increasing number of markers, and the
+time per marker is reported for each size. It should stay about constant (linear scaling).
+
+Usage:
+    benchmark_marker_conversion.py (--help| -h)
+    benchmark_marker_conversion.py [--markers=<num>] [--steps=<num>] [--rules=<num>] [--run_dir=<run_dir_path>]
+
+Options:
+    --help -h                           Print this help message.
+    --markers=<num>                     Number of markers of the smallest database. [default: 1000]
+    --steps=<num>                       Number of sizes, each one doubles the number of markers. [default: 6]
+    --rules=<num>                       Number of rules the markers are spread over. [default: 50]
+    --run_dir=<run_dir_path>            Run directory to save the generated files in.
+"""
+
+from docopt import docopt
+import os
+import time
+import logging
+import tempfile
+
+from run_regression import convert_results_db_to_gds
+
+
+def generate_results_db(results_database: str, num_markers: int, num_rules: int):
+    """
+    generate_results_db writes a synthetic results database with polygon, edge-pair and edge markers.
+
+    Parameters
+    ----------
+    results_database : str
+        Path to the generated lyrdb file.
+    num_markers : int
+        Number of markers in the database.
+    num_rules : int
+        Number of rules the markers are spread over.
+    """
+    with open(results_database, "w") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<report-database>\n')
+        f.write(" <description>benchmark</description>\n <top-cell>TOP</top-cell>\n")
+        f.write(" <categories>\n")
+        for r in range(num_rules):
+            f.write(f"  <category><name>R.{r}</name></category>\n")
+        f.write(" </categories>\n")
+        f.write(" <cells><cell><name>TOP</name></cell></cells>\n <items>\n")
+
+        for i in range(num_markers):
+            x = (i % 1000) * 2.0
+            y = (i // 1000) * 2.0
+            kind = i % 3
+            if kind == 0:
+                value = f"polygon: ({x},{y};{x},{y + 1};{x + 1},{y + 1};{x + 1},{y})"
+            elif kind == 1:
+                value = f"edge-pair: ({x},{y};{x},{y + 1})|({x + 0.5},{y + 1};{x + 0.5},{y})"
+            else:
+                value = f"edge: ({x},{y};{x + 1},{y})"
+
+            f.write(
+                f"  <item><category>'R.{i % num_rules}'</category><cell>TOP</cell>"
+                f"<values><value>{value}</value></values></item>\n"
+            )
+
+        f.write(" </items>\n</report-database>\n")
+
+
+def benchmark_marker_conversion(
+    run_dir: str, num_markers: int, steps: int, num_rules: int
+):
+    """
+    benchmark_marker_conversion times the conversion of databases with an increasing number of markers.
+
+    Parameters
+    ----------
+    run_dir : str
+        Path to the run location.
+    num_markers : int
+        Number of markers of the smallest database.
+    steps : int
+        Number of sizes, each one doubles the number of markers.
+    num_rules : int
+        Number of rules the markers are spread over.
+
+    Returns
+    -------
+    list
+        List of (number of markers, seconds) of each size.
+    """
+    timings = []
+    logging.info(
+        "   {:>10} {:>12} {:>16}".format("Markers", "Time (s)", "Time/marker (us)")
+    )
+
+    for s in range(steps):
+        n = num_markers * 2**s
+        results_database = os.path.join(run_dir, f"benchmark_{n}.lyrdb")
+        generate_results_db(results_database, n, num_rules)
+
+        t0 = time.time()
+        convert_results_db_to_gds(results_database)
+        seconds = time.time() - t0
+
+        timings.append((n, seconds))
+        logging.info(
+            "   {:>10} {:>12.3f} {:>16.2f}".format(n, seconds, seconds / n * 1e6)
+        )
+
+    first_n, first_s = timings[0]
+    last_n, last_s = timings[-1]
+    logging.info(
+        "## Markers x{:.0f}, time x{:.1f} (linear scaling gives x{:.0f})".format(
+            last_n / first_n, last_s / max(first_s, 1e-9), last_n / first_n
+        )
+    )
+
+    return timings
+
+
+# ================================================================
+# -------------------------- MAIN --------------------------------
+# ================================================================
+
+
+if __name__ == "__main__":
+
+    # docopt reader
+    args = docopt(__doc__, version="DRC Marker Conversion Benchmark: 0.1")
+
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s | %(levelname)-7s | %(message)s",
+        datefmt="%d-%b-%Y %H:%M:%S",
+    )
+
+    run_dir = args["--run_dir"]
+    if run_dir is None:
+        run_dir = tempfile.mkdtemp(prefix="marker_benchmark_")
+    os.makedirs(run_dir, exist_ok=True)
+
+    benchmark_marker_conversion(
+        run_dir, int(args["--markers"]), int(args["--steps"]), int(args["--rules"])
+    )
@@ -17,11 +17,12 @@ Convert the lyrdb klayout database file to GDSII file
 
 Usage:
     convert_lyrdb_to_gds.py (--help| -h)
-    convert_lyrdb_to_gds.py --db=<lyrdb_file_path>
+    convert_lyrdb_to_gds.py --db=<lyrdb_file_path> [--debug]
 
 Options:
     --help -h                           Print this help message.
     --db=<lyrdb_file_path>              Path to the results database.
+    --debug                             Print the decoded marker values.
 """
 
 from docopt import docopt
@@ -30,77 +31,12 @@ import time
 import gdstk
 import xml.etree.ElementTree as ET
 
-import pandas as pd
-import re
-import json
+import logging
 
+from marker_geometry import draw_marker_values
 
-def darw_polygons(polygon_data, cell, lay_num, dt, path_width):
-    """
-    darw_polygons _summary_
 
-    Parameters
-    ----------
-    polygon_data : _type_
-        _description_
-    """
-
-    # polygon: (985.739,294.774;985.739,295.776;986.741,295.776;986.741,294.774)
-
-    polygon_data = re.sub(r"\s+", "", polygon_data)
-    polygon_data = re.sub(r"[()]", "", polygon_data)
-
-    print("## POLYGON DATA : ", polygon_data)
-    tag_split = polygon_data.split(":")
-    tag = tag_split[0]
-    poly_txt = tag_split[1]
-    polygons = re.split(r"[/|]", poly_txt)
-
-    print("    Type   ", tag)
-    print("    All polygons   ", polygons)
-
-    if tag == "polygon":
-        for poly in polygons:
-            points = [
-                (float(p.split(",")[0]), float(p.split(",")[1]))
-                for p in poly.split(";")
-            ]
-            print("           All points : ", points)
-            cell.add(gdstk.Polygon(points, lay_num, dt))
-
-    elif tag == "edge-pair":
-        for poly in polygons:
-            points = [
-                (float(p.split(",")[0]), float(p.split(",")[1]))
-                for p in poly.split(";")
-            ]
-            print("           All points : ", points)
-            cell.add(gdstk.FlexPath(points, path_width, layer=lay_num, datatype=dt))
-
-    elif tag == "edge":
-        for poly in polygons:
-            points = [
-                (float(p.split(",")[0]), float(p.split(",")[1]))
-                for p in poly.split(";")
-            ]
-            print("           All points : ", points)
-            cell.add(gdstk.FlexPath(points, path_width, layer=lay_num, datatype=dt))
-    else:
-        print(f"## Error unknown type: {tag} ignored")
-
-    # polygon_points = list()
-    # if "polygon" in polygon_data:
-    #     polygon_points = re.search(r'\((.*?)\)',polygon_data).group(1).split(";")
-
-    # point = float()
-    # points = []
-    # for point in polygon_points:
-    #     points.append(f"({point})")
-
-    # print (polygon_data)
-
-
-def parse_results_db(results_database: str):
+def parse_results_db(results_database: str, debug: bool = False):
     """
     This function will parse Klayout database for analysis.
 
@@ -108,6 +44,8 @@ def parse_results_db(results_database: str):
     ----------
     results_database : string or Path object
         Path string to the results file
+    debug : bool, optional
+        Print the decoded marker values, False by default.
 
     Returns
     -------
@@ -121,10 +59,9 @@ def parse_results_db(results_database: str):
 
     t0 = time.time()
     cell_name = ""
-    lib = None
-    cell = None
     in_item = False
-    rule_data_type_map = list()
+    rule_data_type_map = dict()
+    rule_values = dict()
 
     for ev, elem in tqdm(ET.iterparse(results_database, events=("start", "end"))):
 
@@ -151,57 +88,46 @@ def parse_results_db(results_database: str):
             all_cells = elem.findall("cell")
 
             if len(all_cells) > 0:
-                cell_name = all_cells[0].text
-
-                if cell_name is None:
-                    elem.clear()
-                    continue
-
-                # print(cell_name)
+                cell_name = all_cells[0].text or ""
 
-                lib = gdstk.Library(cell_name)
-                cell = lib.new_cell(cell_name)
-
-        if len(rules) > 0:
+        if len(rules) > 0 and rules[0].text is not None:
             rule_name = rules[0].text.replace("'", "")
-            if rule_name is None:
-                elem.clear()
-                continue
-
-            # print(rule_name)
         else:
+            in_item = False
             elem.clear()
             continue
 
-        if rule_name not in rule_data_type_map:
-            rule_data_type_map.append(rule_name)
-
-        ## draw polygons here.
-        if cell is not None:
-            for p in polygons:
-                polygons = darw_polygons(
-                    p.text,
-                    cell,
-                    rule_lay_num,
-                    rule_data_type_map.index(rule_name) + 1,
-                    path_width,
-                )
-                print(type(p))
-                # cell.add(gdstk.)
-                break
+        rule_dt = rule_data_type_map.setdefault(rule_name, len(rule_data_type_map) + 1)
+
+        ## Keeping the first value of the marker to be drawn.
+        if cell_name != "" and len(polygons) > 0 and polygons[0].text:
+            rule_values.setdefault(rule_dt, []).append(polygons[0].text)
 
         ## Clear memeory
         in_item = False
         elem.clear()
 
-        lib.write_gds(f"{cell_name}.gds")
+    ## Drawing the markers of each rule at once.
+    lib = gdstk.Library(cell_name)
+    cell = lib.new_cell(cell_name)
+    for rule_dt, rule_markers in rule_values.items():
+        draw_marker_values(
+            rule_markers, cell, rule_lay_num, rule_dt, path_width, debug
+        )
+
+    lib.write_gds(f"{cell_name}.gds")
 
     print("Total read time: {}".format(time.time() - t0))
-    print(rule_data_type_map)
+    print(list(rule_data_type_map.keys()))
+
+    return set(rule_data_type_map.keys())
 
 
 if __name__ == "__main__":
 
     args = docopt(__doc__, version="lyrdb to gds converter: 0.1")
 
-    parse_results_db(args["--db"])
+    if args["--debug"]:
+        logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+
+    parse_results_db(args["--db"], args["--debug"])
@@ -0,0 +1,176 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Bulk decoding and drawing of the klayout results database marker values.
+
+The values of many markers, e.g. "polygon: (0,0;0,1;1,1;1,0)", "edge: (0,0;1,0)" or
+"edge-pair: (0,0;0,1)|(1,1;1,0)", are decoded together: all their coordinates are read
+with a single numpy call, and the shapes are added to the gdstk cell in one call.
+"""
+
+import logging
+import numpy as np
+import gdstk
+
+MARKER_TYPES = {"polygon": 0, "edge-pair": 1, "edge": 2}
+
+# Characters removed or turned to coordinates separators before reading the numbers.
+COORDS_TABLE = str.maketrans({"(": None, ")": None, ";": ",", "|": ",", "/": ","})
+
+
+def decode_marker_values(values: list, debug: bool = False):
+    """
+    decode_marker_values decodes marker values to numpy coordinates arrays.
+    Each value is split in parts (polygon holes or edges of an edge pair), every part is one shape.
+
+    Parameters
+    ----------
+    values : list
+        List of marker values text.
+    debug : bool, optional
+        Log the decoded values, False by default.
+
+    Returns
+    -------
+    tuple
+        Shape type (MARKER_TYPES value) of each part as int8 array, offsets of each part points
+        as int64 array of (number of parts + 1), and (N, 2) float64 array of all the points.
+    """
+    part_types = []
+    part_sizes = []
+    texts = []
+
+    for value in values:
+        tag, _, data = value.partition(":")
+        tag = tag.strip()
+        if tag not in MARKER_TYPES:
+            logging.error(f"## Unknown type: {tag} ignored")
+            continue
+
+        parts = data.replace("|", "/").split("/")
+        part_types.extend([MARKER_TYPES[tag]] * len(parts))
+        part_sizes.extend(p.count(";") + 1 for p in parts)
+        texts.append(data.translate(COORDS_TABLE))
+
+    coords = np.fromstring(",".join(texts), dtype=np.float64, sep=",").reshape(-1, 2)
+    offsets = np.zeros(len(part_sizes) + 1, dtype=np.int64)
+    np.cumsum(part_sizes, out=offsets[1:])
+
+    if offsets[-1] != len(coords):
+        raise ValueError(
+            f"Marker values have {len(coords)} points, {offsets[-1]} expected"
+        )
+
+    if debug:
+        for value in values:
+            logging.debug(f"## Marker value : {value}")
+        logging.debug(f"## Decoded {len(part_sizes)} shapes with {len(coords)} points")
+
+    return np.array(part_types, dtype=np.int8), offsets, coords
+
+
+def get_edges_polygons(starts, ends, path_width: float):
+    """
+    get_edges_polygons gets the outline of edges drawn with a width, as a path with flush ends.
+
+    Parameters
+    ----------
+    starts : numpy.ndarray
+        (N, 2) array of the edges first points.
+    ends : numpy.ndarray
+        (N, 2) array of the edges last points.
+    path_width : float
+        Width used to draw the edges.
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 4, 2) array of the edges outlines.
+    """
+    direction = ends - starts
+    length = np.hypot(direction[:, 0], direction[:, 1])
+    length[length == 0] = 1.0
+    normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1)
+    normal *= (path_width / 2 / length)[:, None]
+
+    return np.stack(
+        [starts + normal, ends + normal, ends - normal, starts - normal], axis=1
+    )
+
+
+def draw_marker_values(
+    values: list,
+    cell,
+    lay_num: int,
+    lay_dt: int,
+    path_width: float,
+    debug: bool = False,
+):
+    """
+    draw_marker_values draws marker values in a gds cell.
+    Polygons are drawn as polygons, edges and edge pairs as paths of width path_width.
+
+    Parameters
+    ----------
+    values : list
+        List of marker values text.
+    cell : gdstk.Cell
+        Cell that will contain all the drawn shapes.
+    lay_num : int
+        Number of layer used to draw the markers.
+    lay_dt : int
+        Data type of layer used to draw the markers.
+    path_width : float
+        Width used to draw edges.
+    debug : bool, optional
+        Log the decoded values, False by default.
+
+    Returns
+    -------
+    int
+        Number of shapes drawn.
+    """
+    part_types, offsets, coords = decode_marker_values(values, debug)
+    sizes = np.diff(offsets)
+    shapes = []
+
+    ## Two points edges are drawn together, other edges as paths.
+    is_edge = part_types != MARKER_TYPES["polygon"]
+    simple_edges = np.nonzero(is_edge & (sizes == 2))[0]
+    if len(simple_edges) > 0:
+        starts = coords[offsets[simple_edges]]
+        ends = coords[offsets[simple_edges] + 1]
+        for outline in get_edges_polygons(starts, ends, path_width):
+            shapes.append(gdstk.Polygon(outline, lay_num, lay_dt))
+
+    for i in np.nonzero(is_edge & (sizes != 2))[0]:
+        shapes.append(
+            gdstk.FlexPath(
+                coords[offsets[i] : offsets[i + 1]],
+                path_width,
+                layer=lay_num,
+                datatype=lay_dt,
+            )
+        )
+
+    for i in np.nonzero(~is_edge)[0]:
+        shapes.append(
+            gdstk.Polygon(coords[offsets[i] : offsets[i + 1]], lay_num, lay_dt)
+        )
+
+    if shapes:
+        cell.add(*shapes)
+
+    return len(shapes)
@@ -0,0 +1,193 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Results cache of the GlobalFoundries 180nm MCU DRC unit tests regression.
+
+The pass patterns, fail patterns, false positive and false negative counts of each rule
+are stored in a json file under a key made of the content hashes of everything the run
+depends on: the table rule deck, main.drc and tail.drc, the test pattern, the switches,
+the klayout version and the scripts generating and reading the analysis rule deck
+(ANALYSIS_FILES). A table run is skipped when all its rules are found in the cache.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+
+# Version of the cached results format.
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_FILE = ".regression_cache.json"
+
+# Scripts of the regression analysis, relative to the DRC folder.
+ANALYSIS_FILES = [
+    os.path.join("testing", "run_regression.py"),
+    os.path.join("testing", "marker_geometry.py"),
+    "run_drc.py",
+    "results_db.py",
+]
+
+
+@lru_cache(maxsize=None)
+def _get_file_hash(file_path: str, size: int, mtime_ns: int):
+    """
+    _get_file_hash gets the sha256 of a file content, once per file version.
+    """
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_file_hash(file_path: str):
+    """
+    get_file_hash gets the sha256 of a file content.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file.
+
+    Returns
+    -------
+    str
+        Hex digest of the file content, empty if the file doesn't exist.
+    """
+    if not os.path.isfile(file_path):
+        return ""
+
+    st = os.stat(file_path)
+    return _get_file_hash(os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+
+def get_cache_key(
+    drc_dir: str, table: str, layout_path: str, switches: str, klayout_version: str
+):
+    """
+    get_cache_key gets the cache key of a table run on a test pattern.
+
+    Parameters
+    ----------
+    drc_dir : str
+        Path string to the DRC directory where all the DRC files are located.
+    table : str
+        Name of the table under test.
+    layout_path : str
+        Path string to the layout of the test pattern.
+    switches : str
+        String that holds all the DRC run switches of the run.
+    klayout_version : str
+        Version of klayout used in the run.
+
+    Returns
+    -------
+    str
+        Cache key of the run.
+    """
+    rule_decks_dir = os.path.join(drc_dir, "rule_decks")
+    parts = [
+        str(CACHE_VERSION),
+        get_file_hash(os.path.join(rule_decks_dir, f"{table}.drc")),
+        get_file_hash(os.path.join(rule_decks_dir, "main.drc")),
+        get_file_hash(os.path.join(rule_decks_dir, "tail.drc")),
+        get_file_hash(str(layout_path)),
+        switches,
+        klayout_version,
+    ] + [get_file_hash(os.path.join(drc_dir, f)) for f in ANALYSIS_FILES]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class RegressionCache:
+    """
+    Rules counts of the previous regression runs, keyed by get_cache_key.
+    """
+
+    def __init__(self, cache_path: str, klayout_version: str):
+        self.cache_path = cache_path
+        self.klayout_version = klayout_version
+        self.entries = dict()
+        self.hits = 0
+        self.lock = threading.Lock()
+
+        if os.path.isfile(cache_path):
+            try:
+                with open(cache_path, "r") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                logging.warning(f"## Regression cache {cache_path} can't be read.")
+
+    def get_key(self, drc_dir: str, table: str, layout_path: str, switches: str):
+        """
+        get_key gets the cache key of a table run with the klayout version of the cache.
+        """
+        return get_cache_key(
+            drc_dir, table, layout_path, switches, self.klayout_version
+        )
+
+    def get(self, key: str, rules: list):
+        """
+        get gets the cached counts of rules.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the run.
+        rules : list
+            Names of the rules under test.
+
+        Returns
+        -------
+        dict
+            Dictionary of rule name to its counts, None if any of the rules isn't cached.
+        """
+        with self.lock:
+            cached = self.entries.get(key, dict()).get("rules", dict())
+            if any(r not in cached for r in rules):
+                return None
+
+            self.hits += 1
+            return {r: tuple(cached[r]) for r in rules}
+
+    def record(self, key: str, table: str, rules_counts: dict):
+        """
+        record adds the counts of the rules of a run to the cache.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the run.
+        table : str
+            Name of the table under test.
+        rules_counts : dict
+            Dictionary of rule name to its counts.
+        """
+        with self.lock:
+            entry = self.entries.setdefault(key, {"table": table, "rules": dict()})
+            for r, counts in rules_counts.items():
+                entry["rules"][r] = list(counts)
+
+    def save(self):
+        """
+        save writes the cache file.
+        """
+        with self.lock:
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.cache_path)
@@ -17,7 +17,7 @@ Run GlobalFoundries 180nm MCU DRC Unit Regression.
 
 Usage:
     run_regression.py (--help| -h)
-    run_regression.py [--mp=<num>] [--run_name=<run_name>] [--rule_name=<rule_name>] [--table_name=<table_name>]
+    run_regression.py [--mp=<num>] [--run_name=<run_name>] [--rule_name=<rule_name>] [--table_name=<table_name>] [--batch] [--no-cache]
 
 Options:
     --help -h                           Print this help message.
@@ -25,6 +25,8 @@ Options:
     --run_name=<run_name>               Select your run name.
     --rule_name=<rule_name>             Target specific rule.
     --table_name=<table_name>           Target specific table.
+    --batch                             Run each table once for all its rules, instead of once per rule.
+    --no-cache                          Run all the tables, even if their results are in the regression cache.
 """
 
 from subprocess import check_call
@@ -36,15 +38,19 @@ import shutil
 from docopt import docopt
 import os
 from datetime import datetime
-import xml.etree.ElementTree as ET
 import time
 import pandas as pd
 import logging
 import glob
 from pathlib import Path
 from tqdm import tqdm
-import re
 import gdstk
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from results_db import scan_results_db, iter_markers  # noqa: E402
+from marker_geometry import draw_marker_values  # noqa: E402
+from regression_cache import RegressionCache, DEFAULT_CACHE_FILE  # noqa: E402
 
 
 SUPPORTED_TC_EXT = "gds"
@@ -54,6 +60,11 @@ SUPPORTED_SW_EXT = "yaml"
 def check_klayout_version():
     """
     check_klayout_version checks klayout version and makes sure it would work with the DRC.
+
+    Returns
+    -------
+    str
+        Klayout version string.
     """
     # ======= Checking Klayout version =======
     klayout_v_ = os.popen("klayout -b -v").read()
@@ -86,6 +97,8 @@ def check_klayout_version():
             )
             exit(1)
 
+    return klayout_v_
+
 
 def get_switches(yaml_file, rule_name):
     """Parse yaml file and extract switches data
@@ -120,73 +133,66 @@ def parse_results_db(test_rule, results_database):
 
     Parameters
     ----------
+    test_rule : string
+        Name of the rule under test.
     results_database : string or Path object
         Path string to the results file
 
     Returns
     -------
-    set
-        A set that contains all rules in the database with violations
-    """
-
-    mytree = ET.parse(results_database)
-    myroot = mytree.getroot()
-    # Initial values for counter
-    pass_patterns = 0
-    fail_patterns = 0
-    falsePos = 0
-    falseNeg = 0
-
-    for z in myroot[7]:
-        if f"'{test_rule}_pass_patterns'" == f"{z[1].text}":
-            pass_patterns += 1
-        if f"'{test_rule}_fail_patterns'" == f"{z[1].text}":
-            fail_patterns += 1
-        if f"'{test_rule}_false_positive'" == f"{z[1].text}":
-            falsePos += 1
-        if f"'{test_rule}_false_negative'" == f"{z[1].text}":
-            falseNeg += 1
+    tuple
+        Number of pass patterns, fail patterns, false positive and false negative of the rule.
+    """
+
+    summary = scan_results_db(results_database)
+
+    return get_rule_counts(test_rule, summary)
+
+
+def get_rule_counts(test_rule, summary):
+    """
+    This function gets the analysis results of a rule from the analysis results summary.
+
+    Parameters
+    ----------
+    test_rule : string
+        Name of the rule under test.
+    summary : ResultsSummary
+        Summary of the analysis results database.
+
+    Returns
+    -------
+    tuple
+        Number of pass patterns, fail patterns, false positive and false negative of the rule.
+    """
+
+    pass_patterns = summary.count(f"{test_rule}_pass_patterns")
+    fail_patterns = summary.count(f"{test_rule}_fail_patterns")
+    falsePos = summary.count(f"{test_rule}_false_positive")
+    falseNeg = summary.count(f"{test_rule}_false_negative")
 
     return pass_patterns, fail_patterns, falsePos, falseNeg
 
 
-def run_test_case(
-    runset_file,
-    drc_dir,
-    layout_path,
-    run_dir,
-    test_table,
-    test_rule,
-    switches="",
-):
+def get_test_case_switches(runset_file, layout_path, test_rule):
     """
-    This function run a single test case using the correct DRC file.
+    This function gets the DRC run switches of a test case.
 
     Parameters
     ----------
-    runset_file : string or None
-        Filename of the runset to be used.
-    drc_dir : string or Path
-        Path to the location where all runsets exist.
+    runset_file : string
+        Filename of the runset of the rule.
     layout_path : stirng or Path object
         Path string to the layout of the test pattern we want to test.
-    run_dir : stirng or Path object
-        Path to the location where is the regression run is done.
-    switches : string
-        String that holds all the DRC run switches required to enable this.
+    test_rule : string
+        Name of the rule under test.
 
     Returns
     -------
-    pd.DataFrame
-        A pandas DataFrame with the rule and rule deck used.
+    string
+        String that holds all the DRC run switches of the test case.
     """
 
-    # Initial value for counters
-    falsePos_count = 0
-    falseNeg_count = 0
-    pass_patterns_count = 0
-    fail_patterns_count = 0
-
     # Get switches used for each run
     sw_file = os.path.join(
         Path(layout_path.parent.parent).absolute(), f"{test_rule}.{SUPPORTED_SW_EXT}"
@@ -203,9 +209,64 @@ def run_test_case(
     elif "density" in runset_file:
         switches += " --density_only"
 
+    return switches
+
+
+def run_table_test_cases(
+    drc_dir,
+    layout_path,
+    run_dir,
+    test_table,
+    test_rules,
+    switches,
+    run_name,
+    cache=None,
+):
+    """
+    This function runs the DRC table once on its test pattern and analyzes all the given rules
+    from the same results database.
+
+    Parameters
+    ----------
+    drc_dir : string or Path
+        Path to the location where all runsets exist.
+    layout_path : stirng or Path object
+        Path string to the layout of the test pattern we want to test.
+    run_dir : stirng or Path object
+        Path to the location where is the regression run is done.
+    test_table : string
+        Name of the table under test.
+    test_rules : list
+        Names of the rules under test.
+    switches : string
+        String that holds all the DRC run switches required to enable this.
+    run_name : string
+        Name of the run folder in the table folder.
+    cache : RegressionCache, optional
+        Cache of the rules results, the run is skipped if all the rules are found in it.
+
+    Returns
+    -------
+    dict
+        Dictionary of rule name to its number of pass patterns, fail patterns, false positive and false negative.
+    """
+
+    # Getting the rules results from the cache
+    if cache is not None:
+        cache_key = cache.get_key(drc_dir, test_table, layout_path, switches)
+        cached_counts = cache.get(cache_key, test_rules)
+        if cached_counts is not None:
+            logging.info(
+                f"## Results of {len(test_rules)} rules of {test_table} found in the cache."
+            )
+            return cached_counts
+
+    # Initial value for counters
+    rules_counts = {r: (0, 0, 0, 0) for r in test_rules}
+
     # Creating run folder structure
     pattern_clean = ".".join(os.path.basename(layout_path).split(".")[:-1])
-    output_loc = f"{run_dir}/{test_table}/{test_rule}_data"
+    output_loc = f"{run_dir}/{test_table}/{run_name}"
     pattern_log = f"{output_loc}/{pattern_clean}_drc.log"
 
     # command to run drc
@@ -229,51 +290,115 @@ def run_test_case(
         # db to gds conversion
         marker_output, runset_analysis = convert_results_db_to_gds(pattern_results[0])
 
-        # Generating merged testcase for violated rules
-        merged_output = generate_merged_testcase(layout_path, marker_output)
-
-        # Generating final db file
-        if os.path.exists(merged_output):
-            final_report = f'{merged_output.split(".")[0]}_final.lyrdb'
-            call_str = f"klayout -b -r {runset_analysis} -rd input={merged_output} -rd report={final_report}"
-            check_call(call_str, shell=True)
-
-            if os.path.exists(final_report):
-                (
-                    pass_patterns_count,
-                    fail_patterns_count,
-                    falsePos_count,
-                    falseNeg_count,
-                ) = parse_results_db(test_rule, final_report)
-
-                return (
-                    pass_patterns_count,
-                    fail_patterns_count,
-                    falsePos_count,
-                    falseNeg_count,
-                )
-            else:
+        # Generating final db file, the analysis reads the markers as a second source
+        final_report = f'{marker_output.replace(".gds", "")}_final.lyrdb'
+        call_str = f"klayout -b -r {runset_analysis} -rd input={layout_path} -rd markers={marker_output} -rd report={final_report}"
+        check_call(call_str, shell=True)
 
-                return (
-                    pass_patterns_count,
-                    fail_patterns_count,
-                    falsePos_count,
-                    falseNeg_count,
-                )
-        else:
+        if os.path.exists(final_report):
+            summary = scan_results_db(final_report)
+            for r in test_rules:
+                rules_counts[r] = get_rule_counts(r, summary)
 
-            return (
-                pass_patterns_count,
-                fail_patterns_count,
-                falsePos_count,
-                falseNeg_count,
-            )
+            if cache is not None:
+                cache.record(cache_key, test_table, rules_counts)
+
+    return rules_counts
+
+
+def run_test_case(
+    runset_file,
+    drc_dir,
+    layout_path,
+    run_dir,
+    test_table,
+    test_rule,
+    switches="",
+    cache=None,
+):
+    """
+    This function run a single test case using the correct DRC file.
+
+    Parameters
+    ----------
+    runset_file : string or None
+        Filename of the runset to be used.
+    drc_dir : string or Path
+        Path to the location where all runsets exist.
+    layout_path : stirng or Path object
+        Path string to the layout of the test pattern we want to test.
+    run_dir : stirng or Path object
+        Path to the location where is the regression run is done.
+    switches : string
+        String that holds all the DRC run switches required to enable this.
+    cache : RegressionCache, optional
+        Cache of the rules results.
+
+    Returns
+    -------
+    tuple
+        Number of pass patterns, fail patterns, false positive and false negative of the rule.
+    """
+
+    switches = get_test_case_switches(runset_file, layout_path, test_rule)
+    rules_counts = run_table_test_cases(
+        drc_dir,
+        layout_path,
+        run_dir,
+        test_table,
+        [test_rule],
+        switches,
+        f"{test_rule}_data",
+        cache,
+    )
+
+    return rules_counts[test_rule]
+
+
+def get_run_status(pass_patterns, fail_patterns, false_positive, false_negative):
+    """
+    This function gets the status of a rule from its test results.
+
+    Parameters
+    ----------
+    pass_patterns : int
+        Number of pass patterns of the rule.
+    fail_patterns : int
+        Number of fail patterns of the rule.
+    false_positive : int
+        Number of false positive of the rule.
+    false_negative : int
+        Number of false negative of the rule.
 
+    Returns
+    -------
+    string
+        Status of the rule.
+    """
+    if pass_patterns + fail_patterns > 0:
+        if false_positive + false_negative == 0:
+            return "Passed_rule"
+        else:
+            return "Failed_rule"
     else:
-        return pass_patterns_count, fail_patterns_count, falsePos_count, falseNeg_count
+        return "Not_tested"
 
 
-def run_all_test_cases(tc_df, run_dir, thrCount):
+def get_run_info(run_id, counts, status_string):
+    """
+    This function gets the results row of a test case.
+    """
+    info = dict()
+    info["run_id"] = run_id
+    info["pass_patterns"] = counts[0]
+    info["fail_patterns"] = counts[1]
+    info["false_positive"] = counts[2]
+    info["false_negative"] = counts[3]
+    info["run_status"] = status_string
+    return info
+
+
+def run_all_test_cases(tc_df, run_dir, thrCount, batch=False, cache=None):
     """
     This function run all test cases from the input dataframe.
 
@@ -285,6 +410,10 @@ def run_all_test_cases(tc_df, run_dir, thrCount):
         Path string to the location of the testing code and output.
     thrCount : int
         Numbe of threads to use per klayout run.
+    batch : bool, optional
+        Run each table once for all its rules with the same switches, False by default.
+    cache : RegressionCache, optional
+        Cache of the rules results, None to run all test cases.
 
     Returns
     -------
@@ -292,6 +421,9 @@ def run_all_test_cases(tc_df, run_dir, thrCount):
         A pandas DataFrame with all test cases information post running.
     """
 
+    if batch:
+        return run_all_test_cases_batched(tc_df, run_dir, thrCount, cache)
+
     results = []
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=thrCount) as executor:
@@ -307,38 +439,112 @@ def run_all_test_cases(tc_df, run_dir, thrCount):
                     row["table_name"],
                     row["rule_name"],
                     thrCount,
+                    cache,
                 )
             ] = row["run_id"]
 
         for future in concurrent.futures.as_completed(future_to_run_id):
             run_id = future_to_run_id[future]
             try:
-                (
-                    pass_patterns,
-                    fail_patterns,
-                    false_positive,
-                    false_negative,
-                ) = future.result()
-                if pass_patterns + fail_patterns > 0:
-                    if false_positive + false_negative == 0:
-                        status_string = "Passed_rule"
-                    else:
-                        status_string = "Failed_rule"
-                else:
-                    status_string = "Not_tested"
+                counts = future.result()
+                status_string = get_run_status(*counts)
             except Exception as exc:
                 logging.error("%d generated an exception: %s" % (run_id, exc))
                 traceback.print_exc()
+                counts = (0, 0, 0, 0)
                 status_string = "exception"
 
-            info = dict()
-            info["run_id"] = run_id
-            info["pass_patterns"] = pass_patterns
-            info["fail_patterns"] = fail_patterns
-            info["false_positive"] = false_positive
-            info["false_negative"] = false_negative
-            info["run_status"] = status_string
-            results.append(info)
+            results.append(get_run_info(run_id, counts, status_string))
+
+    results_df = pd.DataFrame(results)
+    all_runs_df = tc_df.merge(results_df, on="run_id", how="left")
+
+    return all_runs_df
+
+
+def run_all_test_cases_batched(tc_df, run_dir, thrCount, cache=None):
+    """
+    This function run all test cases from the input dataframe, with one DRC run per table.
+    The rules of a table that need other switches are run in another batch of the table.
+
+    Parameters
+    ----------
+    tc_df : pd.DataFrame
+        DataFrame that holds all the test cases information for running.
+    run_dir : string or Path
+        Path string to the location of the testing code and output.
+    thrCount : int
+        Numbe of threads to use per klayout run.
+    cache : RegressionCache, optional
+        Cache of the rules results, None to run all test cases.
+
+    Returns
+    -------
+    pd.DataFrame
+        A pandas DataFrame with all test cases information post running.
+    """
+
+    ## Grouping the rules by table, test pattern and switches.
+    batches = dict()
+    for i, row in tc_df.iterrows():
+        switches = get_test_case_switches(
+            str(row["runset"]), row["test_path"], row["rule_name"]
+        )
+        key = (row["table_name"], str(row["test_path"]), switches)
+        if key not in batches:
+            batches[key] = (row["test_path"], dict())
+        batches[key][1].setdefault(row["rule_name"], []).append(row["run_id"])
+
+    logging.info(
+        "## Running {} test cases in {} table batches".format(len(tc_df), len(batches))
+    )
+
+    results = []
+    table_batches = dict()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=thrCount) as executor:
+        future_to_batch = dict()
+
+        ## Largest batches are submitted first to balance the pool.
+        for key in sorted(batches, key=lambda k: len(batches[k][1]), reverse=True):
+            table, _, switches = key
+            layout_path, rule_run_ids = batches[key]
+            batch_id = table_batches.get(table, 0)
+            table_batches[table] = batch_id + 1
+
+            future_to_batch[
+                executor.submit(
+                    run_table_test_cases,
+                    drc_dir,
+                    layout_path,
+                    run_dir,
+                    table,
+                    list(rule_run_ids.keys()),
+                    switches,
+                    f"batch{batch_id}_data",
+                    cache,
+                )
+            ] = (table, rule_run_ids)
+
+        for future in concurrent.futures.as_completed(future_to_batch):
+            table, rule_run_ids = future_to_batch[future]
+            try:
+                rules_counts = future.result()
+            except Exception as exc:
+                logging.error("%s generated an exception: %s" % (table, exc))
+                traceback.print_exc()
+                rules_counts = None
+
+            for rule, run_ids in rule_run_ids.items():
+                if rules_counts is None:
+                    counts = (0, 0, 0, 0)
+                    status_string = "exception"
+                else:
+                    counts = rules_counts[rule]
+                    status_string = get_run_status(*counts)
+
+                for run_id in run_ids:
+                    results.append(get_run_info(run_id, counts, status_string))
 
     results_df = pd.DataFrame(results)
     all_runs_df = tc_df.merge(results_df, on="run_id", how="left")
@@ -413,126 +619,55 @@ def analyze_test_patterns_coverage(rules_df, tc_df, output_path):
     return cov_df
 
 
-def generate_merged_testcase(orignal_testcase, marker_testcase):
+def get_analysis_rules(rule_name: str, rule_lay_num: int, rule_lay_dt: int):
     """
-    This function will merge orignal gds file with generated
-    markers gds file.
+    get_analysis_rules gets the analysis rules of a rule: its pass and fail patterns, false positives and false negatives.
 
     Parameters
     ----------
-    orignal_testcase : string or Path object
-        Path string to the orignal testcase
-
-    marker_testcase : string or Path
-        Path of the output marker gds file generated from db file.
+    rule_name : str
+        Name of the rule to analyze.
+    rule_lay_num : int
+        Layer number of the markers.
+    rule_lay_dt : int
+        Datatype of the markers of the rule.
 
     Returns
     -------
-    merged_gds_path : string or Path
-        Path of the final merged gds file generated.
+    str
+        Analysis rules of the rule.
     """
 
-    new_lib = gdstk.Library()
-
-    lib_org = gdstk.read_gds(orignal_testcase)
-    lib_marker = gdstk.read_gds(marker_testcase)
-
-    # Getting flattened top cells
-    top_cell_org = lib_org.top_level()[0].flatten(apply_repetitions=True)
-    top_cell_marker = lib_marker.top_level()[0].flatten(apply_repetitions=True)
-    marker_polygons = top_cell_marker.get_polygons(
-        apply_repetitions=True, include_paths=True, depth=None
-    )
-
-    # Merging all polygons of markers with original testcase
-    for marker_polygon in marker_polygons:
-        top_cell_org.add(marker_polygon)
-
-    # Adding flattened merged cell
-    new_lib.add(top_cell_org.flatten(apply_repetitions=True))
-
-    # Writing final merged gds file
-    merged_gds_path = f'{marker_testcase.replace(".gds", "")}_merged.gds'
-    new_lib.write_gds(merged_gds_path)
-
-    return merged_gds_path
-
-
-def darw_polygons(polygon_data, cell, lay_num, lay_dt, path_width):
+    pass_patterns_rule = f"""
+    pass_marker.interacting( text_marker.texts("{rule_name}") ).output("{rule_name}_pass_patterns", "{rule_name}_pass_patterns polygons")
+    """
+    fail_patterns_rule = f"""
+    fail_marker2.interacting(fail_marker.interacting(text_marker.texts("{rule_name}")) ).or( fail_marker.interacting(text_marker.texts("{rule_name}")).not_interacting(fail_marker2) ).output("{rule_name}_fail_patterns", "{rule_name}_fail_patterns polygons")
+    """
+    false_pos_rule = f"""
+    pass_marker.interacting(text_marker.texts("{rule_name}")).interacting(markers.input({rule_lay_num}, {rule_lay_dt})).output("{rule_name}_false_positive", "{rule_name}_false_positive occurred")
+    """
+    false_neg_rule = f"""
+    ((fail_marker2.interacting(fail_marker.interacting(text_marker.texts("{rule_name}")))).or((fail_marker.interacting(input(11, 222).texts("{rule_name}")).not_interacting(fail_marker2)))).not_interacting(markers.input({rule_lay_num}, {rule_lay_dt})).output("{rule_name}_false_negative", "{rule_name}_false_negative occurred")
     """
-    This function is used for drawing gds file with all violated polygons.
 
-    Parameters
-    ----------
-    polygon_data : str
-        Contains data points for each violated polygon
-    cell: gdstk.cell
-        Top cell will contains all generated polygons
-    lay_num: int
-        Number of layer used to draw violated polygons
-    lay_dt : int
-        Data type of layer used to draw violated polygons
-    path_width : float
-        Width  will used to draw edges
+    return pass_patterns_rule + fail_patterns_rule + false_pos_rule + false_neg_rule
 
-    Returns
-    -------
-    None
-    """
-
-    # Cleaning data points
-    polygon_data = re.sub(r"\s+", "", polygon_data)
-    polygon_data = re.sub(r"[()]", "", polygon_data)
-
-    print("## POLYGON DATA : ", polygon_data)
-    tag_split = polygon_data.split(":")
-    tag = tag_split[0]
-    poly_txt = tag_split[1]
-    polygons = re.split(r"[/|]", poly_txt)
-
-    logging.info(f" Type : {tag}")
-    logging.info(f" All polygons {polygons}")
-
-    # Select shape type to be drawn
-    if tag == "polygon":
-        for poly in polygons:
-            points = [
-                (float(p.split(",")[0]), float(p.split(",")[1]))
-                for p in poly.split(";")
-            ]
-            print("           All points : ", points)
-            cell.add(gdstk.Polygon(points, lay_num, lay_dt))
-
-    elif tag == "edge-pair":
-        for poly in polygons:
-            points = [
-                (float(p.split(",")[0]), float(p.split(",")[1]))
-                for p in poly.split(";")
-            ]
-            print("           All points : ", points)
-            cell.add(gdstk.FlexPath(points, path_width, layer=lay_num, datatype=lay_dt))
-
-    elif tag == "edge":
-        for poly in polygons:
-            points = [
-                (float(p.split(",")[0]), float(p.split(",")[1]))
-                for p in poly.split(";")
-            ]
-            print("           All points : ", points)
-            cell.add(gdstk.FlexPath(points, path_width, layer=lay_num, datatype=lay_dt))
-    else:
-        logging.error(f"## Unknown type: {tag} ignored")
 
-
-def convert_results_db_to_gds(results_database: str):
+def convert_results_db_to_gds(results_database: str, debug: bool = False):
     """
     This function will parse Klayout database for analysis.
     It converts the lyrdb klayout database file to GDSII file
 
+    The database is read in a single streaming pass, the marker gds file and the
+    analysis rule deck are written once at the end.
+
     Parameters
     ----------
     results_database : string or Path object
         Path string to the results file
+    debug : bool, optional
+        Log the decoded marker values, False by default.
 
     Returns
     -------
@@ -552,114 +687,62 @@ def convert_results_db_to_gds(results_database: str):
     fail_marker2 = "input(6, 222)"
     text_marker = "input(11, 222)"
 
+    output_gds_path = f'{results_database.replace(".lyrdb", "")}_markers.gds'
+    output_runset_path = f'{results_database.replace(".lyrdb", "")}_analysis.drc'
+
     # Generating violated rules and its points
     cell_name = ""
-    lib = None
-    cell = None
-    in_item = False
-    rule_data_type_map = list()
-    analysis_rules = []
-
-    for ev, elem in tqdm(ET.iterparse(results_database, events=("start", "end"))):
+    rule_data_type_map = dict()
+    rule_values = dict()
 
-        if elem.tag != "item" and not in_item:
-            elem.clear()
+    for marker in tqdm(iter_markers(results_database)):
+        if not marker.rule:
             continue
 
-        if elem.tag != "item" and in_item:
-            continue
-
-        if elem.tag == "item" and ev == "start":
-            in_item = True
-            continue
-
-        rules = elem.findall("category")
-        values = elem.findall("values")
-
-        if len(values) > 0:
-            polygons = values[0].findall("value")
-        else:
-            polygons = []
-
         if cell_name == "":
-            all_cells = elem.findall("cell")
-
-            if len(all_cells) > 0:
-                cell_name = all_cells[0].text
-
-                if cell_name is None:
-                    elem.clear()
-                    continue
-
-                lib = gdstk.Library(f"{cell_name}_markers")
-                cell = lib.new_cell(f"{cell_name}_markers")
-
-        if len(rules) > 0:
-            rule_name = rules[0].text.replace("'", "")
-            if rule_name is None:
-                elem.clear()
+            if not marker.cell:
                 continue
+            cell_name = marker.cell
+
+        rule_lay_dt = rule_data_type_map.setdefault(
+            marker.rule, len(rule_data_type_map) + 1
+        )
+
+        ## Keeping the first value of the marker to be drawn.
+        if marker.values:
+            rule_values.setdefault(rule_lay_dt, []).append(marker.values[0])
+
+    if cell_name == "":
+        cell_name = os.path.basename(results_database).replace(".lyrdb", "")
+    cell = gdstk.Cell(f"{cell_name}_markers")
+
+    ## Drawing the markers of each rule at once.
+    for rule_lay_dt, values in rule_values.items():
+        draw_marker_values(values, cell, rule_lay_num, rule_lay_dt, path_width, debug)
+
+    # Writing final marker gds file
+    lib = gdstk.Library(cell.name)
+    lib.add(cell)
+    lib.write_gds(output_gds_path)
+
+    # Writing analysis rule deck
+    # Markers are read from their own layout, both sources are combined in flat mode.
+    runset_analysis_setup = f"""
+    source($input)
+    markers = layout($markers)
+    report("DRC analysis run report at", $report)
+    pass_marker = {pass_marker}
+    fail_marker = {fail_marker}
+    fail_marker2 = {fail_marker2}
+    text_marker = {text_marker}
+    """
 
-        else:
-            elem.clear()
-            continue
-
-        if rule_name not in rule_data_type_map:
-            rule_data_type_map.append(rule_name)
-
-        ## Drawing polygons here.
-        rule_lay_dt = rule_data_type_map.index(rule_name) + 1
-        if cell is not None:
-            for p in polygons:
-                polygons = darw_polygons(
-                    p.text, cell, rule_lay_num, rule_lay_dt, path_width
-                )
-                break
-
-        ## Clearing memeory
-        in_item = False
-        elem.clear()
-
-        # Writing final marker gds file
-        output_gds_path = f'{results_database.replace(".lyrdb", "")}_markers.gds'
-        lib.write_gds(output_gds_path)
-
-        # Writing analysis rule deck
-        output_runset_path = f'{results_database.replace(".lyrdb", "")}_analysis.drc'
-
-        runset_analysis_setup = f"""
-        source($input)
-        report("DRC analysis run report at", $report)
-        pass_marker = {pass_marker}
-        fail_marker = {fail_marker}
-        fail_marker2 = {fail_marker2}
-        text_marker = {text_marker}
-        """
-
-        pass_patterns_rule = f"""
-        pass_marker.interacting( text_marker.texts("{rule_name}") ).output("{rule_name}_pass_patterns", "{rule_name}_pass_patterns polygons")
-        """
-        fail_patterns_rule = f"""
-        fail_marker2.interacting(fail_marker.interacting(text_marker.texts("{rule_name}")) ).or( fail_marker.interacting(text_marker.texts("{rule_name}")).not_interacting(fail_marker2) ).output("{rule_name}_fail_patterns", "{rule_name}_fail_patterns polygons")
-        """
-        false_pos_rule = f"""
-        pass_marker.interacting(text_marker.texts("{rule_name}")).interacting(input({rule_lay_num}, {rule_lay_dt})).output("{rule_name}_false_positive", "{rule_name}_false_positive occurred")
-        """
-        false_neg_rule = f"""
-        ((fail_marker2.interacting(fail_marker.interacting(text_marker.texts("{rule_name}")))).or((fail_marker.interacting(input(11, 222).texts("{rule_name}")).not_interacting(fail_marker2)))).not_interacting(input({rule_lay_num}, {rule_lay_dt})).output("{rule_name}_false_negative", "{rule_name}_false_negative occurred")
-        """
-
-        # Adding list of analysis rules
-        if not any(rule_name in rule_txt for rule_txt in analysis_rules):
-            analysis_rules.append(pass_patterns_rule)
-            analysis_rules.append(fail_patterns_rule)
-            analysis_rules.append(false_pos_rule)
-            analysis_rules.append(false_neg_rule)
-
-    with open(output_runset_path, "a+") as runset_analysis:
-        # analysis_rules = list(dict.fromkeys(analysis_rules))
+    with open(output_runset_path, "w") as runset_analysis:
         runset_analysis.write(runset_analysis_setup)
-        runset_analysis.write("".join(analysis_rules))
+        for rule_name, rule_lay_dt in rule_data_type_map.items():
+            runset_analysis.write(
+                get_analysis_rules(rule_name, rule_lay_num, rule_lay_dt)
+            )
 
     return output_gds_path, output_runset_path
 
@@ -750,7 +833,9 @@ def build_unit_tests_dataframe(unit_test_cases_dir, target_table, target_rule):
     return tc_df
 
 
-def run_regression(drc_dir, output_path, target_table, target_rule, cpu_count):
+def run_regression(
+    drc_dir, output_path, target_table, target_rule, cpu_count, batch=False, cache=None
+):
     """
     Running Regression Procedure.
 
@@ -768,6 +853,10 @@ def run_regression(drc_dir, output_path, target_table, target_rule, cpu_count):
         Name of rule that we want to run regression for. If None, run all found.
     cpu_count : int
         Number of cpus to use in running testcases.
+    batch : bool, optional
+        Run each table once for all its rules, False by default.
+    cache : RegressionCache, optional
+        Cache of the rules results, None to run all test cases.
     Returns
     -------
     bool
@@ -801,7 +890,15 @@ def run_regression(drc_dir, output_path, target_table, target_rule, cpu_count):
     print(cov_df)
 
     ## Run all test cases
-    all_tc_df = run_all_test_cases(tc_df, output_path, cpu_count)
+    all_tc_df = run_all_test_cases(tc_df, output_path, cpu_count, batch, cache)
+
+    if cache is not None:
+        cache.save()
+        logging.info(
+            "## {} runs results reused from the cache {}".format(
+                cache.hits, cache.cache_path
+            )
+        )
     all_tc_df.drop_duplicates(inplace=True)
     print(all_tc_df)
     all_tc_df.to_csv(
@@ -862,16 +959,31 @@ def main(
     logging.info("## Run folder is: {}".format(run_name))
     logging.info("## Target Table is: {}".format(target_table))
     logging.info("## Target rule is: {}".format(target_rule))
+    logging.info("## Batched run per table: {}".format(args["--batch"]))
+    logging.info("## Regression cache used: {}".format(not args["--no-cache"]))
 
     # Start of execution time
     t0 = time.time()
 
     ## Check Klayout version
-    check_klayout_version()
+    klayout_version = check_klayout_version()
+
+    ## Results of the previous runs
+    cache = None
+    if not args["--no-cache"]:
+        cache = RegressionCache(
+            os.path.join(drc_dir, "testing", DEFAULT_CACHE_FILE), klayout_version
+        )
 
     # Calling regression function
     run_status = run_regression(
-        drc_dir, output_path, target_table, target_rule, cpu_count
+        drc_dir,
+        output_path,
+        target_table,
+        target_rule,
+        cpu_count,
+        args["--batch"],
+        cache,
     )
 
     #  End of execution time
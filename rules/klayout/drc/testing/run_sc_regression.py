@@ -29,11 +29,14 @@ from subprocess import check_call
 
 from docopt import docopt
 import os
-import xml.etree.ElementTree as ET
+import sys
 import pandas as pd
 import time
 import concurrent.futures
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from results_db import scan_results_db  # noqa: E402
+
 
 def get_results(results_file_path):
     """
@@ -45,17 +48,9 @@ def get_results(results_file_path):
     :param path: The path to the GDS file you want to check
     :return: the file name, the rule deck name, the violated rules and the status of the file.
     """
-    mytree = ET.parse(results_file_path)
-    myroot = mytree.getroot()
-
-    violated = []
+    summary = scan_results_db(results_file_path)
 
-    for lrule in rules:
-        # Loop on database to get the violations of required rule
-        for z in myroot[7]:
-            if f"'{lrule}'" == f"{z[1].text}":
-                violated.append(lrule)
-                break
+    violated = [lrule for lrule in rules if summary.count(lrule) > 0]
 
     if len(violated) > 0:
         status = "not_clean"
@@ -0,0 +1,159 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Check of the layer dependencies, layer fingerprints and results reuse of the incremental DRC runs.
+"""
+
+import os
+import sys
+
+DRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DRC_DIR)
+
+from incremental_drc import (  # noqa: E402
+    ALL_LAYERS,
+    IncrementalState,
+    combine_cell_fingerprints,
+    get_deck_layers,
+    get_main_layer_dependencies,
+)
+
+MAIN_DRC = """
+poly2 = polygons(30, 0)
+metal1 = polygons(34, 0)
+metal2 = polygons(36, 0)
+metal3 = polygons(42, 0)
+CHIP = extent.sized(0.0)
+
+if METAL_LEVEL == "2LM"
+  top_metal = metal2
+else
+  # top_metal of the 3LM stack
+  top_metal = metal3
+end
+"""
+
+
+def write_drc_dir(tmp_path, tables: dict):
+    """
+    write_drc_dir writes a DRC folder with MAIN_DRC and the given rule tables.
+    """
+    rule_decks = tmp_path / "rule_decks"
+    rule_decks.mkdir()
+    (rule_decks / "main.drc").write_text(MAIN_DRC)
+    for name, text in tables.items():
+        (rule_decks / f"{name}.drc").write_text(text)
+
+    return str(tmp_path)
+
+
+def test_metaltop_layers_cover_all_metal_stacks():
+    main_deps = get_main_layer_dependencies(DRC_DIR)
+    layers = get_deck_layers(
+        os.path.join(DRC_DIR, "rule_decks", "metaltop.drc"), main_deps
+    )
+
+    # Top metal of the 2LM to 5LM stacks: metal2, metal3, metal4 and metal5.
+    for layer in ["36/0", "42/0", "46/0", "81/0"]:
+        assert layer in layers
+
+
+def test_metaltop_layers_of_selected_metal_stack():
+    main_deps = get_main_layer_dependencies(DRC_DIR, "3LM")
+    layers = get_deck_layers(
+        os.path.join(DRC_DIR, "rule_decks", "metaltop.drc"), main_deps
+    )
+
+    assert "42/0" in layers
+    assert "46/0" not in layers
+    assert "81/0" not in layers
+
+
+def test_main_layer_dependencies(tmp_path):
+    drc_dir = write_drc_dir(tmp_path, {})
+
+    deps = get_main_layer_dependencies(drc_dir)
+    assert deps["poly2"] == {"30/0"}
+    assert deps["top_metal"] == {"36/0", "42/0"}
+    assert ALL_LAYERS in deps["CHIP"]
+
+    assert get_main_layer_dependencies(drc_dir, "2LM")["top_metal"] == {"36/0"}
+    assert get_main_layer_dependencies(drc_dir, "3LM")["top_metal"] == {"42/0"}
+
+
+def test_deck_layers(tmp_path):
+    drc_dir = write_drc_dir(
+        tmp_path,
+        {
+            "tm": "top_metal.width(0.44.um).output('TM.1', 'TM.1 : width')\n",
+            "dens": "# metal1 in a comment\nCHIP.with_density(0.1)\n",
+            "direct": "polygons(22, 0).space(0.3.um)\n",
+        },
+    )
+    main_deps = get_main_layer_dependencies(drc_dir, "3LM")
+
+    def deck(name):
+        deck_path = os.path.join(drc_dir, "rule_decks", f"{name}.drc")
+        return get_deck_layers(deck_path, main_deps)
+
+    assert deck("tm") == {"42/0"}
+    assert deck("dens") == {ALL_LAYERS}
+    assert deck("direct") == {"22/0"}
+
+
+def test_cell_fingerprints():
+    child = ("child", {"34/0": "c-m1"}, [])
+    top = ("top", {"30/0": "t-poly"}, [({"34/0"}, "child-at-0")])
+    base = combine_cell_fingerprints([top, child])
+
+    assert set(base) == {"30/0", "34/0"}
+    assert combine_cell_fingerprints([child, top]) == base
+
+    ## A shape change in the child only changes its layer.
+    changed = combine_cell_fingerprints([top, ("child", {"34/0": "c-m1-new"}, [])])
+    assert changed["34/0"] != base["34/0"]
+    assert changed["30/0"] == base["30/0"]
+
+    ## A moved instance changes the layers of the child only.
+    moved = combine_cell_fingerprints(
+        [("top", {"30/0": "t-poly"}, [({"34/0"}, "child-at-1")]), child]
+    )
+    assert moved["34/0"] != base["34/0"]
+    assert moved["30/0"] == base["30/0"]
+
+
+def test_reuse_of_unchanged_runs(tmp_path):
+    run_dir = str(tmp_path)
+    report = tmp_path / "design_tm.lyrdb"
+    report.write_text("")
+
+    fingerprints = {"36/0": "a", "42/0": "b"}
+    state = IncrementalState(run_dir, fingerprints)
+    state.update("tm", "key", {"42/0"}, str(report))
+    state.save()
+
+    ## Only a change of a layer read by the run makes it run again.
+    state = IncrementalState(run_dir, {"36/0": "changed", "42/0": "b"})
+    assert state.get_reusable_report("tm", "key", {"42/0"}) == str(report)
+
+    state = IncrementalState(run_dir, {"36/0": "a", "42/0": "changed"})
+    assert state.get_reusable_report("tm", "key", {"42/0"}) is None
+
+    ## A changed rule deck or switches, or a deleted report, make it run again.
+    state = IncrementalState(run_dir, fingerprints)
+    assert state.get_reusable_report("tm", "other", {"42/0"}) is None
+
+    report.unlink()
+    assert state.get_reusable_report("tm", "key", {"42/0"}) is None
@@ -0,0 +1,329 @@
+# Copyright 2022 GlobalFoundries PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Columnar violation store of the GlobalFoundries 180nm MCU DRC results.
+
+A store is a folder written next to the lyrdb file with one row per marker:
+
+    rule_id.npy      int32   index of the rule in meta.json "rules"
+    cell_id.npy      int32   index of the cell in meta.json "cells"
+    shape_type.npy   int8    one of SHAPE_TYPES, -1 for other values
+    bbox.npy         float64 (N, 4) left, bottom, right, top in um
+    coord_index.npy  int64   (N + 1) offsets of each marker points in coords.npy
+    coords.npy       float64 (M, 2) packed points of all markers
+
+The arrays are plain npy files, so they are opened memory-mapped and a query only reads
+the pages it needs.
+"""
+
+import os
+import re
+import json
+from array import array
+
+import numpy as np
+
+from results_db import iter_markers
+
+STORE_SUFFIX = "_violations"
+STORE_VERSION = 1
+
+SHAPE_TYPES = {"polygon": 0, "edge-pair": 1, "edge": 2, "box": 3}
+
+POINT_PATTERN = re.compile(r"(-?[\d.]+(?:e-?\d+)?)\s*,\s*(-?[\d.]+(?:e-?\d+)?)")
+
+ARRAY_NAMES = ["rule_id", "cell_id", "shape_type", "bbox", "coord_index", "coords"]
+
+
+def get_store_path(results_database: str):
+    """
+    get_store_path gets the violation store folder of a results database.
+
+    Parameters
+    ----------
+    results_database : str
+        Path to the lyrdb file.
+
+    Returns
+    -------
+    str
+        Path to the violation store folder.
+    """
+    return "{}{}".format(os.path.splitext(results_database)[0], STORE_SUFFIX)
+
+
+def parse_marker_value(value: str):
+    """
+    parse_marker_value gets the shape type and points of a marker value.
+
+    Parameters
+    ----------
+    value : str
+        Marker value text, e.g. "polygon: (0,0;0,1;1,1;1,0)".
+
+    Returns
+    -------
+    tuple
+        Shape type (SHAPE_TYPES value or -1) and list of the x, y coordinates of all the points.
+    """
+    tag, _, data = value.partition(":")
+    shape_type = SHAPE_TYPES.get(tag.strip(), -1)
+    if shape_type < 0:
+        return shape_type, []
+
+    points = []
+    for x, y in POINT_PATTERN.findall(data):
+        points.append(float(x))
+        points.append(float(y))
+
+    return shape_type, points
+
+
+def _db_signature(results_database: str):
+    """
+    _db_signature gets the size and modification time of a results database.
+    """
+    st = os.stat(results_database)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def write_violation_store(results_database: str):
+    """
+    write_violation_store exports the markers of a results database to a violation store.
+
+    Parameters
+    ----------
+    results_database : str
+        Path to the lyrdb file.
+
+    Returns
+    -------
+    str
+        Path to the violation store folder.
+    """
+    rules = dict()
+    cells = dict()
+
+    rule_id = array("i")
+    cell_id = array("i")
+    shape_type = array("b")
+    bbox = array("d")
+    coord_index = array("q", [0])
+    coords = array("d")
+
+    for marker in iter_markers(results_database):
+        stype, points = (-1, [])
+        if marker.values:
+            stype, points = parse_marker_value(marker.values[0])
+
+        rule_id.append(rules.setdefault(marker.rule, len(rules)))
+        cell_id.append(cells.setdefault(marker.cell, len(cells)))
+        shape_type.append(stype)
+
+        if points:
+            xs = points[0::2]
+            ys = points[1::2]
+            bbox.extend([min(xs), min(ys), max(xs), max(ys)])
+        else:
+            bbox.extend([np.nan] * 4)
+
+        coords.extend(points)
+        coord_index.append(len(coords) // 2)
+
+    store_path = get_store_path(results_database)
+    os.makedirs(store_path, exist_ok=True)
+
+    arrays = {
+        "rule_id": np.frombuffer(rule_id, dtype=np.int32),
+        "cell_id": np.frombuffer(cell_id, dtype=np.int32),
+        "shape_type": np.frombuffer(shape_type, dtype=np.int8),
+        "bbox": np.frombuffer(bbox, dtype=np.float64).reshape(-1, 4),
+        "coord_index": np.frombuffer(coord_index, dtype=np.int64),
+        "coords": np.frombuffer(coords, dtype=np.float64).reshape(-1, 2),
+    }
+    for name, arr in arrays.items():
+        np.save(os.path.join(store_path, f"{name}.npy"), arr)
+
+    meta = {
+        "version": STORE_VERSION,
+        "results_database": os.path.abspath(results_database),
+        "signature": _db_signature(results_database),
+        "rules": list(rules.keys()),
+        "cells": list(cells.keys()),
+        "shape_types": SHAPE_TYPES,
+    }
+    with open(os.path.join(store_path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    return store_path
+
+
+def is_store_up_to_date(results_database: str):
+    """
+    is_store_up_to_date checks if the violation store of a results database exists and matches it.
+
+    Parameters
+    ----------
+    results_database : str
+        Path to the lyrdb file.
+
+    Returns
+    -------
+    bool
+        True if the store could be used instead of the results database.
+    """
+    meta_path = os.path.join(get_store_path(results_database), "meta.json")
+    if not os.path.isfile(meta_path) or not os.path.isfile(results_database):
+        return False
+
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    return (
+        meta.get("version") == STORE_VERSION
+        and meta.get("signature") == _db_signature(results_database)
+    )
+
+
+class ViolationStore:
+    """
+    Memory-mapped access to a violation store.
+    """
+
+    def __init__(self, store_path: str):
+        self.path = store_path
+
+        with open(os.path.join(store_path, "meta.json"), "r") as f:
+            meta = json.load(f)
+
+        self.rules = meta["rules"]
+        self.cells = meta["cells"]
+
+        for name in ARRAY_NAMES:
+            setattr(
+                self,
+                name,
+                np.load(os.path.join(store_path, f"{name}.npy"), mmap_mode="r"),
+            )
+
+    def __len__(self):
+        return len(self.rule_id)
+
+    def rule_counts(self):
+        """
+        rule_counts gets the number of violations of each rule.
+
+        Returns
+        -------
+        dict
+            Dictionary of rule name to its number of violations.
+        """
+        counts = np.bincount(self.rule_id, minlength=len(self.rules))
+        return {r: int(c) for r, c in zip(self.rules, counts)}
+
+    def violated_rules(self):
+        """
+        violated_rules gets the rules that have violations.
+
+        Returns
+        -------
+        set
+            A set that contains all rules in the store with violations.
+        """
+        return {r for r, c in self.rule_counts().items() if c > 0}
+
+    def query(self, rule: str = None, cell: str = None, region: tuple = None):
+        """
+        query gets the markers matching a rule, a cell and touching a region.
+
+        Parameters
+        ----------
+        rule : str, optional
+            Name of the rule, all rules if None.
+        cell : str, optional
+            Name of the cell, all cells if None.
+        region : tuple, optional
+            (left, bottom, right, top) of the region in um, the whole layout if None.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indexes of the matching markers.
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if rule is not None:
+            if rule not in self.rules:
+                return np.empty(0, dtype=np.int64)
+            mask &= self.rule_id == self.rules.index(rule)
+
+        if cell is not None:
+            if cell not in self.cells:
+                return np.empty(0, dtype=np.int64)
+            mask &= self.cell_id == self.cells.index(cell)
+
+        if region is not None:
+            left, bottom, right, top = region
+            mask &= (
+                (self.bbox[:, 0] <= right)
+                & (self.bbox[:, 2] >= left)
+                & (self.bbox[:, 1] <= top)
+                & (self.bbox[:, 3] >= bottom)
+            )
+
+        return np.nonzero(mask)[0]
+
+    def points(self, index: int):
+        """
+        points gets the points of a marker.
+
+        Parameters
+        ----------
+        index : int
+            Index of the marker.
+
+        Returns
+        -------
+        numpy.ndarray
+            (K, 2) array of the marker points in um.
+        """
+        return self.coords[self.coord_index[index] : self.coord_index[index + 1]]
+
+
+def get_violated_rules(results_database: str, export_store: bool = False):
+    """
+    get_violated_rules gets the violated rules of a run, from its violation store when it's up to date.
+
+    Parameters
+    ----------
+    results_database : str
+        Path to the lyrdb file.
+    export_store : bool, optional
+        Write the violation store of the results database if it's missing or outdated.
+
+    Returns
+    -------
+    set
+        A set that contains all rules with violations, None if there is no up to date store.
+    """
+    if not is_store_up_to_date(results_database):
+        if not export_store:
+            return None
+        write_violation_store(results_database)
+
+    return ViolationStore(get_store_path(results_database)).violated_rules()